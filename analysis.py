@@ -0,0 +1,92 @@
+# analysis.py
+# Contains vectorized versions of the calculator formulas used by the pages.
+# Every function accepts scalars or NumPy arrays and broadcasts them, so the
+# same code serves a single form submit and a whole grid of designs.
+
+import numpy as np
+
+VBE = 0.7    # Assumed base-emitter drop (V)
+VT = 26e-3   # Thermal voltage used for r_e' (V)
+
+# ==============================================================================
+# SECTION 1: BJT AMPLIFIERS (VOLTAGE-DIVIDER BIAS)
+# ==============================================================================
+
+def parallel(r_a, r_b):
+    """Returns the parallel combination of two impedances."""
+    return (r_a * r_b) / (r_a + r_b)
+
+def bjt_divider_bias(Vcc, R1, R2, Rc, Re):
+    """DC Q-point of a voltage-divider biased BJT (Ic ≈ Ie)."""
+    Vb = Vcc * (R2 / (R1 + R2))
+    Ve = Vb - VBE
+    Ie = Ve / Re
+    Ic = Ie
+    Vce = Vcc - Ic * Rc - Ve
+    re_prime = VT / Ie
+    return {"Vb": Vb, "Ve": Ve, "Ie": Ie, "Ic": Ic, "Vce": Vce, "re_prime": re_prime}
+
+def bjt_ce(Vcc, R1, R2, Rc, Re, beta):
+    """Common-emitter Q-point and midband gain (Re bypassed)."""
+    out = bjt_divider_bias(Vcc, R1, R2, Rc, Re)
+    re_prime = out["re_prime"]
+    out["Av"] = -Rc / re_prime
+    out["Zin"] = parallel(parallel(R1, R2), beta * (re_prime + Re))
+    out["Zout"] = Rc * np.ones_like(re_prime)
+    return out
+
+def bjt_cb(Vcc, R1, R2, Rc, Re, beta):
+    """Common-base Q-point and midband gain."""
+    out = bjt_divider_bias(Vcc, R1, R2, Rc, Re)
+    re_prime = out["re_prime"]
+    out["Av"] = Rc / re_prime
+    out["Zin"] = parallel(Re, re_prime)
+    out["Zout"] = Rc * np.ones_like(re_prime)
+    return out
+
+def bjt_cc(Vcc, R1, R2, Re, beta):
+    """Common-collector (emitter-follower) Q-point and midband gain, Rc = 0."""
+    out = bjt_divider_bias(Vcc, R1, R2, 0.0, Re)
+    re_prime = out["re_prime"]
+    out["Av"] = Re / (re_prime + Re)
+    out["Zin"] = parallel(parallel(R1, R2), beta * (re_prime + Re))
+    out["Zout"] = parallel(Re, re_prime)
+    return out
+
+# ==============================================================================
+# SECTION 2: AC CIRCUITS & FILTERS
+# ==============================================================================
+
+def rlc_series(R, L, C, V_peak, f):
+    """Impedance, current, phase and resonance of a series RLC circuit."""
+    omega = 2 * np.pi * f
+    Xl = omega * L
+    Xc = 1 / (omega * C)
+    X_total = Xl - Xc
+    Z = np.sqrt(R**2 + X_total**2)
+    I_peak = V_peak / Z
+    phase = np.arctan2(X_total, R)
+    f0 = 1 / (2 * np.pi * np.sqrt(L * C))
+    return {"omega": omega, "Xl": Xl, "Xc": Xc, "X_total": X_total, "Z": Z,
+            "I_peak": I_peak, "phase": phase, "PF": np.cos(phase), "f0": f0}
+
+def rlc_series_admittance(R, L, C, f):
+    """Complex admittance Y = 1/(R + jωL + 1/(jωC)) of a series RLC circuit; zero at DC."""
+    omega = 2 * np.pi * np.asarray(f, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z = R + 1j * (omega * L - 1 / (omega * C))
+        Y = 1 / Z
+    return np.where(omega > 0, Y, 0.0)
+
+def rc_low_pass(R, C, f):
+    """Cutoff frequency and magnitude (dB) of a first-order RC low-pass filter."""
+    fc = 1 / (2 * np.pi * R * C)
+    H_db = -10 * np.log10(1 + (f / fc)**2)
+    return {"fc": fc, "H_db": H_db}
+
+def rc_high_pass(R, C, f):
+    """Cutoff frequency and magnitude (dB) of a first-order RC high-pass filter."""
+    fc = 1 / (2 * np.pi * R * C)
+    x = f / fc
+    H_db = 20 * np.log10(x) - 10 * np.log10(1 + x**2)
+    return {"fc": fc, "H_db": H_db}
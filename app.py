@@ -21,9 +21,10 @@ st.markdown(
     ### Features Include:
     - **Ohm's Law Calculator** for basic DC analysis.
     - **RC Low-Pass & High-Pass Filters** with interactive Bode plots.
+    - **Active Filter Designer:** Butterworth, Chebyshev, Bessel and elliptic filters up to order 10, with Sallen-Key/MFB stage values.
     - **AC Series RLC Circuit Analyzer** with impedance, power, and resonance calculations.
     - **BJT Amplifiers (CE, CC, CB):** Q-point and AC analysis for all three basic configurations.
-    - **Op-Amp (Inverting & Non-Inverting):** Gain and impedance calculations for ideal op-amps.
+    - **Op-Amp (Inverting & Non-Inverting):** Ideal gain and impedance, plus finite-gain, bandwidth, offset and slew-rate analysis of real op-amps.
     - **Digital Logic Gate Simulator** for basic logic operations.
     """
 )
@@ -0,0 +1,246 @@
+# bjtfreq.py
+# Contains the small-signal frequency response of the CE, CB and CC
+# amplifier stages. Each stage is a fixed mna topology with the hybrid-pi
+# transistor (r_pi, C_pi, C_mu, g_m, r_o), the signal source resistance, the
+# input and output coupling capacitors, the load and the bypass capacitor.
+# Designs are rows of element values, so a batch of designs times a grid
+# of frequencies is one batched mna solve.
+#
+# Besides the exact gain-versus-frequency curve (and the -3 dB corners read
+# from it), every design gets the textbook estimates: short-circuit time
+# constants of the coupling/bypass capacitors for the low corner and
+# open-circuit time constants of C_pi and C_mu for the high corner. These
+# show which capacitor sets each corner, and the C_mu term carries the
+# Miller multiplication (R_mu ≈ R_pi'(1 + g_m R_L') + R_L').
+
+import time
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+import analysis
+import mna
+
+# 2N3904-class defaults: transition frequency (Hz), C_mu (F), Early voltage (V)
+FT = 300e6
+CMU = 4e-12
+VA = 100.0
+
+F_DEFAULT = np.logspace(0, 9, 181)
+CHUNK_SAMPLES = 200_000   # Designs x frequencies per batched solve
+G_SHORT = 1e6             # Admittance standing in for a shorted capacitor (S)
+
+OUT_NODE = {"CE": 6, "CB": 6, "CC": 5}
+LOW_CAPS = {"CE": ("Cin", "Ce", "Cout"), "CB": ("Cin", "Cb", "Cout"), "CC": ("Cin", "Cout")}
+HIGH_CAPS = ("Cpi", "Cmu")
+
+# ==============================================================================
+# SECTION 1: HYBRID-PI MODEL AND STAGE TOPOLOGIES
+# ==============================================================================
+
+def hybrid_pi(Ic, beta, fT=FT, Cmu=CMU, VA=VA) -> Dict[str, np.ndarray]:
+    """Small-signal parameters at collector current Ic; C_pi follows from fT = g_m / 2π(C_pi + C_mu)."""
+    gm = Ic / analysis.VT
+    return {"gm": gm, "r_pi": beta / gm, "C_pi": np.maximum(gm / (2 * np.pi * fT) - Cmu, 0.0),
+            "C_mu": Cmu * np.ones_like(gm), "r_o": VA / Ic}
+
+@lru_cache(maxsize=None)
+def stage_circuit(config: str) -> mna.Circuit:
+    """
+    Template circuit for 'CE', 'CB' or 'CC' (values are placeholders; one
+    zero-valued test source I<cap> sits across every capacitor).
+    CE nodes: 1 source, 2 after Rsig, 3 base, 4 emitter, 5 collector, 6 load.
+    CB nodes: 1 source, 2 after Rsig, 3 emitter, 4 base, 5 collector, 6 load.
+    CC nodes: 1 source, 2 after Rsig, 3 base, 4 emitter, 5 load (collector at AC ground).
+    """
+    if config not in LOW_CAPS:
+        raise ValueError(f"Unknown amplifier configuration '{config}'.")
+    c = mna.Circuit()
+    c.add("Vsig", 1, 0, 1.0); c.add("Rsig", 1, 2, 50.0)
+    if config == "CE":
+        b, e, col, out = 3, 4, 5, 6
+        c.add("Cin", 2, b, 1.0); c.add("Ce", e, 0, 1.0)
+    elif config == "CB":
+        e, b, col, out = 3, 4, 5, 6
+        c.add("Cin", 2, e, 1.0); c.add("Cb", b, 0, 1.0)
+    else:
+        b, e, col, out = 3, 4, 0, 5
+        c.add("Cin", 2, b, 1.0)
+    c.add("R1", b, 0, 1.0); c.add("R2", b, 0, 1.0); c.add("Re", e, 0, 1.0)
+    if col:
+        c.add("Rc", col, 0, 1.0)
+    c.add("Rpi", b, e, 1.0); c.add("Cpi", b, e, 1.0); c.add("Cmu", b, col, 1.0)
+    c.add("Gm", col, e, 1.0, ctrl=(b, e)); c.add("Ro", col, e, 1.0)
+    c.add("Cout", e if config == "CC" else col, out, 1.0); c.add("RL", out, 0, 1.0)
+    for k in [n for n in c.names if n[0] == "C"]:
+        i = c.names.index(k)
+        c.add("I" + k, c.n1[i], c.n2[i], 0.0)
+    return c
+
+def _design_values(config: str, Vcc, R1, R2, Rc, Re, beta, Rsig, RL, Cin, Cout, Cbypass,
+                   fT, Cmu, VA) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """
+    Element-value rows (batch, n_elem) for a batch of designs, plus their
+    Q-points. Cut-off designs (Ic <= 0) are solved at a stand-in 1 mA so
+    the batch stays well posed; their hybrid-pi parameters come back NaN.
+    """
+    q = analysis.bjt_divider_bias(Vcc, R1, R2, Rc, Re)
+    on = np.asarray(q["Ic"]) > 0
+    hp = hybrid_pi(np.where(on, q["Ic"], 1e-3), beta, fT, Cmu, VA)
+    params = {"Rsig": Rsig, "RL": RL, "Cin": Cin, "Cout": Cout, "R1": R1, "R2": R2, "Re": Re, "Rc": Rc,
+              "Ce": Cbypass, "Cb": Cbypass, "Rpi": hp["r_pi"], "Cpi": hp["C_pi"], "Cmu": hp["C_mu"],
+              "Gm": hp["gm"], "Ro": hp["r_o"]}
+    c = stage_circuit(config)
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in params.values()])
+    batch = int(np.prod(arrays[0].shape)) if arrays[0].ndim else 1
+    values = np.tile(c.nominal(), (batch, 1))
+    for name, v in zip(params, arrays):
+        if name in c.names:
+            values[:, c.names.index(name)] = v.ravel()
+    q.update({k: np.where(on, v, np.nan) for k, v in hp.items()})
+    return values, q
+
+# ==============================================================================
+# SECTION 2: FREQUENCY RESPONSE
+# ==============================================================================
+
+def _transfer(c: mna.Circuit, out_node: int, values: np.ndarray, f: np.ndarray) -> np.ndarray:
+    """V(out) / Vsig for every design (row) and frequency, shape (batch, len(f))."""
+    top = c.topology()
+    H = np.empty((len(values), len(f)), dtype=complex)
+    step = max(1, CHUNK_SAMPLES // len(f))
+    s = 2j * np.pi * f
+    for lo in range(0, len(values), step):
+        rows = values[lo:lo + step]
+        x = mna.solve(top, np.repeat(rows, len(f), axis=0), np.tile(s, len(rows)))
+        H[lo:lo + step] = x[:, out_node - 1].reshape(len(rows), len(f))
+    return H
+
+def _resistance_seen(c: mna.Circuit, values: np.ndarray, cap: str, shorted, opened) -> np.ndarray:
+    """
+    Resistance across capacitor `cap` with Vsig zeroed, the `shorted`
+    capacitors replaced by shorts and the `opened` ones (and `cap`) removed.
+    """
+    v = values.copy()
+    v[:, c.names.index("Vsig")] = 0.0
+    v[:, c.names.index("I" + cap)] = 1.0
+    for name in shorted:
+        v[:, c.names.index(name)] = G_SHORT
+    for name in tuple(opened) + (cap,):
+        v[:, c.names.index(name)] = 0.0
+    # At s = 1 every capacitor value acts as an admittance in S
+    x = mna.solve(c.topology(), v, 1.0).real
+    i = c.names.index(cap)
+    a, b = c.n1[i], c.n2[i]
+    return (x[:, b - 1] if b else 0.0) - (x[:, a - 1] if a else 0.0)
+
+def _corners(f: np.ndarray, H: np.ndarray, H_mid: np.ndarray):
+    """
+    Midband gain (signed, from H_mid) and the -3 dB frequencies relative to
+    it. Peaking above the midband (e.g. C_pi in a follower driven from a
+    low-impedance source) stays inside the band instead of setting the gain.
+    """
+    mag = np.abs(H)
+    rel = 20 * np.log10(mag / np.abs(H_mid)[:, None]) + 10 * np.log10(2)   # Zero at -3 dB
+    inside = rel >= 0
+    lo = np.argmax(inside, axis=-1)
+    hi = len(f) - 1 - np.argmax(inside[:, ::-1], axis=-1)
+    logf = np.log10(f)
+
+    def crossing(i, j):
+        ri, rj = np.take_along_axis(rel, i[:, None], -1)[:, 0], np.take_along_axis(rel, j[:, None], -1)[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return 10 ** (logf[i] + (logf[j] - logf[i]) * ri / (ri - rj))
+
+    f_low = np.where(lo > 0, crossing(np.maximum(lo - 1, 0), lo), np.nan)
+    f_high = np.where(hi < len(f) - 1, crossing(hi, np.minimum(hi + 1, len(f) - 1)), np.nan)
+    return np.abs(H_mid) * np.sign(H_mid.real), f_low, f_high
+
+def response(config: str, Vcc, R1, R2, Rc, Re, beta, f: Optional[np.ndarray] = None,
+             Rsig=50.0, RL=10e3, Cin=10e-6, Cout=10e-6, Cbypass=100e-6,
+             fT=FT, Cmu=CMU, VA=VA) -> Dict[str, np.ndarray]:
+    """
+    Gain versus frequency of a batch of designs of one stage ('CE', 'CB'
+    or 'CC'). All design arguments broadcast; Cbypass is Ce for CE (0 for
+    an unbypassed Re) and the base capacitor Cb for CB. Rsig and RL must be
+    positive and finite.
+
+    Returns the Q-point and hybrid-pi parameters, the complex gain H
+    (batch, len(f)) from Vsig to the load, the midband gain (exact gain at
+    f_mid, the geometric centre of the estimated corners), the -3 dB
+    corners and bandwidth, the gain-bandwidth product, the time-constant
+    estimates of both corners with the per-capacitor breakdown, and for CE
+    the Miller capacitance C_mu(1 + g_m R_L'). Designs in cut-off (Ic <= 0)
+    are flagged in `cutoff` and every small-signal result of theirs is NaN.
+    """
+    f = F_DEFAULT if f is None else np.asarray(f, dtype=float)
+    c = stage_circuit(config)
+    values, out = _design_values(config, Vcc, R1, R2, Rc, Re, beta, Rsig, RL, Cin, Cout, Cbypass, fT, Cmu, VA)
+    H = _transfer(c, OUT_NODE[config], values, f)
+    low_caps = LOW_CAPS[config]
+    col = {name: values[:, c.names.index(name)] for name in low_caps + HIGH_CAPS}
+
+    # Low corner: each coupling/bypass capacitor alone, device capacitors open, others shorted
+    tau_low = {k: col[k] * _resistance_seen(c, values, k, [o for o in low_caps if o != k], HIGH_CAPS)
+               for k in low_caps}
+    # High corner: coupling/bypass capacitors shorted, the other device capacitor open
+    tau_high = {k: col[k] * _resistance_seen(c, values, k, low_caps, [o for o in HIGH_CAPS if o != k])
+                for k in HIGH_CAPS}
+    with np.errstate(divide="ignore"):
+        f_low_est = sum(np.where(t > 0, 1 / (2 * np.pi * t), 0.0) for t in tau_low.values())
+    f_high_est = 1 / (2 * np.pi * sum(tau_high.values()))
+    # Midband: exact gain at the geometric centre of the estimated corners
+    f_mid = np.sqrt(np.maximum(f_low_est, f[0]) * f_high_est)
+    H_mid = mna.solve(c.topology(), values, 2j * np.pi * f_mid)[:, OUT_NODE[config] - 1]
+    Av_mid, f_low, f_high = _corners(f, H, H_mid)
+
+    off = ~np.broadcast_to(np.asarray(out["Ic"]) > 0, Av_mid.shape)
+    nan_off = lambda v: np.where(off.reshape((-1,) + (1,) * (np.ndim(v) - 1)), np.nan, v)
+    H = nan_off(H)
+    out.update({"f": f, "H": H, "gain_db": 20 * np.log10(np.abs(H)), "phase_deg": np.degrees(np.angle(H)),
+                "Av_mid": nan_off(Av_mid), "f_mid": nan_off(f_mid), "f_low": nan_off(f_low),
+                "f_high": nan_off(f_high), "bandwidth": nan_off(f_high - f_low),
+                "GBW": nan_off(np.abs(Av_mid) * f_high), "f_low_est": nan_off(f_low_est),
+                "f_high_est": nan_off(f_high_est), "tau_low": {k: nan_off(t) for k, t in tau_low.items()},
+                "tau_high": {k: nan_off(t) for k, t in tau_high.items()}, "cutoff": off})
+    if config == "CE":
+        RL_eff = analysis.parallel(analysis.parallel(values[:, c.names.index("Rc")], RL), out["r_o"])
+        out["miller_factor"] = 1 + out["gm"] * RL_eff
+        out["C_miller"] = out["C_mu"] * out["miller_factor"]
+    return out
+
+def ce_response(Vcc, R1, R2, Rc, Re, beta, f=None, **kwargs) -> Dict[str, np.ndarray]:
+    """Common-emitter stage (Re bypassed by Cbypass, default 100 µF)."""
+    return response("CE", Vcc, R1, R2, Rc, Re, beta, f, **kwargs)
+
+def cb_response(Vcc, R1, R2, Rc, Re, beta, f=None, **kwargs) -> Dict[str, np.ndarray]:
+    """Common-base stage (base bypassed by Cbypass, default 100 µF)."""
+    return response("CB", Vcc, R1, R2, Rc, Re, beta, f, **kwargs)
+
+def cc_response(Vcc, R1, R2, Re, beta, f=None, **kwargs) -> Dict[str, np.ndarray]:
+    """Common-collector stage (Rc = 0, output from the emitter)."""
+    return response("CC", Vcc, R1, R2, 0.0, Re, beta, f, **kwargs)
+
+# ==============================================================================
+# SECTION 3: BENCHMARK
+# ==============================================================================
+
+def benchmark(n: int = 2000, loop_samples: int = 50) -> Dict[str, float]:
+    """
+    Frequency response of n random CE designs in one call versus one call
+    per design (timed on `loop_samples` designs and extrapolated).
+    """
+    rng = np.random.default_rng(0)
+    designs = {"Vcc": 12.0, "R1": rng.uniform(20e3, 100e3, n), "R2": rng.uniform(5e3, 20e3, n),
+               "Rc": rng.uniform(1e3, 10e3, n), "Re": rng.uniform(500, 2e3, n), "beta": rng.uniform(80, 300, n)}
+    t0 = time.perf_counter()
+    batch = ce_response(**designs)
+    t_batch = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for i in range(loop_samples):
+        ce_response(**{k: v[i] if np.ndim(v) else v for k, v in designs.items()})
+    t_loop = (time.perf_counter() - t0) * n / loop_samples
+    return {"designs": n, "frequencies": len(batch["f"]), "batch_s": t_batch, "loop_s": t_loop,
+            "speedup": t_loop / t_batch, "median_f_high": float(np.nanmedian(batch["f_high"])),
+            "median_GBW": float(np.nanmedian(batch["GBW"]))}
@@ -0,0 +1,228 @@
+# decimate.py
+# Contains waveform decimation for plotting long simulations.
+# A screen only has a few hundred pixel columns, so a plot never needs more
+# than about two points per column. Min-max decimation keeps the extremes of
+# each column (peaks stay visible), LTTB keeps the visually dominant points.
+# SampleStore keeps a min/max pyramid next to the samples (optionally in
+# memory-mapped files), so any zoom window is re-decimated in time that
+# depends on the plot width, not on the waveform length.
+
+import json
+import os
+import shutil
+import tempfile
+import weakref
+from typing import Callable, Iterable, Optional, Tuple
+
+import numpy as np
+
+PYRAMID_FACTOR = 16      # Samples merged per step of the min/max pyramid
+CHUNK = 1 << 20          # Samples processed per pass when building from disk
+
+# ==============================================================================
+# SECTION 1: IN-MEMORY DECIMATION
+# ==============================================================================
+
+def minmax(x: np.ndarray, y: np.ndarray, n_bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Keeps the minimum and maximum sample of each of `n_bins` equal-width bins, in order."""
+    n = len(y)
+    if n <= 2 * n_bins:
+        return x, y
+    k = -(-n // n_bins)
+    padded = np.full(n_bins * k, np.nan)
+    padded[:n] = y
+    blocks = padded.reshape(n_bins, k)
+    base = np.arange(n_bins) * k
+    valid = base < n
+    lo = base[valid] + np.nanargmin(blocks[valid], axis=1)
+    hi = base[valid] + np.nanargmax(blocks[valid], axis=1)
+    idx = np.unique(np.concatenate(([0, n - 1], lo, hi)))
+    return x[idx], y[idx]
+
+def lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Largest-Triangle-Three-Buckets downsampling to `n_out` points."""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return x, y
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], max(edges[b + 1], edges[b] + 1)
+        if b + 2 < len(edges):
+            avg_x, avg_y = x[hi:edges[b + 2]].mean(), y[hi:edges[b + 2]].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[b + 1] = a
+    return x[idx], y[idx]
+
+def plot(ax, x: np.ndarray, y: np.ndarray, width: Optional[int] = None,
+         method: str = "minmax", **plot_kw):
+    """Plots `y` vs `x` on `ax` with at most ~2 points per pixel column of the axes."""
+    if width is None:
+        width = _axes_width(ax)
+    if method == "lttb":
+        x, y = lttb(x, y, 2 * width)
+    else:
+        x, y = minmax(x, y, width)
+    return ax.plot(x, y, **plot_kw)
+
+def _axes_width(ax) -> int:
+    fig = ax.figure
+    return max(int(ax.get_position().width * fig.get_figwidth() * fig.dpi), 100)
+
+# ==============================================================================
+# SECTION 2: UNIFORMLY SAMPLED STORE WITH A MIN/MAX PYRAMID
+# ==============================================================================
+
+class SampleStore:
+    """
+    Uniformly sampled waveform y[i] at t = t0 + i*dt plus a min/max pyramid.
+    Level k holds (min, max) pairs over PYRAMID_FACTOR**k raw samples.
+    Arrays are plain ndarrays (from_array) or np.memmap files (from_chunks/open);
+    from_function picks between the two by length.
+    """
+
+    def __init__(self, t0: float, dt: float, y: np.ndarray, levels: list):
+        self.t0 = float(t0)
+        self.dt = float(dt)
+        self.y = y
+        self.levels = levels
+        self._cleanup: Optional[weakref.finalize] = None
+
+    def close(self) -> None:
+        """Releases the samples and deletes the files of a store that owns them (from_function)."""
+        self.y, self.levels = np.empty(0), []
+        if self._cleanup is not None:
+            self._cleanup()
+
+    def __len__(self) -> int:
+        return len(self.y)
+
+    @property
+    def t_end(self) -> float:
+        return self.t0 + (len(self.y) - 1) * self.dt
+
+    # --- Construction ---
+    @classmethod
+    def from_array(cls, y: np.ndarray, t0: float, dt: float) -> "SampleStore":
+        """Builds an in-memory store (and its pyramid) from an existing array."""
+        y = np.asarray(y, dtype=float)
+        levels, prev = [], np.stack([y, y], axis=1)
+        while len(prev) > PYRAMID_FACTOR:
+            prev = _reduce_pairs(prev)
+            levels.append(prev)
+        return cls(t0, dt, y, levels)
+
+    @classmethod
+    def from_chunks(cls, path: str, t0: float, dt: float, chunks: Iterable[np.ndarray]) -> "SampleStore":
+        """
+        Streams sample chunks to `path` (raw float64) and builds the pyramid
+        files next to it, never holding more than one chunk in memory.
+        """
+        with open(path + ".y.f64", "wb") as fh:
+            for chunk in chunks:
+                np.asarray(chunk, dtype=np.float64).tofile(fh)
+        y = np.memmap(path + ".y.f64", dtype=np.float64, mode="r")
+        level, src = 1, np.lib.stride_tricks.as_strided(y, (len(y), 2), (y.strides[0], 0))
+        while len(src) > PYRAMID_FACTOR:
+            dst_path = f"{path}.L{level}.f64"
+            with open(dst_path, "wb") as fh:
+                step = CHUNK - CHUNK % PYRAMID_FACTOR
+                for start in range(0, len(src), step):
+                    _reduce_pairs(np.asarray(src[start:start + step])).tofile(fh)
+            src = np.memmap(dst_path, dtype=np.float64, mode="r").reshape(-1, 2)
+            level += 1
+        with open(path + ".json", "w") as fh:
+            json.dump({"t0": t0, "dt": dt, "n": len(y), "levels": level - 1}, fh)
+        return cls.open(path)
+
+    @classmethod
+    def from_function(cls, func: Callable[[np.ndarray], np.ndarray], t0: float, dt: float, n: int,
+                      path: Optional[str] = None) -> "SampleStore":
+        """
+        Samples y = func(t) at n points. Up to CHUNK samples are kept in
+        memory; longer waveforms are generated CHUNK samples at a time into
+        from_chunks, at `path` or else in a temporary directory that is
+        removed on close() or when the store is garbage collected.
+        """
+        if n <= CHUNK:
+            return cls.from_array(func(t0 + np.arange(n) * dt), t0, dt)
+        chunks = (func(t0 + np.arange(start, min(start + CHUNK, n)) * dt) for start in range(0, n, CHUNK))
+        if path is not None:
+            return cls.from_chunks(path, t0, dt, chunks)
+        folder = tempfile.mkdtemp(prefix="waveform_")
+        try:
+            store = cls.from_chunks(os.path.join(folder, "store"), t0, dt, chunks)
+        except BaseException:
+            shutil.rmtree(folder, ignore_errors=True)
+            raise
+        # The store owns its files: close() or garbage collection deletes them
+        store._cleanup = weakref.finalize(store, shutil.rmtree, folder, ignore_errors=True)
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "SampleStore":
+        """Opens a store written by from_chunks without reading the samples."""
+        with open(path + ".json") as fh:
+            meta = json.load(fh)
+        y = np.memmap(path + ".y.f64", dtype=np.float64, mode="r")
+        levels = [np.memmap(f"{path}.L{k}.f64", dtype=np.float64, mode="r").reshape(-1, 2)
+                  for k in range(1, meta["levels"] + 1)]
+        return cls(meta["t0"], meta["dt"], y, levels)
+
+    @staticmethod
+    def temp_path() -> str:
+        """Returns a fresh base path in the temp directory for from_chunks."""
+        fd, path = tempfile.mkstemp(prefix="waveform_")
+        os.close(fd)
+        return path
+
+    # --- Decimated views ---
+    def view(self, t_start: float, t_end: float, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns at most ~2*width points covering [t_start, t_end]."""
+        n = len(self.y)
+        i0 = int(np.clip(np.floor((t_start - self.t0) / self.dt), 0, n - 1))
+        i1 = int(np.clip(np.ceil((t_end - self.t0) / self.dt) + 1, i0 + 1, n))
+        count = i1 - i0
+        if count <= 2 * width:
+            return self.t0 + np.arange(i0, i1) * self.dt, np.asarray(self.y[i0:i1])
+        # Coarsest pyramid level that still has at least `width` entries in the window
+        k = 0
+        while k < len(self.levels) and count / PYRAMID_FACTOR ** (k + 1) >= width:
+            k += 1
+        if k == 0:
+            return minmax(self.t0 + np.arange(i0, i1) * self.dt, np.asarray(self.y[i0:i1]), width)
+        scale = PYRAMID_FACTOR ** k
+        j0, j1 = i0 // scale, -(-i1 // scale)
+        block = np.asarray(self.levels[k - 1][j0:j1])
+        edges = np.linspace(0, len(block), width + 1).astype(int)[:-1]
+        lows = np.minimum.reduceat(block[:, 0], edges)
+        highs = np.maximum.reduceat(block[:, 1], edges)
+        t_col = self.t0 + (j0 + edges) * scale * self.dt
+        return np.repeat(t_col, 2), np.column_stack([lows, highs]).ravel()
+
+
+def _reduce_pairs(pairs: np.ndarray) -> np.ndarray:
+    """Merges consecutive PYRAMID_FACTOR rows of (min, max) pairs."""
+    edges = np.arange(0, len(pairs), PYRAMID_FACTOR)
+    return np.column_stack([np.minimum.reduceat(pairs[:, 0], edges),
+                            np.maximum.reduceat(pairs[:, 1], edges)])
+
+def attach(ax, store: SampleStore, width: Optional[int] = None, **plot_kw):
+    """
+    Plots a store on `ax` and re-decimates whenever the x-limits change
+    (zoom/pan in an interactive Matplotlib window).
+    """
+    width = width or _axes_width(ax)
+    line, = ax.plot(*store.view(store.t0, store.t_end, width), **plot_kw)
+
+    def on_xlim(axes):
+        line.set_data(*store.view(*axes.get_xlim(), width))
+
+    ax.callbacks.connect("xlim_changed", on_xlim)
+    ax.set_xlim(store.t0, store.t_end)
+    return line
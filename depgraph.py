@@ -0,0 +1,130 @@
+# depgraph.py
+# Contains a small dependency-graph evaluator for calculator outputs.
+# Each quantity is a named node computed from other nodes. Nodes are lazy
+# (computed only when read) and memoized (reused until an upstream input
+# changes), so changing one input only recomputes what depends on it.
+
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+
+import numpy as np
+
+
+class Graph:
+    """A set of named inputs and lazily evaluated, memoized formula nodes."""
+
+    def __init__(self):
+        self._inputs: Dict[str, Any] = {}
+        self._formulas: Dict[str, Tuple[Callable, List[str]]] = {}
+        self._dependents: Dict[str, Set[str]] = {}
+        self._cache: Dict[str, Any] = {}
+        self.evaluations = Counter()  # How often each node has been computed
+
+    def input(self, name: str, value: Any = None) -> None:
+        """Declares an input node, optionally with an initial value."""
+        self._inputs[name] = value
+        self._dependents.setdefault(name, set())
+
+    def node(self, name: str, func: Callable, deps: Iterable[str]) -> None:
+        """Declares `name = func(*deps)`."""
+        deps = list(deps)
+        for dep in deps:
+            if dep not in self._inputs and dep not in self._formulas:
+                raise KeyError(f"Unknown dependency '{dep}' for node '{name}'.")
+            self._dependents.setdefault(dep, set()).add(name)
+        self._formulas[name] = (func, deps)
+        self._dependents.setdefault(name, set())
+
+    def set(self, **values) -> Set[str]:
+        """
+        Updates inputs and invalidates everything downstream of the ones that
+        actually changed. Returns the set of invalidated nodes.
+        """
+        stale: Set[str] = set()
+        for name, value in values.items():
+            if name not in self._inputs:
+                raise KeyError(f"Unknown input '{name}'.")
+            if _same(self._inputs[name], value):
+                continue
+            self._inputs[name] = value
+            stale |= self._downstream(name)
+        for name in stale:
+            self._cache.pop(name, None)
+        return stale
+
+    def _downstream(self, name: str) -> Set[str]:
+        seen, stack = set(), [name]
+        while stack:
+            for child in self._dependents[stack.pop()]:
+                if child not in seen:
+                    seen.add(child)
+                    stack.append(child)
+        return seen
+
+    def __getitem__(self, name: str) -> Any:
+        if name in self._inputs:
+            return self._inputs[name]
+        if name not in self._cache:
+            func, deps = self._formulas[name]
+            self._cache[name] = func(*(self[dep] for dep in deps))
+            self.evaluations[name] += 1
+        return self._cache[name]
+
+    def get(self, *names: str) -> Tuple[Any, ...]:
+        """Reads several nodes at once."""
+        return tuple(self[name] for name in names)
+
+    def is_cached(self, name: str) -> bool:
+        return name in self._inputs or name in self._cache
+
+
+def _same(a: Any, b: Any) -> bool:
+    if a is b:
+        return True
+    try:
+        return bool(np.array_equal(a, b))
+    except Exception:
+        return False
+
+def _capacitive_reactance(omega, C):
+    """1/(omega*C), elementwise, with an open circuit (inf) where omega*C is not positive."""
+    wc = np.multiply(omega, C, dtype=float)
+    return np.divide(1.0, wc, out=np.full(wc.shape, np.inf), where=wc > 0)[()]
+
+# ==============================================================================
+# PREBUILT GRAPHS
+# ==============================================================================
+
+def series_rlc_graph(points_per_cycle: int = 200) -> Graph:
+    """Builds the graph of every quantity reported for a series RLC circuit."""
+    g = Graph()
+    for name in ("R", "L", "C", "V_peak", "f"):
+        g.input(name)
+    g.input("cycles", 3)
+
+    g.node("omega", lambda f: 2 * np.pi * f, ["f"])
+    g.node("Xl", lambda omega, L: omega * L, ["omega", "L"])
+    g.node("Xc", _capacitive_reactance, ["omega", "C"])
+    g.node("X_total", lambda Xl, Xc: Xl - Xc, ["Xl", "Xc"])
+    g.node("Z", lambda R, X: np.sqrt(R**2 + X**2), ["R", "X_total"])
+    g.node("phase_rad", lambda X, R: np.arctan2(X, R), ["X_total", "R"])
+    g.node("phase_deg", np.degrees, ["phase_rad"])
+    g.node("PF", np.cos, ["phase_rad"])
+
+    g.node("V_rms", lambda V_peak: V_peak / np.sqrt(2), ["V_peak"])
+    g.node("I_peak", lambda V_peak, Z: V_peak / Z, ["V_peak", "Z"])
+    g.node("I_rms", lambda V_rms, Z: V_rms / Z, ["V_rms", "Z"])
+
+    g.node("f0", lambda L, C: 1 / (2 * np.pi * np.sqrt(L * C)), ["L", "C"])
+    g.node("Q_factor", lambda R, L, C: (1 / R) * np.sqrt(L / C), ["R", "L", "C"])
+    g.node("BW", lambda f0, Q: f0 / Q, ["f0", "Q_factor"])
+
+    g.node("P_real", lambda I_rms, R: I_rms**2 * R, ["I_rms", "R"])
+    g.node("Q_reactive", lambda I_rms, X: I_rms**2 * X, ["I_rms", "X_total"])
+    g.node("S_apparent", lambda V_rms, I_rms: V_rms * I_rms, ["V_rms", "I_rms"])
+
+    g.node("t", lambda f, cycles: np.linspace(0, cycles / f, int(cycles * points_per_cycle) + 1), ["f", "cycles"])
+    g.node("omega_t", lambda omega, t: omega * t, ["omega", "t"])
+    g.node("v_wave", lambda V_peak, wt: V_peak * np.sin(wt), ["V_peak", "omega_t"])
+    g.node("i_wave", lambda I_peak, wt, phase: I_peak * np.sin(wt - phase), ["I_peak", "omega_t", "phase_rad"])
+    return g
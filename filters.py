@@ -0,0 +1,365 @@
+# filters.py
+# Contains higher-order active filter synthesis.
+# Normalized low-pass prototypes (Butterworth, Chebyshev, Bessel, elliptic,
+# orders 1-10) are computed once and cached as second-order sections. Low-,
+# high- and band-pass responses are obtained by substituting the normalized
+# frequency variable, and a cascade response is one broadcast product over
+# stages x frequencies, so many orders/cutoffs are evaluated in a single call.
+# All-pole designs are realized as unity-gain Sallen-Key (low/high-pass) or
+# MFB (band-pass) stages with E-series components.
+
+from functools import lru_cache
+from math import factorial
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from helpers import nearest_standard_value
+
+KINDS = ("butterworth", "chebyshev", "bessel", "elliptic")
+RESPONSES = ("lowpass", "highpass", "bandpass")
+MAX_ORDER = 10
+IDENTITY = np.array([0.0, 0.0, 1.0, 0.0, 0.0, 1.0])  # Section [b2, b1, b0, a2, a1, a0] with H = 1
+
+# ==============================================================================
+# SECTION 1: NORMALIZED LOW-PASS PROTOTYPES
+# ==============================================================================
+
+def _butterworth(n: int):
+    k = np.arange(1, n + 1)
+    return np.array([]), np.exp(1j * np.pi * (2 * k + n - 1) / (2 * n)), 1.0
+
+def _chebyshev(n: int, ripple_db: float):
+    eps = np.sqrt(10 ** (ripple_db / 10) - 1)
+    mu = np.arcsinh(1 / eps) / n
+    theta = np.pi * (2 * np.arange(1, n + 1) - 1) / (2 * n)
+    poles = -np.sinh(mu) * np.sin(theta) + 1j * np.cosh(mu) * np.cos(theta)
+    return np.array([]), poles, 1.0 if n % 2 else 1 / np.sqrt(1 + eps**2)
+
+def _bessel(n: int):
+    # Reverse Bessel polynomial, then rescaled so that |H(j1)| = -3 dB
+    coeffs = [factorial(2 * n - k) / (2 ** (n - k) * factorial(k) * factorial(n - k)) for k in range(n + 1)]
+    poles = np.roots(coeffs[::-1])
+    lo, hi = 0.1, 10.0
+    for _ in range(60):
+        w = np.sqrt(lo * hi)
+        if np.prod(np.abs(poles)**2 / np.abs(1j * w - poles)**2) > 0.5:
+            lo = w
+        else:
+            hi = w
+    return np.array([]), poles / np.sqrt(lo * hi), 1.0
+
+# --- Elliptic (Jacobi elliptic functions via descending Landen transformations) ---
+def _landen(k: float, steps: int = 8) -> List[float]:
+    v = []
+    for _ in range(steps):
+        k = (k / (1 + np.sqrt(1 - k**2)))**2
+        v.append(k)
+    return v
+
+def _cde(u, k):
+    """cd(u*K, k) for complex u."""
+    w = np.cos(np.asarray(u) * np.pi / 2)
+    for vn in reversed(_landen(k)):
+        w = (1 + vn) * w / (1 + vn * w**2)
+    return w
+
+def _sne(u, k):
+    """sn(u*K, k) for complex u."""
+    w = np.sin(np.asarray(u) * np.pi / 2)
+    for vn in reversed(_landen(k)):
+        w = (1 + vn) * w / (1 + vn * w**2)
+    return w
+
+def _asne(w, k):
+    """Inverse of _sne: u such that sn(u*K, k) = w."""
+    v = _landen(k)
+    prev = k
+    for vn in v:
+        w = w / (1 + np.sqrt(1 - w**2 * prev**2)) * 2 / (1 + vn)
+        prev = vn
+    return 2 / np.pi * np.arcsin(w + 0j)
+
+def _elliptic(n: int, ripple_db: float, stop_db: float):
+    ep = np.sqrt(10 ** (ripple_db / 10) - 1)
+    es = np.sqrt(10 ** (stop_db / 10) - 1)
+    k1 = ep / es
+    k1p = np.sqrt(1 - k1**2)
+    half = n // 2
+    u = (2 * np.arange(1, half + 1) - 1) / n
+    # Degree equation: selectivity k for the requested order and k1
+    kp = k1p**n * np.prod(_sne(u, k1p).real**4)
+    k = np.sqrt(1 - kp**2)
+    zeta = _cde(u, k).real
+    zeros = 1j / (k * zeta)
+    v0 = -1j * _asne(1j / ep, k1) / n
+    poles = 1j * _cde(u - 1j * v0, k)
+    if n % 2:
+        poles = np.append(poles, 1j * _sne(1j * v0, k))
+    poles = np.concatenate([poles, np.conj(poles[:half])])
+    zeros = np.concatenate([zeros, np.conj(zeros)])
+    return zeros, poles, 1.0 if n % 2 else 1 / np.sqrt(1 + ep**2)
+
+@lru_cache(maxsize=None)
+def prototype(kind: str, order: int, ripple_db: float = 1.0, stop_db: float = 40.0):
+    """
+    Normalized low-pass prototype as (zeros, poles, dc_gain).
+    The cutoff is ω = 1: the -3 dB point for Butterworth and Bessel, the
+    ripple band edge for Chebyshev and elliptic.
+    """
+    if not 1 <= order <= MAX_ORDER:
+        raise ValueError(f"Order must be between 1 and {MAX_ORDER}.")
+    if kind in ("chebyshev", "elliptic") and not ripple_db > 0:
+        raise ValueError("Passband ripple must be greater than 0 dB.")
+    if kind == "elliptic" and not stop_db > ripple_db:
+        raise ValueError("Stopband attenuation must be greater than the passband ripple.")
+    if kind == "butterworth":
+        return _butterworth(order)
+    if kind == "chebyshev":
+        return _chebyshev(order, ripple_db)
+    if kind == "bessel":
+        return _bessel(order)
+    if kind == "elliptic":
+        return _elliptic(order, ripple_db, stop_db)
+    raise ValueError(f"Unknown filter type '{kind}'.")
+
+@lru_cache(maxsize=None)
+def prototype_sections(kind: str, order: int, ripple_db: float = 1.0, stop_db: float = 40.0) -> np.ndarray:
+    """
+    Prototype as rows [b2, b1, b0, a2, a1, a0] (numerator/denominator in s),
+    one row per second-order (or first-order) section, lowest Q first.
+    Each section has unity DC gain except the first, which carries dc_gain.
+    """
+    zeros, poles, dc_gain = prototype(kind, order, ripple_db, stop_db)
+    upper = sorted([p for p in poles if p.imag > 1e-12], key=lambda p: abs(p) / (-2 * p.real))
+    reals = [p.real for p in poles if abs(p.imag) <= 1e-12]
+    zero_pairs = sorted([z for z in zeros if z.imag > 0], key=lambda z: abs(z))
+    rows = []
+    for p in reals:
+        rows.append([0.0, 0.0, -p, 0.0, 1.0, -p])
+    for i, p in enumerate(upper):
+        w2 = abs(p)**2
+        den = [1.0, -2 * p.real, w2]
+        # Highest-Q poles get the closest zeros (elliptic only)
+        j = i - (len(upper) - len(zero_pairs))
+        num = [w2 / abs(zero_pairs[j])**2, 0.0, w2] if j >= 0 else [0.0, 0.0, w2]
+        rows.append(num + den)
+    rows = np.array(rows)
+    rows[0, :3] *= dc_gain
+    rows.setflags(write=False)
+    return rows
+
+@lru_cache(maxsize=None)
+def section_table(kind: str, ripple_db: float = 1.0, stop_db: float = 40.0) -> np.ndarray:
+    """All orders 1..MAX_ORDER stacked as (MAX_ORDER, max_sections, 6), padded with identity sections."""
+    table = np.tile(IDENTITY, (MAX_ORDER, (MAX_ORDER + 1) // 2, 1))
+    for n in range(1, MAX_ORDER + 1):
+        rows = prototype_sections(kind, n, ripple_db, stop_db)
+        table[n - 1, :len(rows)] = rows
+    table.setflags(write=False)
+    return table
+
+# ==============================================================================
+# SECTION 2: VECTORIZED RESPONSES
+# ==============================================================================
+
+def normalized_s(f, fc, response: str = "lowpass", bandwidth=None):
+    """
+    Maps physical frequency f (Hz) onto the prototype variable S.
+    For band-pass, fc is the centre frequency and `bandwidth` the passband width (Hz).
+    """
+    s = 1j * np.asarray(f, dtype=float)
+    if response == "lowpass":
+        return s / fc
+    if response == "highpass":
+        return fc / s
+    if response == "bandpass":
+        return (s**2 + fc**2) / (bandwidth * s)
+    raise ValueError(f"Unknown response '{response}'.")
+
+def cascade_response(sections: np.ndarray, S) -> np.ndarray:
+    """
+    Product of all sections evaluated at S.
+    sections: (..., n_stages, 6); S: (..., n_freqs). Leading dimensions broadcast.
+    """
+    sec = np.asarray(sections)[..., :, None, :]
+    S = np.asarray(S)[..., None, :]
+    num = (sec[..., 0] * S + sec[..., 1]) * S + sec[..., 2]
+    den = (sec[..., 3] * S + sec[..., 4]) * S + sec[..., 5]
+    return np.prod(num / den, axis=-2)
+
+def response(kind: str, order: int, fc, f, response: str = "lowpass", bandwidth=None,
+             ripple_db: float = 1.0, stop_db: float = 40.0) -> np.ndarray:
+    """Complex frequency response of a designed filter at frequencies f (fc may be an array)."""
+    S = normalized_s(f, np.asarray(fc)[..., None] if np.ndim(fc) else fc, response, bandwidth)
+    return cascade_response(prototype_sections(kind, order, ripple_db, stop_db), S)
+
+def min_order(kind: str, f_pass: float, f_stop: float, pass_db: float, stop_db: float,
+              response: str = "lowpass", ripple_db: float = 1.0) -> Optional[int]:
+    """
+    Lowest order whose loss is at most pass_db at f_pass and at least stop_db
+    at f_stop (cutoff placed at f_pass). All orders are evaluated in one call.
+    Low-pass and high-pass only.
+    """
+    if response not in ("lowpass", "highpass"):
+        raise ValueError("min_order supports low-pass and high-pass responses.")
+    table = section_table(kind, ripple_db, stop_db)
+    if kind in ("butterworth", "bessel"):
+        # -3 dB cutoff: move it outward until f_pass meets pass_db, order by order
+        fcs = np.array([_fit_cutoff(kind, n, f_pass, pass_db, response) for n in range(1, MAX_ORDER + 1)])
+    else:
+        fcs = np.full(MAX_ORDER, f_pass)
+    S = normalized_s(np.array([f_pass, f_stop])[None, :], fcs[:, None], response)
+    loss = -20 * np.log10(np.abs(cascade_response(table, S)))
+    ok = (loss[:, 0] <= pass_db + 1e-3) & (loss[:, 1] >= stop_db)
+    return int(np.argmax(ok)) + 1 if ok.any() else None
+
+def _fit_cutoff(kind: str, order: int, f_pass: float, pass_db: float, response: str) -> float:
+    ratios = np.logspace(-1, 1, 4001)
+    loss = -20 * np.log10(np.abs(cascade_response(prototype_sections(kind, order), 1j * ratios)))
+    x = np.interp(pass_db, loss, ratios)  # Normalized frequency with exactly pass_db loss
+    return f_pass / x if response == "lowpass" else f_pass * x
+
+# ==============================================================================
+# SECTION 3: REALIZATION WITH E-SERIES COMPONENTS
+# ==============================================================================
+
+def _snap(value: float, series: Optional[str]) -> float:
+    """Nearest standard value, or the exact value when series is None."""
+    return value if series is None else nearest_standard_value(value, series)
+
+def stage_targets(kind: str, order: int, fc: float, response: str = "lowpass", bandwidth=None,
+                  ripple_db: float = 1.0) -> List[Tuple[str, float, float]]:
+    """
+    Physical stages as (stage_type, f0, Q); Q is None for first-order stages.
+    Band-pass designs map every prototype pole to one second-order band-pass
+    stage (a real prototype pole gives a stage centred on fc, possibly with
+    Q < 0.5), so each stage carries exactly one zero at the origin.
+    """
+    if kind == "elliptic":
+        raise ValueError("Elliptic stages need notch sections; Sallen-Key/MFB only realize all-pole filters.")
+    _, poles, _ = prototype(kind, order, ripple_db)
+    stages = []
+    if response == "bandpass":
+        w0, B = 2 * np.pi * fc, 2 * np.pi * bandwidth
+        for p in poles:
+            if abs(p.imag) <= 1e-12:
+                stages.append((response, fc, w0 / (-p.real * B)))
+            elif p.imag > 0:
+                root = np.sqrt((p * B)**2 - 4 * w0**2 + 0j)
+                for r in ((p * B + root) / 2, (p * B - root) / 2):
+                    stages.append((response, abs(r) / (2 * np.pi), abs(r) / (-2 * r.real)))
+        return sorted(stages, key=lambda st: st[2])
+    mapped = poles * 2 * np.pi * fc if response == "lowpass" else 2 * np.pi * fc / poles
+    for p in sorted(mapped, key=lambda p: abs(p) / max(-2 * p.real, 1e-300)):
+        if abs(p.imag) <= 1e-9 * abs(p):
+            stages.append((response, -p.real / (2 * np.pi), None))
+        elif p.imag > 0:
+            stages.append((response, abs(p) / (2 * np.pi), abs(p) / (-2 * p.real)))
+    return stages
+
+def _input_resistor(R: float, gain: float, series: Optional[str]):
+    """Input resistor R, or a divider with Thevenin resistance R and ratio gain < 1: (parts, R_th, ratio)."""
+    if gain >= 1:
+        R = _snap(R, series)
+        return {"R1": R}, R, 1.0
+    Ra, Rb = _snap(R / gain, series), _snap(R / (1 - gain), series)
+    return {"R1a": Ra, "R1b": Rb}, Ra * Rb / (Ra + Rb), Rb / (Ra + Rb)
+
+def _input_capacitor(C: float, gain: float, series: Optional[str]):
+    """Input capacitor C, or a capacitive divider totalling C with ratio gain < 1: (parts, C_th, ratio)."""
+    if gain >= 1:
+        C = _snap(C, series)
+        return {"C1": C}, C, 1.0
+    Ca, Cb = _snap(gain * C, series), _snap((1 - gain) * C, series)
+    return {"C1a": Ca, "C1b": Cb}, Ca + Cb, Ca / (Ca + Cb)
+
+def realize(kind: str, order: int, fc: float, response: str = "lowpass", bandwidth=None,
+            ripple_db: float = 1.0, C_base: float = 10e-9, series: Optional[str] = "E24") -> List[Dict[str, float]]:
+    """
+    Component values for each stage, snapped to standard values (capacitors
+    E12, resistors `series`; series=None keeps exact values), with the f0,
+    Q and gain actually achieved by those values.
+
+    The prototype's passband gain (below 1 for even-order Chebyshev) goes
+    into the first stage as an input divider (low/high-pass) or as MFB gain
+    (band-pass). Band-pass stages get unity gain at the band centre; when
+    that needs more than the MFB's Q² gain, an MFB with gain Q² is followed
+    by a non-inverting gain stage (Rg, Rf).
+    """
+    c_series = None if series is None else "E12"
+    _, _, dc_gain = prototype(kind, order, ripple_db)
+    stages = []
+    for i, (stage_type, f0, Q) in enumerate(stage_targets(kind, order, fc, response, bandwidth, ripple_db)):
+        w0 = 2 * np.pi * f0
+        gain = dc_gain if i == 0 else 1.0
+        if Q is None:
+            C = _snap(C_base, c_series)
+            if stage_type == "lowpass":
+                parts, R, g = _input_resistor(1 / (w0 * C), gain, series)
+                parts["C1"] = C
+            else:
+                R = _snap(1 / (w0 * C), series)
+                parts, C, g = _input_capacitor(C, gain, c_series)
+                parts["R1"] = R
+            stages.append({"topology": "RC + buffer", "type": stage_type, "f0": f0, "Q": None, **parts,
+                           "f0_actual": 1 / (2 * np.pi * R * C), "Q_actual": None, "gain": g})
+        elif stage_type == "lowpass":
+            C2 = _snap(C_base, c_series)
+            C1 = _snap(4 * Q**2 * C2, c_series)
+            parts, R1, g = _input_resistor(1 / (w0 * np.sqrt(C1 * C2)), gain, series)
+            R2 = _snap(1 / (w0 * np.sqrt(C1 * C2)), series)
+            stages.append({"topology": "Sallen-Key", "type": stage_type, "f0": f0, "Q": Q,
+                           **parts, "R2": R2, "C1": C1, "C2": C2,
+                           "f0_actual": 1 / (2 * np.pi * np.sqrt(R1 * R2 * C1 * C2)),
+                           "Q_actual": np.sqrt(R1 * R2 * C1 * C2) / (C2 * (R1 + R2)), "gain": g})
+        elif stage_type == "highpass":
+            parts, C1, g = _input_capacitor(C_base, gain, c_series)
+            C2 = _snap(C_base, c_series)
+            R1 = _snap(1 / (2 * Q * w0 * C_base), series)
+            R2 = _snap(2 * Q / (w0 * C_base), series)
+            stages.append({"topology": "Sallen-Key", "type": stage_type, "f0": f0, "Q": Q,
+                           "R1": R1, "R2": R2, **parts, "C2": C2,
+                           "f0_actual": 1 / (2 * np.pi * np.sqrt(R1 * R2 * C1 * C2)),
+                           "Q_actual": np.sqrt(R1 * R2 * C1 * C2) / (R1 * (C1 + C2)), "gain": g})
+        else:
+            C = _snap(C_base, c_series)
+            # Peak gain for `gain` at the band centre: |H(fc)| = G / sqrt(1 + (Q x)^2)
+            x = fc / f0 - f0 / fc
+            G = gain * np.sqrt(1 + (Q * x)**2)
+            G_mfb = min(G, Q**2)
+            R1 = _snap(Q / (G_mfb * w0 * C), series)
+            R2 = _snap(Q / ((2 * Q**2 - G_mfb) * w0 * C), series)
+            R3 = _snap(2 * Q / (w0 * C), series)
+            stage = {"topology": "MFB", "type": stage_type, "f0": f0, "Q": Q,
+                     "R1": R1, "R2": R2, "R3": R3, "C1": C, "C2": C,
+                     "f0_actual": np.sqrt((R1 + R2) / (R1 * R2 * R3)) / (2 * np.pi * C),
+                     "Q_actual": 0.5 * np.sqrt(R3 * (R1 + R2) / (R1 * R2)), "gain": R3 / (2 * R1), "post_gain": 1.0}
+            if G > G_mfb * (1 + 1e-9):
+                Rg = _snap(10e3, series)
+                Rf = _snap((G / G_mfb - 1) * Rg, series)
+                stage.update({"topology": "MFB + gain stage", "Rg": Rg, "Rf": Rf, "post_gain": 1 + Rf / Rg})
+            stages.append(stage)
+    return stages
+
+def stage_sections(stages: List[Dict[str, float]]) -> np.ndarray:
+    """Realized stages as [b2, b1, b0, a2, a1, a0] rows in the physical variable s = j2πf."""
+    rows = []
+    for st in stages:
+        w0 = 2 * np.pi * st["f0_actual"]
+        g = st.get("gain", 1.0)
+        if st["Q_actual"] is None:
+            rows.append([0.0, 0.0, g * w0, 0.0, 1.0, w0] if st["type"] == "lowpass" else [0.0, g, 0.0, 0.0, 1.0, w0])
+            continue
+        den = [1.0, w0 / st["Q_actual"], w0**2]
+        if st["type"] == "lowpass":
+            rows.append([0.0, 0.0, g * w0**2] + den)
+        elif st["type"] == "highpass":
+            rows.append([g, 0.0, 0.0] + den)
+        else:
+            rows.append([0.0, -g * st.get("post_gain", 1.0) * w0 / st["Q_actual"], 0.0] + den)
+    return np.array(rows)
+
+def realized_response(stages: List[Dict[str, float]], f) -> np.ndarray:
+    """Frequency response of the cascade built from the (snapped) component values."""
+    return cascade_response(stage_sections(stages), 2j * np.pi * np.asarray(f, dtype=float))
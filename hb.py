@@ -0,0 +1,370 @@
+# hb.py
+# Contains a harmonic-balance solver for the periodic steady state of
+# driven circuits with nonlinear devices.
+#
+# The unknowns are the Fourier coefficients (DC + K harmonics) of every MNA
+# unknown. The linear part is exact per harmonic: A(jkω) X_k, with A built
+# from the mna stamps for all harmonics at once. Nonlinear device currents
+# are evaluated in the time domain: the harmonics go to one period of
+# samples with an inverse FFT, the device equations run on the samples, and
+# the currents come back with an FFT (spectral.harmonics). Newton's method
+# solves the balance, with the device conductances sampled over the period
+# forming the harmonic conversion matrices of the Jacobian. Start-up
+# transients never have to be simulated, which is where a time-stepping
+# run spends most of its cycles (see benchmark()).
+
+import time
+from typing import Dict, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+import analysis
+import mna
+import spectral
+
+GMIN = 1e-12          # Conductance across every junction, as in SPICE
+EXP_LIMIT = 40.0      # Junction exponent beyond which the diode law continues linearly
+
+# ==============================================================================
+# SECTION 1: NONLINEAR DEVICES
+# ==============================================================================
+
+def _junction(v: np.ndarray, Is: float, nVt: float):
+    """Diode current Is*(exp(v/nVt) - 1) and its conductance, linearized above EXP_LIMIT."""
+    v_max = EXP_LIMIT * nVt
+    e = np.exp(np.minimum(v, v_max) / nVt)
+    g = Is * e / nVt
+    i = Is * (e - 1) + g * np.maximum(v - v_max, 0.0)
+    return i + GMIN * v, g + GMIN
+
+
+class Diode(NamedTuple):
+    """Junction diode from anode to cathode."""
+    anode: int
+    cathode: int
+    Is: float = 1e-14
+    n: float = 1.0
+
+    @property
+    def nodes(self):
+        return (self.anode, self.cathode)
+
+    def evaluate(self, v: np.ndarray):
+        """Terminal currents (leaving each node into the device) and their Jacobian for v of shape (2, Nt)."""
+        i, g = _junction(v[0] - v[1], self.Is, self.n * analysis.VT)
+        return np.stack([i, -i]), np.array([[g, -g], [-g, g]])
+
+
+class BJT(NamedTuple):
+    """NPN transistor, Ebers-Moll transport model."""
+    collector: int
+    base: int
+    emitter: int
+    Is: float = 1e-14
+    beta_f: float = 100.0
+    beta_r: float = 1.0
+
+    @property
+    def nodes(self):
+        return (self.collector, self.base, self.emitter)
+
+    def evaluate(self, v: np.ndarray):
+        vc, vb, ve = v
+        i_f, g_f = _junction(vb - ve, self.Is, analysis.VT)
+        i_r, g_r = _junction(vb - vc, self.Is, analysis.VT)
+        ic = i_f - i_r * (1 + 1 / self.beta_r)
+        ib = i_f / self.beta_f + i_r / self.beta_r
+        # Derivatives with respect to (vc, vb, ve); d(vbe) = (0, 1, -1), d(vbc) = (-1, 1, 0)
+        zero = np.zeros_like(g_f)
+        d_vbe = np.stack([zero, g_f, -g_f])
+        d_vbc = np.stack([-g_r, g_r, zero])
+        dic = d_vbe - d_vbc * (1 + 1 / self.beta_r)
+        dib = d_vbe / self.beta_f + d_vbc / self.beta_r
+        return np.stack([ic, ib, -(ic + ib)]), np.stack([dic, dib, -(dic + dib)])
+
+# ==============================================================================
+# SECTION 2: HARMONIC BALANCE
+# ==============================================================================
+
+Waveform = Union[float, np.ndarray]
+
+def _mna_matrices(top: mna.Topology, values: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Dense MNA matrices A(s) for every s, shape (len(s), size, size)."""
+    rows, cols, elems, signs, uses = top.stamps()
+    terms = top.element_terms(values[None].astype(complex), s[:, None])
+    coef = signs * np.where(uses, terms[:, elems], 1.0)
+    A = np.zeros((len(s), top.size * top.size), dtype=complex)
+    np.add.at(A, (np.arange(len(s))[:, None], (rows * top.size + cols)[None, :]), coef)
+    return A.reshape(len(s), top.size, top.size)
+
+def _source_phasors(top: mna.Topology, values: np.ndarray, waveforms: Dict[str, Waveform], K: int):
+    """Right-hand-side harmonics (K+1, size): DC part (circuit values) and driven part (waveforms)."""
+    base = values.copy()
+    drive = np.zeros((K + 1, top.size), dtype=complex)
+    for name, w in waveforms.items():
+        e = top.index(name)
+        base[e] = 0.0
+        unit = np.zeros((1, len(values)))
+        unit[0, e] = 1.0
+        if np.ndim(w) == 0:
+            P = np.zeros(K + 1, dtype=complex)
+            P[0] = float(w)
+        else:
+            H = spectral.harmonics(np.asarray(w, dtype=float))
+            P = np.zeros(K + 1, dtype=complex)
+            P[:min(K + 1, len(H))] = H[:K + 1]
+        drive += P[:, None] * top.rhs(unit)[0][None, :]
+    static = np.zeros((K + 1, top.size), dtype=complex)
+    static[0] = top.rhs(base[None])[0]
+    return static, drive
+
+def _to_real(X: np.ndarray) -> np.ndarray:
+    """(K+1, n) complex harmonics -> (n, 2K+1) real coefficients [DC, Re1, Im1, Re2, Im2, ...]."""
+    Z = np.empty((X.shape[1], 2 * X.shape[0] - 1))
+    Z[:, 0] = X[0].real
+    Z[:, 1::2] = X[1:].real.T
+    Z[:, 2::2] = X[1:].imag.T
+    return Z
+
+def _to_complex(Z: np.ndarray) -> np.ndarray:
+    X = np.empty(((Z.shape[1] + 1) // 2, Z.shape[0]), dtype=complex)
+    X[0] = Z[:, 0]
+    X[1:] = (Z[:, 1::2] + 1j * Z[:, 2::2]).T
+    return X
+
+
+class _Balance:
+    """Residual and Jacobian of the harmonic-balance equations for one circuit and frequency."""
+
+    def __init__(self, circuit: mna.Circuit, devices: Sequence, f: float, K: int,
+                 waveforms: Dict[str, Waveform], oversample: int):
+        top = circuit.topology()
+        values = circuit.nominal()
+        self.n, self.K, self.C = top.size, K, 2 * K + 1
+        self.Nt = int(2 ** np.ceil(np.log2(max(oversample * self.C, 8))))
+        self.devices = list(devices)
+        self.A = _mna_matrices(top, values, 2j * np.pi * f * np.arange(K + 1))
+        self.static, self.drive = _source_phasors(top, values, waveforms, K)
+
+        # Real-coefficient <-> time-sample matrices for the conversion-matrix Jacobian
+        theta = 2 * np.pi * np.arange(self.Nt) / self.Nt
+        k = np.arange(1, K + 1)
+        self.T = np.ones((self.Nt, self.C))
+        self.T[:, 1::2] = np.cos(np.outer(theta, k))
+        self.T[:, 2::2] = -np.sin(np.outer(theta, k))
+        self.Gamma = self.T.T * (2.0 / self.Nt)
+        self.Gamma[0] /= 2
+
+        # Linear part of the Jacobian, indexed (node, coefficient, node, coefficient)
+        J = np.zeros((self.n, self.C, self.n, self.C))
+        J[:, 0, :, 0] = self.A[0].real
+        for h in range(1, K + 1):
+            re, im = 2 * h - 1, 2 * h
+            J[:, re, :, re] = J[:, im, :, im] = self.A[h].real
+            J[:, re, :, im] = -self.A[h].imag
+            J[:, im, :, re] = self.A[h].imag
+        self.J_linear = J
+
+    def waveforms(self, X: np.ndarray) -> np.ndarray:
+        """One period of every unknown, shape (Nt, n)."""
+        return spectral.from_harmonics(X, self.Nt, axis=0)
+
+    def _terminal_voltages(self, x_t: np.ndarray, nodes) -> np.ndarray:
+        return np.stack([x_t[:, a - 1] if a > 0 else np.zeros(self.Nt) for a in nodes])
+
+    def residual(self, Z: np.ndarray, scale: float = 1.0) -> np.ndarray:
+        X = _to_complex(Z)
+        F = np.einsum("kij,kj->ki", self.A, X) - self.static - scale * self.drive
+        x_t = self.waveforms(X)
+        for dev in self.devices:
+            I, _ = dev.evaluate(self._terminal_voltages(x_t, dev.nodes))
+            I_h = spectral.harmonics(I, axis=1)[:, :self.K + 1]
+            for p, a in enumerate(dev.nodes):
+                if a > 0:
+                    F[:, a - 1] += I_h[p]
+        return _to_real(F)
+
+    def jacobian(self, Z: np.ndarray) -> np.ndarray:
+        J = self.J_linear.copy()
+        x_t = self.waveforms(_to_complex(Z))
+        for dev in self.devices:
+            _, G = dev.evaluate(self._terminal_voltages(x_t, dev.nodes))
+            for p, a in enumerate(dev.nodes):
+                for q, b in enumerate(dev.nodes):
+                    if a > 0 and b > 0:
+                        J[a - 1, :, b - 1, :] += (self.Gamma * G[p, q]) @ self.T
+        size = self.n * self.C
+        return J.reshape(size, size)
+
+
+def _newton(bal: _Balance, Z: np.ndarray, scale: float, tol: float, max_iter: int):
+    F = bal.residual(Z, scale)
+    norm = np.max(np.abs(F))
+    for it in range(1, max_iter + 1):
+        dZ = np.linalg.solve(bal.jacobian(Z), -F.ravel()).reshape(Z.shape)
+        step = 1.0
+        while True:     # Damped Newton: halve the step until the residual drops
+            Z_new = Z + step * dZ
+            F_new = bal.residual(Z_new, scale)
+            norm_new = np.max(np.abs(F_new))
+            if norm_new < norm or step < 1e-3:
+                break
+            step /= 2
+        Z, F, norm = Z_new, F_new, norm_new
+        if norm < tol and np.max(np.abs(step * dZ)) < 1e-6 * (1 + np.max(np.abs(Z))):
+            return Z, it, norm, True
+    return Z, max_iter, norm, False
+
+def solve(circuit: mna.Circuit, devices: Sequence, f: float, waveforms: Optional[Dict[str, Waveform]] = None,
+          harmonics: int = 10, oversample: int = 4, tol: float = 1e-10, max_iter: int = 50,
+          initial: Optional[np.ndarray] = None) -> Dict[str, object]:
+    """
+    Periodic steady state of `circuit` plus nonlinear `devices` at
+    fundamental f. `waveforms` maps V/I source names to a DC value or one
+    period of samples; other sources keep their circuit value as DC.
+    If plain Newton fails, the drive is ramped up in steps (source stepping).
+    Returns the harmonics (K+1, size) and one period of every unknown.
+    """
+    bal = _Balance(circuit, devices, f, harmonics, waveforms or {}, oversample)
+    Z = np.zeros((bal.n, bal.C)) if initial is None else _to_real(initial)
+    iterations = 0
+    for steps in (1, 4, 16, 64):
+        Z_try, converged = Z.copy(), True
+        for scale in np.linspace(1 / steps, 1, steps):
+            Z_try, it, norm, converged = _newton(bal, Z_try, scale, tol, max_iter)
+            iterations += it
+            if not converged:
+                break
+        if converged:
+            Z = Z_try
+            break
+    X = _to_complex(Z_try if not converged else Z)
+    return {"f": f, "harmonics": X, "t": spectral.period_time(f, bal.Nt), "x": bal.waveforms(X),
+            "iterations": iterations, "residual": float(norm), "converged": converged}
+
+def node_harmonics(result: Dict[str, object], node: int) -> np.ndarray:
+    """Peak phasors (DC first) of a node voltage."""
+    return result["harmonics"][:, node - 1]
+
+def distortion(result: Dict[str, object], node: int) -> float:
+    """THD of a node voltage (ratio)."""
+    return spectral.thd(node_harmonics(result, node))
+
+# ==============================================================================
+# SECTION 3: GAIN COMPRESSION
+# ==============================================================================
+
+def compression(circuit: mna.Circuit, devices: Sequence, f: float, source: str, amplitudes,
+                out_node: int, harmonics: int = 10, oversample: int = 4) -> Dict[str, np.ndarray]:
+    """
+    Sweeps the peak amplitude of a sine on `source` (around its DC value)
+    and returns the fundamental output amplitude, gain, THD and the input
+    1 dB compression point. Each amplitude starts from the previous solution.
+    """
+    amplitudes = np.sort(np.asarray(amplitudes, dtype=float))
+    dc = circuit.values[circuit.names.index(source)]
+    n = 64
+    out, thd_out, X = [], [], None
+    for amp in amplitudes:
+        wave = dc + spectral.source_waveform("sine", amp, n)
+        res = solve(circuit, devices, f, {source: wave}, harmonics, oversample, initial=X)
+        X = res["harmonics"]
+        V = node_harmonics(res, out_node)
+        out.append(np.abs(V[1]))
+        thd_out.append(spectral.thd(V))
+    out = np.array(out)
+    gain_db = 20 * np.log10(out / amplitudes)
+    drop = gain_db[0] - gain_db
+    p1db = float(np.interp(1.0, drop, amplitudes)) if drop.max() >= 1.0 else float("nan")
+    return {"amplitude": amplitudes, "out": out, "gain_db": gain_db, "thd": np.array(thd_out),
+            "small_signal_gain_db": float(gain_db[0]), "input_p1db": p1db}
+
+# ==============================================================================
+# SECTION 4: TIME-DOMAIN REFERENCE, EXAMPLES AND BENCHMARK
+# ==============================================================================
+
+def transient(circuit: mna.Circuit, devices: Sequence, f: float, waveforms: Dict[str, Waveform],
+              cycles: int = 100, steps_per_cycle: int = 200, harmonics: int = 10) -> Dict[str, np.ndarray]:
+    """
+    Backward-Euler reference run from the DC operating point, with the same
+    device models and the same (harmonic-truncated) sources as solve().
+    """
+    top = circuit.topology()
+    values = circuit.nominal()
+    A = _mna_matrices(top, values, np.array([0.0, 1.0]))
+    G, Cm = A[0].real, (A[1] - A[0]).real
+    static, drive = _source_phasors(top, values, waveforms, harmonics)
+    h = 1 / (f * steps_per_cycle)
+    t = np.arange(1, cycles * steps_per_cycle + 1) * h
+    phase = np.exp(1j * 2 * np.pi * f * np.outer(t, np.arange(harmonics + 1)))
+    b_t = static[0].real + np.real(phase @ drive)
+
+    def currents(x):
+        I, J = np.zeros(top.size), np.zeros((top.size, top.size))
+        for dev in devices:
+            v = np.array([[x[a - 1]] if a > 0 else [0.0] for a in dev.nodes])
+            i, g = dev.evaluate(v)
+            for p, a in enumerate(dev.nodes):
+                if a > 0:
+                    I[a - 1] += i[p, 0]
+                    for q, b in enumerate(dev.nodes):
+                        if b > 0:
+                            J[a - 1, b - 1] += g[p, q, 0]
+        return I, J
+
+    def newton(M, rhs, x):
+        for _ in range(100):
+            I, J = currents(x)
+            dx = np.linalg.solve(M + J, rhs - M @ x - I)
+            x = x + dx
+            if np.max(np.abs(dx)) < 1e-9:
+                break
+        return x
+
+    x = newton(G, static[0].real + np.real(drive[0]), np.zeros(top.size))
+    M = Cm / h + G
+    out = np.empty((len(t), top.size))
+    for n in range(len(t)):
+        x = newton(M, b_t[n] + Cm @ x / h, x)
+        out[n] = x
+    return {"t": t, "x": out}
+
+def diode_clipper(R: float = 1e3, Is: float = 1e-14):
+    """Series resistor into anti-parallel diodes (output node 2), driven by V1."""
+    c = mna.Circuit()
+    c.add("V1", 1, 0, 0.0); c.add("R1", 1, 2, R)
+    return c, [Diode(2, 0, Is), Diode(0, 2, Is)]
+
+def ce_amplifier(Vcc=12.0, R1=47e3, R2=10e3, Rc=3.3e3, Re=1e3, beta=150.0,
+                 Ce=100e-6, Cin=10e-6, Rsig=50.0, Is=1e-14):
+    """
+    Voltage-divider common-emitter stage with an Ebers-Moll BJT, coupling
+    capacitor Cin and bypass capacitor Ce (nodes: 1 source, 2 after Rsig,
+    3 base, 4 emitter, 5 collector, 6 Vcc).
+    """
+    c = mna.Circuit()
+    c.add("Vsig", 1, 0, 0.0); c.add("Rsig", 1, 2, Rsig); c.add("Cin", 2, 3, Cin)
+    c.add("R1", 6, 3, R1); c.add("R2", 3, 0, R2); c.add("Rc", 6, 5, Rc)
+    c.add("Re", 4, 0, Re); c.add("Ce", 4, 0, Ce); c.add("Vcc", 6, 0, Vcc)
+    return c, [BJT(5, 3, 4, Is, beta)]
+
+def benchmark(f: float = 1e3, amplitude: float = 5e-3, harmonics: int = 10, cycles: int = 100) -> Dict[str, float]:
+    """
+    Steady state of the CE amplifier by harmonic balance versus a
+    backward-Euler run of `cycles` periods (the coupling capacitor needs
+    tens of periods to settle), comparing the collector fundamental.
+    """
+    c, devs = ce_amplifier()
+    wave = {"Vsig": spectral.source_waveform("sine", amplitude, 64)}
+    t0 = time.perf_counter()
+    res = solve(c, devs, f, wave, harmonics)
+    t_hb = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    tr = transient(c, devs, f, wave, cycles, harmonics=harmonics)
+    t_tr = time.perf_counter() - t0
+    last = tr["x"][-200:, 4]
+    V_tr = spectral.harmonics(last)
+    V_hb = node_harmonics(res, 5)
+    return {"hb_s": t_hb, "transient_s": t_tr, "speedup": t_tr / t_hb,
+            "gain_hb": float(np.abs(V_hb[1]) / amplitude), "gain_transient": float(np.abs(V_tr[1]) / amplitude),
+            "thd_hb": spectral.thd(V_hb), "thd_transient": spectral.thd(V_tr), "iterations": res["iterations"]}
@@ -1,7 +1,8 @@
 # helpers.py
 # Contains utility functions for user input and parsing.
 
-from typing import Optional
+import math
+from typing import List, Optional
 
 def parse_engineering_notation(val_str: str) -> Optional[float]:
     """
@@ -14,8 +15,8 @@ def parse_engineering_notation(val_str: str) -> Optional[float]:
     """
     val_str = val_str.strip()
     suffixes = {
-        'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
-        'k': 1e3,   'M': 1e6, 'G': 1e9
+        'f': 1e-15, 'p': 1e-12, 'n': 1e-9, 'u': 1e-6, 'm': 1e-3,
+        'k': 1e3,   'M': 1e6, 'G': 1e9, 'T': 1e12
     }
     if not val_str:
         return None
@@ -32,6 +33,39 @@ def parse_engineering_notation(val_str: str) -> Optional[float]:
     except ValueError:
         return None
 
+E_SERIES = {
+    'E12': [1.0, 1.2, 1.5, 1.8, 2.2, 2.7, 3.3, 3.9, 4.7, 5.6, 6.8, 8.2],
+    'E24': [1.0, 1.1, 1.2, 1.3, 1.5, 1.6, 1.8, 2.0, 2.2, 2.4, 2.7, 3.0,
+            3.3, 3.6, 3.9, 4.3, 4.7, 5.1, 5.6, 6.2, 6.8, 7.5, 8.2, 9.1],
+}
+
+def standard_values(low: float, high: float, series: str = 'E24') -> List[float]:
+    """
+    Returns the standard component values of an E-series between low and high.
+
+    Examples:
+    standard_values(100, 200, 'E12') -> [100.0, 120.0, 150.0, 180.0]
+    """
+    values = []
+    decade = 10.0 ** int(f"{low:e}".split('e')[1])
+    while decade <= high:
+        # Round to the series' significant figures (not absolute decimals), so pF and nH values survive
+        values += [v for v in (float(f"{m * decade:.3g}") for m in E_SERIES[series]) if low <= v <= high]
+        decade *= 10
+    return values
+
+def nearest_standard_value(value: float, series: str = 'E24') -> float:
+    """Returns the E-series value closest to `value` on a logarithmic scale."""
+    candidates = standard_values(value / 1.5, value * 1.5, series)
+    return min(candidates, key=lambda c: abs(math.log(c / value)))
+
+def parse_or_default(val_str: str, default: float) -> Optional[float]:
+    """
+    Like parse_engineering_notation, but a blank field gives `default`.
+    An entered 0 stays 0; an invalid entry still returns None.
+    """
+    return default if not val_str.strip() else parse_engineering_notation(val_str)
+
 def get_float(prompt: str, allow_blank: bool = False, default: Optional[float] = None) -> Optional[float]:
     """
     Gets a float from the user, with support for engineering notation.
@@ -0,0 +1,218 @@
+# jobs.py
+# Contains a checkpointed, resumable runner for long sweeps and Monte Carlo
+# runs over the vectorized analyses.
+#
+# A job is split into deterministic chunks of rows. Chunk k always covers
+# the same rows, and its random numbers come from its own generator spawned
+# from the job seed (SeedSequence(seed).spawn), so a chunk gives identical
+# results whether it runs first, last or again after a crash. Each finished
+# chunk is written to its own .npz file and then recorded in a JSON
+# manifest (both via atomic renames), so a restarted job skips everything
+# already in the manifest; nothing but the seed is needed to redo any other
+# chunk. merge() streams the chunk files into a resultstore without
+# recomputing anything.
+
+import hashlib
+import json
+import os
+import time
+from typing import Callable, Dict, Optional, Union
+
+import numpy as np
+
+import analysis
+import records
+import resultstore
+
+# ==============================================================================
+# SECTION 1: INPUT GENERATORS
+# ==============================================================================
+
+def grid_inputs(grid: Dict[str, np.ndarray]) -> Callable[[np.ndarray, np.random.Generator], Dict[str, np.ndarray]]:
+    """Inputs for rows of the Cartesian product of `grid` (row-major, first key slowest)."""
+    names = list(grid)
+    axes = [np.asarray(grid[n], dtype=float) for n in names]
+    shape = tuple(len(a) for a in axes)
+
+    def make(rows: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        idx = np.unravel_index(rows, shape)
+        return {n: a[i] for n, a, i in zip(names, axes, idx)}
+    return make
+
+def tolerance_inputs(nominal: Dict[str, float], tolerance: float = 0.05,
+                     fixed: Optional[Dict[str, float]] = None) -> Callable[[np.ndarray, np.random.Generator], Dict[str, np.ndarray]]:
+    """Inputs drawn uniformly within ±tolerance of each nominal value; `fixed` values are passed through."""
+    def make(rows: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        out = {n: v * rng.uniform(1 - tolerance, 1 + tolerance, len(rows)) for n, v in nominal.items()}
+        out.update(fixed or {})
+        return out
+    return make
+
+# ==============================================================================
+# SECTION 2: JOB RUNNER
+# ==============================================================================
+
+class Job:
+    """
+    Runs func(**make_inputs(rows, rng)) over n_rows rows in chunks of
+    chunk_rows, checkpointing after every chunk into path.manifest.json and
+    path.chunk<k>.npz. `func` may be a records.Schema, whose structured
+    batches are stored field by field. Creating a Job for an existing path resumes it; a
+    different configuration for the same path is refused.
+    """
+
+    def __init__(self, path: str, func: Union[Callable[..., Dict[str, np.ndarray]], records.Schema], n_rows: int,
+                 make_inputs: Callable[[np.ndarray, np.random.Generator], Dict[str, np.ndarray]],
+                 chunk_rows: int = 100_000, seed: int = 0, config: Optional[dict] = None):
+        self.path, self.func, self.make_inputs = path, func, make_inputs
+        self.n_rows, self.chunk_rows, self.seed = int(n_rows), int(chunk_rows), int(seed)
+        self.n_chunks = -(-self.n_rows // self.chunk_rows)
+        name = f"records.schema({func.name!r})" if isinstance(func, records.Schema) else f"{func.__module__}.{func.__qualname__}"
+        identity = {"func": name, "n_rows": self.n_rows,
+                    "chunk_rows": self.chunk_rows, "seed": self.seed, "config": config or {}}
+        self.config_hash = hashlib.sha1(json.dumps(identity, sort_keys=True, default=str).encode()).hexdigest()
+        self._seeds = np.random.SeedSequence(self.seed).spawn(self.n_chunks)
+        self.manifest = self._load_manifest()
+        self._session_rows, self._session_start = 0, None
+
+    # --- Manifest ---
+    @property
+    def manifest_path(self) -> str:
+        return self.path + ".manifest.json"
+
+    def chunk_path(self, k: int) -> str:
+        return f"{self.path}.chunk{k:06d}.npz"
+
+    def _load_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as fh:
+                manifest = json.load(fh)
+            if manifest["config_hash"] != self.config_hash:
+                raise ValueError(f"'{self.path}' belongs to a different job configuration.")
+            return manifest
+        return {"config_hash": self.config_hash, "n_rows": self.n_rows, "chunk_rows": self.chunk_rows,
+                "n_chunks": self.n_chunks, "seed": self.seed, "completed": {}, "elapsed_s": 0.0}
+
+    def _save_manifest(self) -> None:
+        tmp = self.manifest_path + ".tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.manifest, fh)
+        os.replace(tmp, self.manifest_path)
+
+    def pending(self) -> list:
+        done = self.manifest["completed"]
+        return [k for k in range(self.n_chunks) if str(k) not in done]
+
+    @property
+    def finished(self) -> bool:
+        return len(self.manifest["completed"]) == self.n_chunks
+
+    # --- Running ---
+    def run_chunk(self, k: int) -> Dict[str, np.ndarray]:
+        """Computes chunk k (pure: same output every time) without recording it."""
+        rows = np.arange(k * self.chunk_rows, min((k + 1) * self.chunk_rows, self.n_rows))
+        return self._block(rows, np.random.default_rng(self._seeds[k]))
+
+    def _block(self, rows: np.ndarray, rng: np.random.Generator) -> Dict[str, np.ndarray]:
+        inputs = self.make_inputs(rows, rng)
+        result = records.as_columns(self.func(**inputs))
+        block = {"row": rows}
+        block.update({n: np.broadcast_to(v, rows.shape) for n, v in inputs.items()})
+        block.update({n: np.broadcast_to(v, rows.shape) for n, v in result.items() if np.ndim(v) and n not in block})
+        return block
+
+    def run(self, max_chunks: Optional[int] = None, stop: Optional[Callable[[], bool]] = None,
+            on_progress: Optional[Callable[[dict], None]] = None) -> dict:
+        """
+        Runs pending chunks in order until done, max_chunks have run or
+        stop() returns True (checked between chunks). A crash or kill at any
+        point loses at most the chunk in flight. Returns progress().
+        """
+        self._session_start = time.perf_counter()
+        self._session_rows = 0
+        for count, k in enumerate(self.pending()):
+            if (max_chunks is not None and count >= max_chunks) or (stop is not None and stop()):
+                break
+            t0 = time.perf_counter()
+            block = self.run_chunk(k)
+            tmp = self.chunk_path(k) + ".tmp.npz"
+            np.savez(tmp, **block)
+            os.replace(tmp, self.chunk_path(k))
+            seconds = time.perf_counter() - t0
+            self.manifest["completed"][str(k)] = {"rows": int(len(block["row"])), "seconds": seconds,
+                                                  "spawn_key": list(self._seeds[k].spawn_key)}
+            self.manifest["elapsed_s"] += seconds
+            self._save_manifest()
+            self._session_rows += len(block["row"])
+            if on_progress is not None:
+                on_progress(self.progress())
+        return self.progress()
+
+    def progress(self) -> dict:
+        """Chunks and rows done, throughput of this session and of the whole job, and an ETA."""
+        done = self.manifest["completed"]
+        rows_done = sum(c["rows"] for c in done.values())
+        elapsed = self.manifest["elapsed_s"]
+        session = time.perf_counter() - self._session_start if self._session_start else 0.0
+        rate = rows_done / elapsed if elapsed > 0 else 0.0
+        return {"chunks_done": len(done), "chunks_total": self.n_chunks, "rows_done": rows_done,
+                "rows_total": self.n_rows, "fraction": rows_done / self.n_rows if self.n_rows else 1.0,
+                "rows_per_s": rate, "session_rows_per_s": self._session_rows / session if session > 0 else 0.0,
+                "eta_s": (self.n_rows - rows_done) / rate if rate > 0 else float("inf"),
+                "compute_s": elapsed}
+
+    # --- Output ---
+    def merge(self, store_path: Optional[str] = None) -> resultstore.ResultStore:
+        """Streams every chunk file, in row order, into a ResultStore (the job must be finished)."""
+        if not self.finished:
+            raise RuntimeError(f"{len(self.pending())} chunks are still pending.")
+        store_path = store_path or self.path + ".results"
+        if self.n_chunks == 0:
+            # An empty job still makes one (empty) call, which fixes the columns and dtypes
+            block = self._block(np.arange(0), np.random.default_rng(self.seed))
+            with resultstore.ResultWriter(store_path, {n: v.dtype for n, v in block.items()},
+                                          max(self.chunk_rows, 1)) as writer:
+                writer.append(block)
+            return resultstore.ResultStore(store_path)
+        writer = None
+        for k in range(self.n_chunks):
+            with np.load(self.chunk_path(k)) as data:
+                block = {n: data[n] for n in data.files}
+            if writer is None:
+                writer = resultstore.ResultWriter(store_path, {n: v.dtype for n, v in block.items()},
+                                                  max(self.chunk_rows, 1))
+            writer.append(block)
+        writer.close()
+        return resultstore.ResultStore(store_path)
+
+    def cleanup(self) -> None:
+        """Deletes the chunk files and the manifest (after merge)."""
+        for k in range(self.n_chunks):
+            if os.path.exists(self.chunk_path(k)):
+                os.remove(self.chunk_path(k))
+        if os.path.exists(self.manifest_path):
+            os.remove(self.manifest_path)
+
+# ==============================================================================
+# SECTION 3: READY-MADE JOBS
+# ==============================================================================
+
+def ce_monte_carlo_job(path: str, n: int = 10_000_000, Vcc: float = 12.0, R1: float = 47e3, R2: float = 10e3,
+                       Rc: float = 3.3e3, Re: float = 1e3, beta: float = 150.0, tolerance: float = 0.05,
+                       chunk_rows: int = 500_000, seed: int = 0) -> Job:
+    """Monte Carlo of the common-emitter stage with ±tolerance resistors and ±50% beta."""
+    def make(rows, rng):
+        inputs = tolerance_inputs({"R1": R1, "R2": R2, "Rc": Rc, "Re": Re}, tolerance)(rows, rng)
+        inputs["beta"] = beta * rng.uniform(0.5, 1.5, len(rows))
+        return inputs
+    func = lambda R1, R2, Rc, Re, beta: analysis.bjt_ce(Vcc, R1, R2, Rc, Re, beta)
+    config = {"analysis": "bjt_ce", "Vcc": Vcc, "nominal": [R1, R2, Rc, Re, beta], "tolerance": tolerance}
+    return Job(path, func, n, make, chunk_rows, seed, config)
+
+def rlc_sweep_job(path: str, R, L, C, f, V_peak: float = 1.0, chunk_rows: int = 500_000) -> Job:
+    """Grid sweep of the series RLC impedance analysis over arrays of R, L, C and f."""
+    grid = {"R": R, "L": L, "C": C, "f": f}
+    func = lambda R, L, C, f: analysis.rlc_series(R, L, C, V_peak, f)
+    config = {"analysis": "rlc_series", "V_peak": V_peak,
+              "grid": {k: np.asarray(v, dtype=float).tolist() for k, v in grid.items()}}
+    return Job(path, func, int(np.prod([len(v) for v in grid.values()])), grid_inputs(grid), chunk_rows, 0, config)
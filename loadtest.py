@@ -0,0 +1,443 @@
+# loadtest.py
+# Contains a concurrent-user load harness for the Streamlit pages.
+#
+# Each simulated user is a worker thread with its own session that keeps
+# picking a page (weighted towards the plot-heavy ones), filling the form
+# with values drawn from realistic distributions (E-series parts, typical
+# supplies and frequencies) and submitting it. Streamlit itself runs every
+# session's script in a thread of one process, so threads sharing the GIL
+# reproduce the contention of a real server. Pages are driven with
+# streamlit.testing's AppTest when Streamlit is installed; otherwise (or
+# with backend="standin") a minimal local stand-in for the `st` API runs the
+# same page scripts, including rendering every figure to PNG, so the cost
+# measured is the page's own computation and plotting.
+#
+# The report gives per-page throughput and p50/p95/p99 latency, plus process
+# memory per session. Inputs are seeded per user, so a run is repeatable:
+#   python loadtest.py --concurrency 1 4 16 --iterations 20
+
+import argparse
+import builtins
+import io
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+
+import opamp
+from helpers import standard_values
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# ==============================================================================
+# SECTION 1: SCENARIOS (PAGES AND INPUT DISTRIBUTIONS)
+# ==============================================================================
+
+def _eng(value: float) -> str:
+    """Formats a value the way a user would type it ("4.7k", "100n")."""
+    for suffix, scale in (("G", 1e9), ("M", 1e6), ("k", 1e3), ("", 1.0), ("m", 1e-3), ("u", 1e-6), ("n", 1e-9), ("p", 1e-12)):
+        if abs(value) >= scale:
+            return f"{value / scale:.3g}{suffix}"
+    return f"{value:.3g}"
+
+def _part(rng: np.random.Generator, low: float, high: float, series: str = 'E12') -> str:
+    return _eng(float(rng.choice(standard_values(low, high, series))))
+
+def _log_uniform(rng: np.random.Generator, low: float, high: float) -> str:
+    return _eng(float(np.exp(rng.uniform(np.log(low), np.log(high)))))
+
+
+class Scenario(NamedTuple):
+    page: str                                               # Script path relative to the repo root
+    submit: str                                             # Label of the button that runs the analysis ("" = none)
+    inputs: Callable[[np.random.Generator], Dict[str, str]]  # Widget key -> value for one submission
+    weight: float = 1.0
+    selects: Sequence[str] = ()                             # Keys that are selectboxes, not text inputs
+    numbers: Sequence[str] = ()                             # Keys that are number inputs
+
+
+def _ohm(rng):
+    values = {"v_input": _log_uniform(rng, 1, 48), "i_input": _log_uniform(rng, 1e-3, 2), "r_input": _part(rng, 10, 100e3)}
+    values[["v_input", "i_input", "r_input"][rng.integers(3)]] = ""
+    return values
+
+def _rlc(rng):
+    source = str(rng.choice(["Sine", "Square", "Triangle", "PWM"], p=[0.6, 0.2, 0.1, 0.1]))
+    return {"r_rlc": _part(rng, 1, 1e3), "l_rlc": _part(rng, 1e-3, 100e-3), "c_rlc": _part(rng, 100e-9, 10e-6),
+            "vp_rlc": str(int(rng.integers(1, 21))), "f_rlc": _log_uniform(rng, 10, 10e3),
+            "cyc_rlc": str(rng.choice(["", "3", "5", "10"])), "src_rlc": source,
+            "duty_rlc": str(int(rng.integers(10, 91))) if source == "PWM" else ""}
+
+def _bjt(suffix, rc=True):
+    def inputs(rng):
+        values = {f"vcc_{suffix}": str(rng.choice([5, 9, 12, 15])), f"r1_{suffix}": _part(rng, 10e3, 100e3),
+                  f"r2_{suffix}": _part(rng, 2.2e3, 22e3), f"re_{suffix}": _part(rng, 220, 2.2e3),
+                  f"beta_{suffix}": str(int(rng.integers(80, 301)))}
+        if rc:
+            values[f"rc_{suffix}"] = _part(rng, 1e3, 10e3)
+        return values
+    return inputs
+
+def _opamp(suffix, models):
+    return lambda rng: {f"rin_{suffix}": _part(rng, 1e3, 10e3), f"rf_{suffix}": _part(rng, 10e3, 1e6),
+                        f"model_{suffix}": str(rng.choice(models)), f"vs_{suffix}": str(rng.choice([5, 12, 15])),
+                        f"vin_{suffix}": _log_uniform(rng, 0.01, 1), f"fsig_{suffix}": _log_uniform(rng, 100, 100e3)}
+
+def _gate(rng):
+    values = {"gate_key": str(rng.choice(['AND', 'OR', 'NAND', 'NOR', 'XOR', 'NOT', 'BUF'])), "a_key": int(rng.integers(2))}
+    if values["gate_key"] not in ('NOT', 'BUF'):      # Input B is only shown for two-input gates
+        values["b_key"] = int(rng.integers(2))
+    return values
+
+def _filter(rng):
+    kind = str(rng.choice(["Butterworth", "Chebyshev", "Bessel", "Elliptic"]))
+    resp = str(rng.choice(["Low-Pass", "High-Pass", "Band-Pass"]))
+    fc = float(np.exp(rng.uniform(np.log(100), np.log(100e3))))
+    return {"kind_afd": kind, "order_afd": int(rng.integers(1, 11)), "resp_afd": resp, "fc_afd": _eng(fc),
+            "bw_afd": _eng(fc * rng.uniform(0.1, 2)) if resp == "Band-Pass" else "",
+            "ripple_afd": str(rng.choice(["", "0.5", "1", "3"])), "stop_afd": str(rng.choice(["", "40", "60"]))}
+
+SCENARIOS: Dict[str, Scenario] = {
+    "ohms_law": Scenario("pages/1_Ohm's_Law.py", "Calculate", _ohm, 1.0),
+    "rc_low_pass": Scenario("pages/2_RC_Low-Pass_Filter.py", "Analyze Filter",
+                            lambda rng: {"r_filter": _part(rng, 100, 100e3), "c_filter": _part(rng, 1e-9, 10e-6)}, 3.0),
+    "rc_high_pass": Scenario("pages/3_RC_High-Pass_Filter.py", "Analyze Filter",
+                             lambda rng: {"r_hp_filter": _part(rng, 100, 100e3), "c_hp_filter": _part(rng, 1e-9, 10e-6)}, 3.0),
+    "ac_rlc": Scenario("pages/4_AC_RLC_Circuit.py", "Analyze Circuit", _rlc, 3.0, ("src_rlc",)),
+    "bjt_ce": Scenario("pages/5_BJT_CE_Amplifier.py", "Analyze Amplifier",
+                       lambda rng: {"vcc_bjt": str(rng.choice([5, 9, 12, 15])), "r1_bjt": _part(rng, 10e3, 100e3),
+                                    "r2_bjt": _part(rng, 2.2e3, 22e3), "rc_bjt": _part(rng, 1e3, 10e3),
+                                    "re_bjt": _part(rng, 220, 2.2e3), "beta_bjt": str(int(rng.integers(80, 301)))}, 1.0),
+    "bjt_cb": Scenario("pages/6_BJT_CB_Amplifier.py", "Analyze Amplifier", _bjt("cb"), 1.0),
+    "bjt_cc": Scenario("pages/7_BJT_CC_Amplifier.py", "Analyze Amplifier", _bjt("cc", rc=False), 1.0),
+    "inverting_opamp": Scenario("pages/8_Inverting_Op-Amp.py", "Analyze Amplifier",
+                                _opamp("opamp", list(opamp.OPAMPS)), 1.0, ("model_opamp",)),
+    "noninverting_opamp": Scenario("pages/9_Non-Inverting_Op-Amp.py", "Analyze Amplifier",
+                                   _opamp("noninv", list(opamp.OPAMPS)), 1.0, ("model_noninv",)),
+    "logic_gates": Scenario("pages/10_Logic_Gate_Simulator.py", "Simulate", _gate, 0.5, ("gate_key", "a_key", "b_key")),
+    "filter_designer": Scenario("pages/11_Active_Filter_Designer.py", "Design Filter", _filter, 2.0,
+                                ("kind_afd", "resp_afd"), ("order_afd",)),
+    "home": Scenario("app.py", "", lambda rng: {}, 0.5),
+}
+
+# ==============================================================================
+# SECTION 2: SESSION DRIVERS
+# ==============================================================================
+
+class _State(dict):
+    """session_state stand-in with attribute access."""
+    __getattr__ = dict.__getitem__
+    __setattr__ = dict.__setitem__
+    __delattr__ = dict.__delitem__
+
+
+class _StandinStreamlit:
+    """
+    The subset of the `st` API the pages use. Widgets read the calling
+    session's state, the armed submit button returns True once, figures are
+    rendered to PNG, and caches are shared across sessions as in Streamlit.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._caches: Dict[Callable, Dict] = {}
+        self._lock = threading.Lock()
+
+    # --- session plumbing ---
+    @property
+    def session_state(self) -> _State:
+        return self._local.session.state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        # Display-only calls (markdown, metric, latex, ...) just return None
+        return lambda *args, **kwargs: None
+
+    @property
+    def sidebar(self):
+        return self
+
+    def columns(self, spec, **kwargs):
+        return [self] * (spec if isinstance(spec, int) else len(spec))
+
+    def tabs(self, labels):
+        return [self] * len(labels)
+
+    def form(self, *args, **kwargs):
+        return self
+
+    def expander(self, *args, **kwargs):
+        return self
+
+    def container(self, *args, **kwargs):
+        return self
+
+    def spinner(self, *args, **kwargs):
+        return self
+
+    # --- widgets ---
+    def _widget(self, key, default):
+        state = self.session_state
+        if key is None:
+            return default
+        if key not in state:
+            state[key] = default
+        return state[key]
+
+    def text_input(self, label, value="", key=None, **kwargs):
+        return self._widget(key, value)
+
+    def number_input(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._widget(key, value if value is not None else (min_value or 0.0))
+
+    def selectbox(self, label, options, index=0, key=None, **kwargs):
+        return self._widget(key, list(options)[index])
+
+    def checkbox(self, label, value=False, key=None, **kwargs):
+        return self._widget(key, value)
+
+    def slider(self, label, min_value=None, max_value=None, value=None, key=None, **kwargs):
+        return self._widget(key, value if value is not None else min_value)
+
+    def button(self, label, on_click=None, **kwargs):
+        session = self._local.session
+        if session.pending == label:
+            session.pending = None
+            return True
+        return False
+
+    form_submit_button = button
+
+    def error(self, *args, **kwargs):
+        self._local.session.failed = True
+
+    # --- output that costs real work ---
+    def pyplot(self, fig=None, **kwargs):
+        fig = fig or plt.gcf()
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+
+    def _cache(self, func=None, **kwargs):
+        def wrap(f):
+            memo = self._caches.setdefault(f, {})
+
+            def cached(*args, **kw):
+                key = (args, tuple(sorted(kw.items())))
+                with self._lock:
+                    if key in memo:
+                        return memo[key]
+                value = f(*args, **kw)
+                with self._lock:
+                    memo[key] = value
+                return value
+            return cached
+        return wrap(func) if callable(func) else wrap
+
+    cache_resource = cache_data = _cache
+
+    def fragment(self, func=None, **kwargs):
+        # Fragments run inline once; run_every polling has nothing to refresh here
+        return func if callable(func) else (lambda f: f)
+
+
+_STANDIN = _StandinStreamlit()
+_CODE_CACHE: Dict[str, object] = {}
+
+class StandinSession:
+    """One user session that runs page scripts against the stand-in `st`."""
+
+    def __init__(self):
+        self.state = _State()
+        self.pending: Optional[str] = None
+        self.failed = False
+
+    def run(self, scenario: Scenario, inputs: Optional[Dict[str, str]]) -> bool:
+        """Runs the page (submitting `inputs` if given); returns False if the script raised."""
+        path = os.path.join(ROOT, scenario.page)
+        code = _CODE_CACHE.get(path)
+        if code is None:
+            with open(path, encoding="utf-8") as fh:
+                code = _CODE_CACHE[path] = compile(fh.read(), path, "exec")
+        if inputs is not None:
+            self.state.update(inputs)
+            self.pending = scenario.submit
+        real_import = builtins.__import__
+
+        def hooked_import(name, *args, **kwargs):
+            return _STANDIN if name == "streamlit" else real_import(name, *args, **kwargs)
+
+        _STANDIN._local.session = self
+        scope = {"__name__": "__main__", "__file__": path,
+                 "__builtins__": dict(builtins.__dict__, __import__=hooked_import)}
+        self.failed = False
+        try:
+            exec(code, scope)
+            return not self.failed
+        except Exception:
+            return False
+        finally:
+            self.pending = None
+
+
+class AppTestSession:
+    """One user session driven through streamlit.testing's AppTest (one AppTest per page)."""
+
+    def __init__(self, timeout: float = 60.0):
+        from streamlit.testing.v1 import AppTest
+        self._AppTest, self.timeout = AppTest, timeout
+        self.apps: Dict[str, object] = {}
+
+    def run(self, scenario: Scenario, inputs: Optional[Dict[str, str]]) -> bool:
+        at = self.apps.get(scenario.page)
+        if at is None:
+            at = self.apps[scenario.page] = self._AppTest.from_file(os.path.join(ROOT, scenario.page),
+                                                                   default_timeout=self.timeout)
+        if inputs is None:
+            at.run()
+            return not at.exception
+        for key, value in inputs.items():
+            if key in scenario.selects:
+                at.selectbox(key=key).select(value)
+            elif key in scenario.numbers:
+                at.number_input(key=key).set_value(value)
+            else:
+                at.text_input(key=key).input(value)
+        if scenario.submit:
+            next(b for b in at.button if b.label == scenario.submit).click()
+        at.run()
+        return not at.exception and not at.error
+
+
+def _has_streamlit() -> bool:
+    try:
+        import streamlit.testing.v1  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+# ==============================================================================
+# SECTION 3: LOAD RUNS AND REPORTS
+# ==============================================================================
+
+def _rss_bytes() -> int:
+    """Resident set size of this process (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50_ms": float("nan"), "p95_ms": float("nan"), "p99_ms": float("nan"), "mean_ms": float("nan")}
+    ms = np.array(samples) * 1e3
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": float(p50), "p95_ms": float(p95), "p99_ms": float(p99), "mean_ms": float(ms.mean())}
+
+def run(concurrency: int = 4, iterations: int = 20, seed: int = 0, backend: str = "auto",
+        pages: Optional[Sequence[str]] = None) -> dict:
+    """
+    Runs `concurrency` simulated users, each making `iterations` weighted
+    page submissions (plus a first render whenever it opens a page), and
+    returns per-page throughput and latency percentiles and memory figures.
+    """
+    if backend == "auto":
+        backend = "apptest" if _has_streamlit() else "standin"
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)     # The pages import the calculator modules from the repo root
+    names = list(pages or SCENARIOS)
+    weights = np.array([SCENARIOS[n].weight for n in names], dtype=float)
+    weights /= weights.sum()
+    seeds = np.random.SeedSequence(seed).spawn(concurrency)
+    samples = {n: {"submit": [], "load": [], "errors": 0} for n in names}
+    lock = threading.Lock()
+    peak = [_rss_bytes()]
+    rss_start = peak[0]
+
+    def user(k: int) -> None:
+        rng = np.random.default_rng(seeds[k])
+        session = AppTestSession() if backend == "apptest" else StandinSession()
+        opened = set()
+        for _ in range(iterations):
+            name = names[rng.choice(len(names), p=weights)]
+            scenario = SCENARIOS[name]
+            if name not in opened:
+                t0 = time.perf_counter()
+                ok = session.run(scenario, None)
+                with lock:
+                    samples[name]["load"].append(time.perf_counter() - t0)
+                    samples[name]["errors"] += not ok
+                opened.add(name)
+            inputs = scenario.inputs(rng)
+            t0 = time.perf_counter()
+            ok = session.run(scenario, inputs)
+            elapsed = time.perf_counter() - t0
+            with lock:
+                samples[name]["submit"].append(elapsed)
+                samples[name]["errors"] += not ok
+                peak[0] = max(peak[0], _rss_bytes())
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for future in [pool.submit(user, k) for k in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - t0
+    rss_end = _rss_bytes()
+
+    report_pages = {}
+    for n in names:
+        s = samples[n]
+        entry = {"runs": len(s["submit"]), "errors": s["errors"], "throughput_rps": len(s["submit"]) / wall}
+        entry.update(_percentiles(s["submit"]))
+        entry["load_p50_ms"] = _percentiles(s["load"])["p50_ms"]
+        report_pages[n] = entry
+    everything = [x for n in names for x in samples[n]["submit"]]
+    overall = {"runs": len(everything), "errors": sum(s["errors"] for s in samples.values()),
+               "throughput_rps": len(everything) / wall}
+    overall.update(_percentiles(everything))
+    return {"backend": backend, "concurrency": concurrency, "iterations": iterations, "seed": seed,
+            "wall_s": wall, "overall": overall, "pages": report_pages,
+            "memory": {"rss_start_mb": rss_start / 1e6, "rss_peak_mb": peak[0] / 1e6, "rss_end_mb": rss_end / 1e6,
+                       "per_session_mb": max(peak[0] - rss_start, 0) / 1e6 / concurrency}}
+
+def capacity(levels: Sequence[int] = (1, 2, 4, 8, 16), **kwargs) -> List[dict]:
+    """One run() per concurrency level, for a latency-versus-users capacity curve."""
+    return [run(concurrency=c, **kwargs) for c in levels]
+
+def format_report(report: dict) -> str:
+    """Plain-text table of one run() report."""
+    lines = [f"backend={report['backend']}  users={report['concurrency']}  iterations={report['iterations']}  "
+             f"wall={report['wall_s']:.2f} s  "
+             f"memory/session={report['memory']['per_session_mb']:.1f} MB  peak RSS={report['memory']['rss_peak_mb']:.0f} MB",
+             f"{'page':<18}{'runs':>6}{'err':>5}{'req/s':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'load ms':>9}"]
+    rows = list(report["pages"].items()) + [("overall", dict(report["overall"], load_p50_ms=float("nan")))]
+    for name, p in rows:
+        lines.append(f"{name:<18}{p['runs']:>6}{p['errors']:>5}{p['throughput_rps']:>8.1f}"
+                     f"{p['p50_ms']:>9.1f}{p['p95_ms']:>9.1f}{p['p99_ms']:>9.1f}{p['load_p50_ms']:>9.1f}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Concurrent-user load test of the Streamlit pages.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["auto", "apptest", "standin"], default="auto")
+    parser.add_argument("--pages", nargs="+", choices=list(SCENARIOS))
+    args = parser.parse_args()
+    for report in capacity(args.concurrency, iterations=args.iterations, seed=args.seed,
+                           backend=args.backend, pages=args.pages):
+        print(format_report(report), end="\n\n")
@@ -4,6 +4,13 @@
 import matplotlib.pyplot as plt
 import numpy as np
 from helpers import get_float, get_binary_input, parse_engineering_notation
+from depgraph import series_rlc_graph
+from decimate import SampleStore, attach
+import records
+import zener
+
+# Built once: ac_series only set()s its inputs, so unchanged quantities stay cached between runs
+_RLC_GRAPH = series_rlc_graph()
 
 # ==============================================================================
 # SECTION 1: CORE CIRCUIT ANALYSIS MODULES
@@ -42,24 +49,25 @@ def rc_circuit():
     tau = R * C
     print(f"Time constant τ = R*C = {tau:.4f} s")
     t_sim = get_float(f"Enter time to simulate (s) (e.g., 5*τ = {5*tau:.2f}s): ")
-    t = np.linspace(0, t_sim, 500)
+    # Resolve the time constant even for long runs; long waveforms are generated
+    # chunk by chunk into a memory-mapped store and plotting decimates from it.
+    n = int(np.clip(100 * t_sim / tau, 500, 5_000_000))
 
     if choice == '1':
         V_supply = get_float("Enter supply voltage Vs (V): ")
-        Vc = V_supply * (1 - np.exp(-t / tau))
+        vc = lambda t: V_supply * (1 - np.exp(-t / tau))
         title = "Capacitor Charging in RC Circuit"
-        print(f"Voltage across capacitor at t={t_sim}s: {Vc[-1]:.4f} V")
     elif choice == '2':
         V_initial = get_float("Enter initial capacitor voltage V0 (V): ")
-        Vc = V_initial * np.exp(-t / tau)
+        vc = lambda t: V_initial * np.exp(-t / tau)
         title = "Capacitor Discharging in RC Circuit"
-        print(f"Voltage across capacitor at t={t_sim}s: {Vc[-1]:.4f} V")
     else:
         print("Invalid choice.")
         return
+    print(f"Voltage across capacitor at t={t_sim}s: {vc(t_sim):.4f} V")
 
     if input("Plot voltage vs time? (yes/no): ").lower() == "yes":
-        plt.plot(t, Vc)
+        attach(plt.gca(), SampleStore.from_function(vc, 0, t_sim / (n - 1), n))
         plt.title(title); plt.xlabel("Time (s)"); plt.ylabel("Voltage (V)")
         plt.grid(True); plt.show()
     print()
@@ -73,13 +81,13 @@ def rl_circuit():
     tau = L / R
     print(f"Time constant τ = L/R = {tau:.4f} s")
     t_sim = get_float(f"Enter time to simulate (s) (e.g., 5*τ = {5*tau:.2f}s): ")
-    t = np.linspace(0, t_sim, 500)
-    IL = (V/R) * (1 - np.exp(-t / tau))
+    n = int(np.clip(100 * t_sim / tau, 500, 5_000_000))
+    il = lambda t: (V/R) * (1 - np.exp(-t / tau))
     
-    print(f"Inductor current at t={t_sim}s: {IL[-1]:.4f} A")
+    print(f"Inductor current at t={t_sim}s: {il(t_sim):.4f} A")
 
     if input("Plot current vs time? (yes/no): ").lower() == "yes":
-        plt.plot(t, IL)
+        attach(plt.gca(), SampleStore.from_function(il, 0, t_sim / (n - 1), n))
         plt.title("Inductor Current in RL Circuit"); plt.xlabel("Time (s)"); plt.ylabel("Current (A)")
         plt.grid(True); plt.show()
     print()
@@ -93,16 +101,9 @@ def ac_series():
     V_peak = get_float("Enter peak voltage V_peak (V): ")
     f = get_float("Enter frequency f (Hz): ")
 
-    omega = 2 * np.pi * f
-    Xl = omega * L
-    Xc = 1 / (omega * C) if C > 0 else float('inf')
-    X_total = Xl - Xc
-    Z = np.sqrt(R**2 + X_total**2)
-    V_rms = V_peak / np.sqrt(2)
-    I_peak = V_peak / Z
-    I_rms = V_rms / Z
-    phase_angle_rad = np.arctan2(X_total, R)
-    phase_angle_deg = np.degrees(phase_angle_rad)
+    g = _RLC_GRAPH
+    g.set(R=R, L=L, C=C, V_peak=V_peak, f=f)
+    omega, Xl, Xc, Z, phase_angle_deg, I_rms = g.get("omega", "Xl", "Xc", "Z", "phase_deg", "I_rms")
 
     print("\n--- Impedance & Phase Analysis ---")
     print(f"Angular Frequency ω = {omega:.2f} rad/s")
@@ -112,17 +113,13 @@ def ac_series():
     print(f"RMS Current I_rms = {I_rms:.4f} A")
     
     if L > 0 and C > 0:
-        f0 = 1 / (2 * np.pi * np.sqrt(L*C))
-        Q_factor = (1/R) * np.sqrt(L/C)
-        BW = f0 / Q_factor
+        f0, Q_factor, BW = g.get("f0", "Q_factor", "BW")
         print("\n--- Resonance Analysis ---")
         print(f"Resonant Frequency f0 = {f0:.2f} Hz")
         print(f"Quality Factor Q = {Q_factor:.2f}")
         print(f"Bandwidth BW = {BW:.2f} Hz")
 
-    P_real = I_rms**2 * R
-    Q_reactive = I_rms**2 * X_total
-    S_apparent = V_rms * I_rms
+    P_real, Q_reactive, S_apparent = g.get("P_real", "Q_reactive", "S_apparent")
     PF = P_real / S_apparent
     print("\n--- Power Analysis ---")
     print(f"Real Power (P) = {P_real:.4f} W")
@@ -131,12 +128,10 @@ def ac_series():
     print(f"Power Factor (PF) = {PF:.4f} ({'lagging' if Xl > Xc else 'leading'})")
 
     if input("\nPlot AC waveforms? (yes/no): ").lower() == "yes":
-        t = np.linspace(0, 3/f, 500)
-        v = V_peak * np.sin(omega*t)
-        i = I_peak * np.sin(omega*t - phase_angle_rad)
+        t, v, i = g.get("t", "v_wave", "i_wave")
         plt.figure(figsize=(10, 6))
-        plt.plot(t, v, label="Voltage (V)")
-        plt.plot(t, i, label="Current (A)", linestyle='--')
+        attach(plt.gca(), SampleStore.from_array(v, 0, t[1] - t[0]), label="Voltage (V)")
+        attach(plt.gca(), SampleStore.from_array(i, 0, t[1] - t[0]), label="Current (A)", linestyle='--')
         plt.title("AC Voltage and Current Waveforms"); plt.xlabel("Time (s)"); plt.ylabel("Amplitude")
         plt.legend(); plt.grid(True); plt.show()
     print()
@@ -208,30 +203,40 @@ def diode_forward():
     print()
 
 def zener_regulator():
-    """Designs a simple Zener diode voltage regulator circuit."""
+    """Designs a Zener diode voltage regulator over an input and load range."""
     print("\n--- Zener Diode Voltage Regulator Design ---")
-    Vin = get_float("Enter input voltage Vin (V): ")
+    Vin = get_float("Enter minimum input voltage Vin (V): ")
+    Vin_max = get_float("Enter maximum input voltage Vin(max) (V) (blank = same): ", allow_blank=True, default=Vin)
     Vz = get_float("Enter desired Zener voltage Vz (V): ")
-    RL = get_float("Enter load resistance RL (Ω): ")
+    RL = get_float("Enter minimum load resistance RL (Ω): ")
+    rz = get_float("Enter Zener dynamic resistance rz (Ω) (default 5): ", allow_blank=True, default=5.0)
+    Izk = get_float("Enter Zener knee current Izk (A) (default 1m): ", allow_blank=True, default=1e-3)
 
     if Vin <= Vz:
         print("Error: Input voltage must be greater than Zener voltage.")
         return
+    if Vin_max < Vin:
+        print("Error: Maximum input voltage cannot be below the minimum input voltage.")
+        return
 
     IL_max = Vz / RL
-    IZ_test = 0.1 * IL_max
-    Is = IL_max + IZ_test
-    Rs = (Vin - Vz) / Is
-    
-    IZ_noload = (Vin - Vz) / Rs
-    PZ_max = Vz * IZ_noload
+    result = zener.design(Vin, Vin_max, 0.0, IL_max, Vz, rz, Izk)
+    if result is None:
+        print("Error: No standard resistor and power rating can hold regulation over this range.")
+        return
+
+    grid = zener.surface(Vin, Vin_max, 0.0, IL_max, result["Rs"], Vz, rz, Izk, result["Pz_rating"])
 
     print("\n--- Design Results ---")
     print(f"Max load current IL(max) = {IL_max*1000:.2f} mA")
-    print(f"Required Series Resistor Rs = {Rs:.2f} Ω")
-    print(f"Power dissipated by Rs = {(Is**2 * Rs):.4f} W")
+    print(f"Required Series Resistor Rs = {result['Rs']:.2f} Ω (E24, limit {result['Rs_limit']:.2f} Ω)")
+    print(f"Power dissipated by Rs = {result['P_Rs_worst']:.4f} W (use a {result['P_Rs_rating']} W resistor)")
+    print(f"Output voltage range = {grid['Vout'].min():.3f} V to {grid['Vout'].max():.3f} V")
+    print(f"Line regulation = {result['line_reg']:.3f} %/V, load regulation = {result['load_reg']:.3f} %")
+    print(f"Regulation holds over the whole range: {'yes' if grid['regulated'].all() else 'no'}")
     print("\n--- Zener Diode Specification ---")
-    print(f"The Zener diode must have a power rating of at least {PZ_max:.4f} W.")
+    print(f"Worst-case Zener dissipation (no load, Vin max) = {result['Pz_worst']:.4f} W.")
+    print(f"The Zener diode must have a power rating of at least {result['Pz_rating']} W.")
     print()
     
 def bjt_ic():
@@ -244,7 +249,7 @@ def bjt_ic():
     print()
 
 def bjt_ce_amplifier():
-    """Performs DC and AC analysis of a common-emitter amplifier."""
+    """Performs DC and AC analysis of a common-emitter amplifier; returns the BjtCeResult record."""
     print("\n--- BJT Common-Emitter Amplifier Analysis ---")
     print("Uses a standard voltage divider biasing configuration.")
     
@@ -254,33 +259,22 @@ def bjt_ce_amplifier():
     Rc = get_float("Enter collector resistor Rc (Ω): ")
     Re = get_float("Enter emitter resistor Re (Ω): ")
     beta = get_float("Enter transistor current gain β (default 150): ", allow_blank=True, default=150)
-    
-    Vb = Vcc * (R2 / (R1 + R2))
-    Ve = Vb - 0.7
-    Ie = Ve / Re
-    Ic = Ie
-    Vc = Vcc - (Ic * Rc)
-    Vce = Vc - Ve
+    r = records.evaluate("bjt_ce", Vcc=Vcc, R1=R1, R2=R2, Rc=Rc, Re=Re, beta=beta)
     
     print("\n--- DC Analysis (Q-Point) ---")
-    print(f"Base Voltage Vb = {Vb:.2f} V")
-    print(f"Collector Current Icq = {Ic*1000:.2f} mA")
-    print(f"Collector-Emitter Voltage Vceq = {Vce:.2f} V")
+    print(f"Base Voltage Vb = {r.Vb:.2f} V")
+    print(f"Collector Current Icq = {r.Ic*1000:.2f} mA")
+    print(f"Collector-Emitter Voltage Vceq = {r.Vce:.2f} V")
     
-    if Vce < 0.2:
+    if r.Vce < 0.2:
         print("WARNING: Transistor is likely in saturation. AC analysis may be invalid.")
     
-    re_prime = 26e-3 / Ie
-    Zin_base = beta * (re_prime + Re)
-    R_parallel = (R1 * R2) / (R1 + R2)
-    Zin_total = (Zin_base * R_parallel) / (Zin_base + R_parallel)
-    Av = -Rc / re_prime
-    
     print("\n--- AC Small-Signal Analysis (Approximation) ---")
-    print(f"Internal Emitter Resistance r_e' = {re_prime:.2f} Ω")
-    print(f"Total Input Impedance Zin = {Zin_total/1000:.2f} kΩ")
-    print(f"Voltage Gain Av (assuming bypassed Re) = {Av:.2f}")
+    print(f"Internal Emitter Resistance r_e' = {r.re_prime:.2f} Ω")
+    print(f"Total Input Impedance Zin = {r.Zin/1000:.2f} kΩ")
+    print(f"Voltage Gain Av (assuming bypassed Re) = {r.Av:.2f}")
     print()
+    return r
 
 # ==============================================================================
 # SECTION 4: DIGITAL LOGIC MODULE
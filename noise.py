@@ -0,0 +1,261 @@
+# noise.py
+# Contains small-signal noise analysis by the adjoint method.
+# The output of a linear circuit is v_out = e_out^T A^-1 b for any source
+# vector b. Solving the transposed system A^T y = e_out once per frequency
+# gives the transfer from every possible injection point at the same time:
+# a current source between nodes a and b reaches the output with y[a] - y[b],
+# a voltage source in a branch with y[branch]. All noise sources therefore
+# cost one extra (transposed) solve per frequency instead of one per source,
+# and all frequencies are factorized together as one mna batch.
+
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import analysis
+import bjtfreq
+import mna
+import opamp
+
+K_BOLTZMANN = 1.380649e-23
+Q_ELECTRON = 1.602176634e-19
+T_ROOM = 300.15
+
+# Typical datasheet noise: en in V/√Hz, in in A/√Hz, 1/f corners in Hz
+OPAMP_NOISE: Dict[str, Dict[str, float]] = {
+    "LM741":   {"en": 20e-9, "in": 0.5e-12, "fce": 200.0, "fci": 2000.0},
+    "LM358":   {"en": 40e-9, "in": 0.1e-12, "fce": 100.0, "fci": 1000.0},
+    "TL081":   {"en": 18e-9, "in": 0.01e-12, "fce": 100.0, "fci": 100.0},
+    "OPA2134": {"en": 8e-9,  "in": 3e-15,  "fce": 20.0,  "fci": 20.0},
+}
+
+class NoiseSource(NamedTuple):
+    """A noise generator: current between nodes (n_plus -> n_minus) or voltage in a V-element branch."""
+    name: str
+    psd: Callable[[np.ndarray], np.ndarray]   # One-sided PSD (A²/Hz or V²/Hz) versus frequency
+    n_plus: int = 0
+    n_minus: int = 0
+    element: Optional[str] = None             # Name of the V element carrying a voltage source
+
+# ==============================================================================
+# SECTION 1: NOISE SOURCE MODELS
+# ==============================================================================
+
+def resistor_sources(circuit: mna.Circuit, T: float = T_ROOM, skip: Sequence[str] = ()) -> List[NoiseSource]:
+    """Thermal noise current 4kT/R for every resistor not listed in `skip`."""
+    sources = []
+    for name, kind, a, b, R in zip(circuit.names, circuit.kinds, circuit.n1, circuit.n2, circuit.values):
+        if kind == "R" and name not in skip:
+            sources.append(NoiseSource(name, lambda f, R=R: np.full(np.shape(f), 4 * K_BOLTZMANN * T / R), a, b))
+    return sources
+
+def bjt_sources(Ic: float, beta: float, base: int, emitter: int, collector: int,
+                KF: float = 1e-16, AF: float = 1.0) -> List[NoiseSource]:
+    """Collector shot noise 2qIc and base shot + flicker noise 2qIb + KF*Ib^AF/f (needs Ic > 0)."""
+    if not Ic > 0:
+        raise ValueError("Shot noise needs a conducting transistor (Ic > 0).")
+    Ib = Ic / beta
+    return [NoiseSource("Q shot (collector)", lambda f: np.full(np.shape(f), 2 * Q_ELECTRON * Ic), collector, emitter),
+            NoiseSource("Q shot+flicker (base)", lambda f: 2 * Q_ELECTRON * Ib + KF * Ib**AF / f, base, emitter)]
+
+def opamp_sources(model: str, en_element: str, inv_node: int, noninv_node: int) -> List[NoiseSource]:
+    """Op-amp input voltage noise (in series with `en_element`) and current noise at both inputs."""
+    p = OPAMP_NOISE[model]
+    en = lambda f: p["en"]**2 * (1 + p["fce"] / f)
+    cur = lambda f: p["in"]**2 * (1 + p["fci"] / f)
+    return [NoiseSource("Op-amp en", en, element=en_element),
+            NoiseSource("Op-amp in-", cur, inv_node, 0),
+            NoiseSource("Op-amp in+", cur, noninv_node, 0)]
+
+# ==============================================================================
+# SECTION 2: ADJOINT ANALYSIS
+# ==============================================================================
+
+def analyze(circuit: mna.Circuit, sources: List[NoiseSource], out_node: int, f: np.ndarray,
+            input_source: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """
+    Output noise PSD (V²/Hz) per source and in total at each frequency, the
+    signal gain from `input_source` (a V element) and the input-referred
+    PSD, plus RMS noise (in total and per source) integrated over the
+    frequency grid.
+    """
+    f = np.asarray(f, dtype=float)
+    top = circuit.topology()
+    fact = mna.factor(top, circuit.nominal(), 2j * np.pi * f)
+    e_out = np.zeros((len(f), top.size))
+    e_out[:, out_node - 1] = 1.0
+    y = np.concatenate([np.zeros((len(f), 1)), fact.solve_transpose(e_out)], axis=1)  # y[:, 0] is ground
+
+    contributions = np.empty((len(sources), len(f)))
+    for i, src in enumerate(sources):
+        if src.element is not None:
+            H = y[:, top.branch[top.index(src.element)] + 1]
+        else:
+            H = y[:, src.n_plus] - y[:, src.n_minus]
+        contributions[i] = np.abs(H)**2 * src.psd(f)
+    out_psd = contributions.sum(axis=0)
+    result = {"f": f, "names": [s.name for s in sources], "contributions": contributions,
+              "out_psd": out_psd, "out_rms": _integrated_rms(out_psd, f),
+              "source_rms": np.array([_integrated_rms(c, f) for c in contributions])}
+    if input_source is not None:
+        gain = np.abs(y[:, top.branch[top.index(input_source)] + 1])
+        result["gain"] = gain
+        result["in_psd"] = out_psd / gain**2
+        result["in_rms"] = _integrated_rms(result["in_psd"], f)
+    return result
+
+def _integrated_rms(psd: np.ndarray, f: np.ndarray) -> float:
+    """RMS value of a PSD integrated (trapezoidal) over the frequency grid."""
+    return float(np.sqrt(np.sum(np.diff(f) * (psd[1:] + psd[:-1]) / 2)))
+
+# ==============================================================================
+# SECTION 3: READY-MADE BENCHES
+# ==============================================================================
+
+def _cut_off(f: np.ndarray) -> Dict[str, np.ndarray]:
+    """Result for a transistor in cut-off: no small-signal noise, every figure NaN."""
+    nan = np.full(len(f), np.nan)
+    return {"f": f, "names": [], "contributions": np.empty((0, len(f))), "out_psd": nan, "out_rms": np.nan,
+            "source_rms": np.empty(0),
+            "gain": nan, "in_psd": nan, "in_rms": np.nan, "cutoff": True}
+
+def ce_amplifier(Vcc, R1, R2, Rc, Re, beta, f, Ce=100e-6, Rsig=50.0, KF=1e-16) -> Dict[str, np.ndarray]:
+    """
+    Noise of the common-emitter stage (see mna.ce_amplifier_circuit), referred
+    to Vsig. A design in cut-off (Ic <= 0) is flagged in `cutoff` with NaN noise.
+    """
+    f = np.asarray(f, dtype=float)
+    if not analysis.bjt_divider_bias(Vcc, R1, R2, Rc, Re)["Ic"] > 0:
+        return _cut_off(f)
+    c = mna.ce_amplifier_circuit(Vcc, R1, R2, Rc, Re, beta, Ce, Rsig)
+    gm = c.values[c.names.index("Gm")]
+    Ic = gm * analysis.VT
+    sources = resistor_sources(c, skip=("Rpi",)) + bjt_sources(Ic, beta, base=2, emitter=3, collector=4, KF=KF)
+    return {**analyze(c, sources, out_node=4, f=f, input_source="Vsig"), "cutoff": False}
+
+# Base, emitter and collector nodes of the bjtfreq stage templates
+STAGE_NODES = {"CE": (3, 4, 5), "CB": (4, 3, 5), "CC": (3, 4, 0)}
+
+def stage_amplifier(config: str, Vcc, R1, R2, Rc, Re, beta, f, Rsig=50.0, RL=10e3, Cin=10e-6, Cout=10e-6,
+                    Cbypass=100e-6, KF=1e-16) -> Dict[str, np.ndarray]:
+    """
+    Noise of one 'CE', 'CB' or 'CC' stage of bjtfreq (coupling capacitors,
+    load and the hybrid-pi device capacitances included), referred to Vsig.
+    A design in cut-off (Ic <= 0) is flagged in `cutoff` with NaN noise.
+    """
+    f = np.asarray(f, dtype=float)
+    values, q = bjtfreq._design_values(config, Vcc, R1, R2, Rc, Re, beta, Rsig, RL, Cin, Cout, Cbypass,
+                                       bjtfreq.FT, bjtfreq.CMU, bjtfreq.VA)
+    if not q["Ic"] > 0:
+        return _cut_off(f)
+    template = bjtfreq.stage_circuit(config)
+    c = mna.Circuit()
+    for name, a, b, c1, c2, v in zip(template.names, template.n1, template.n2, template.c1, template.c2, values[0]):
+        c.add(name, a, b, v, ctrl=(c1, c2))
+    base, emitter, collector = STAGE_NODES[config]
+    # r_pi's noise is the base shot noise and r_o is not a physical resistor
+    sources = resistor_sources(c, skip=("Rpi", "Ro")) + bjt_sources(float(q["Ic"]), beta, base, emitter, collector, KF=KF)
+    return {**analyze(c, sources, out_node=bjtfreq.OUT_NODE[config], f=f, input_source="Vsig"), "cutoff": False}
+
+def cb_amplifier(Vcc, R1, R2, Rc, Re, beta, f, **kwargs) -> Dict[str, np.ndarray]:
+    """Common-base stage noise (base bypassed by Cbypass, default 100 µF)."""
+    return stage_amplifier("CB", Vcc, R1, R2, Rc, Re, beta, f, **kwargs)
+
+def cc_amplifier(Vcc, R1, R2, Re, beta, f, **kwargs) -> Dict[str, np.ndarray]:
+    """Common-collector stage noise (Rc = 0, output from the emitter)."""
+    return stage_amplifier("CC", Vcc, R1, R2, 0.0, Re, beta, f, **kwargs)
+
+def opamp_amplifier(Rin, Rf, model: str, f, inverting: bool = True, Rs: float = 50.0) -> Dict[str, np.ndarray]:
+    """
+    Noise of the inverting / non-inverting amplifier with a single-pole
+    op-amp macromodel (OPAMPS gain and GBW) and its en/in sources.
+    Nodes: 1 source, 2 inverting input, 3 non-inverting input, 5 output.
+    """
+    p = opamp.OPAMPS[model]
+    fp = p["GBW"] / p["A0"]
+    c = mna.Circuit()
+    c.add("Vin", 1, 0, 1.0)
+    c.add("Rs", 1, 7, Rs)
+    if inverting:
+        c.add("Rin", 7, 2, Rin)
+        c.add("Ven", 3, 0, 0.0)
+    else:
+        c.add("Rin", 2, 0, Rin)
+        c.add("Ven", 3, 7, 0.0)
+    c.add("Rf", 2, 5, Rf)
+    # Open-loop gain A0 with one pole at GBW/A0, then a unity buffer for the output
+    c.add("Eol", 4, 0, p["A0"], ctrl=(3, 2)); c.add("Rpole", 4, 6, 1e3); c.add("Cpole", 6, 0, 1 / (2 * np.pi * 1e3 * fp))
+    c.add("Ebuf", 5, 0, 1.0, ctrl=(6, 0))
+    sources = resistor_sources(c, skip=("Rpole",)) + opamp_sources(model, "Ven", inv_node=2, noninv_node=3)
+    return analyze(c, sources, out_node=5, f=f, input_source="Vin")
+
+def _add_opamp(c: mna.Circuit, tag: str, plus: int, minus: int, out: int, model: str, node: int) -> int:
+    """
+    The opamp_amplifier macromodel with its en source Ven<tag> in series with
+    the non-inverting input; uses nodes node..node+2 and returns the next free one.
+    """
+    p = opamp.OPAMPS[model]
+    fp = p["GBW"] / p["A0"]
+    c.add(f"Ven{tag}", node, plus, 0.0)
+    c.add(f"Eol{tag}", node + 1, 0, p["A0"], ctrl=(node, minus))
+    c.add(f"Rpole{tag}", node + 1, node + 2, 1e3); c.add(f"Cpole{tag}", node + 2, 0, 1 / (2 * np.pi * 1e3 * fp))
+    c.add(f"Ebuf{tag}", out, 0, 1.0, ctrl=(node + 2, 0))
+    return node + 3
+
+def filter_cascade(stages: List[Dict[str, float]], model: str, f, Rs: float = 50.0) -> Dict[str, np.ndarray]:
+    """
+    Noise of a filters.realize() cascade built from its component values
+    (Sallen-Key, MFB and RC + buffer stages, element names suffixed with the
+    stage number) with every op-amp a `model` macromodel, referred to Vin.
+    """
+    c = mna.Circuit()
+    c.add("Vin", 1, 0, 1.0)
+    c.add("Rs", 1, 2, Rs)
+    node_in, free = 2, 3
+    amps = []
+    for k, st in enumerate(stages, start=1):
+        tag = f"_{k}"
+        a, out, b = free, free + 1, free + 2      # b only for two-capacitor stages
+        free += 2 if st["Q_actual"] is None else 3
+        if st["type"] == "bandpass":
+            # MFB: R1 in->a, R2 a->gnd, C1 a->out, C2 a->b, R3 b->out, inverting input at b
+            c.add(f"R1{tag}", node_in, a, st["R1"]); c.add(f"R2{tag}", a, 0, st["R2"])
+            c.add(f"C1{tag}", a, out, st["C1"]); c.add(f"C2{tag}", a, b, st["C2"]); c.add(f"R3{tag}", b, out, st["R3"])
+            amps.append((tag, f"stage {k}", 0, b, out))
+            if "Rg" in st:
+                m, gained = free, free + 1
+                free += 2
+                c.add(f"Rg{tag}", m, 0, st["Rg"]); c.add(f"Rf{tag}", m, gained, st["Rf"])
+                amps.append((f"{tag}g", f"stage {k} gain", out, m, gained))
+                out = gained
+        else:
+            # Input element (or divider) from the stage input to node a
+            first = "R1" if st["type"] == "lowpass" else "C1"
+            if first + "a" in st:
+                c.add(f"{first}a{tag}", node_in, a, st[first + "a"]); c.add(f"{first}b{tag}", a, 0, st[first + "b"])
+            else:
+                c.add(f"{first}{tag}", node_in, a, st[first])
+            if st["Q_actual"] is None:
+                # RC + buffer: the other element shunts node a
+                other = "C1" if st["type"] == "lowpass" else "R1"
+                c.add(f"{other}{tag}", a, 0, st[other])
+                amps.append((tag, f"stage {k}", a, out, out))
+            elif st["type"] == "lowpass":
+                # Sallen-Key low-pass: R2 a->b, C1 a->out, C2 b->gnd, follower
+                c.add(f"R2{tag}", a, b, st["R2"]); c.add(f"C1{tag}", a, out, st["C1"]); c.add(f"C2{tag}", b, 0, st["C2"])
+                amps.append((tag, f"stage {k}", b, out, out))
+            else:
+                # Sallen-Key high-pass: C2 a->b, R1 a->out, R2 b->gnd, follower
+                c.add(f"C2{tag}", a, b, st["C2"]); c.add(f"R1{tag}", a, out, st["R1"]); c.add(f"R2{tag}", b, 0, st["R2"])
+                amps.append((tag, f"stage {k}", b, out, out))
+        node_in = out
+
+    sources = []
+    for tag, label, plus, minus, out in amps:
+        free = _add_opamp(c, tag, plus, minus, out, model, free)
+        # A grounded input (the MFB's non-inverting one) injects no current noise
+        sources += [s._replace(name=f"{s.name} ({label})")
+                    for s in opamp_sources(model, f"Ven{tag}", inv_node=minus, noninv_node=plus)
+                    if s.element is not None or s.n_plus != 0]
+    sources = resistor_sources(c, skip=[n for n in c.names if n.startswith("Rpole")]) + sources
+    return analyze(c, sources, out_node=node_in, f=f, input_source="Vin")
@@ -0,0 +1,73 @@
+# opamp.py
+# Contains batched non-ideal op-amp models for the inverting and
+# non-inverting amplifier pages. The op-amp has finite DC gain with a single
+# pole (set by its gain-bandwidth product), input offset, finite output
+# resistance, output swing limits and a slew-rate limit. Every function
+# broadcasts, so a column of designs against a row of frequencies is
+# evaluated in one call.
+
+from typing import Dict
+
+import numpy as np
+
+# Typical datasheet values. GBW in Hz, SR in V/s, Vos in V, headroom in V
+# (output swing = supply - headroom), Zo/Rid in Ω.
+OPAMPS: Dict[str, Dict[str, float]] = {
+    "LM741":   {"A0": 2e5, "GBW": 1e6,  "SR": 0.5e6, "Vos": 1e-3,   "headroom": 2.0, "Zo": 75.0,  "Rid": 2e6},
+    "LM358":   {"A0": 1e5, "GBW": 1e6,  "SR": 0.3e6, "Vos": 2e-3,   "headroom": 1.5, "Zo": 100.0, "Rid": 1e7},
+    "TL081":   {"A0": 2e5, "GBW": 3e6,  "SR": 13e6,  "Vos": 3e-3,   "headroom": 1.5, "Zo": 100.0, "Rid": 1e12},
+    "OPA2134": {"A0": 1e6, "GBW": 8e6,  "SR": 20e6,  "Vos": 0.5e-3, "headroom": 1.0, "Zo": 10.0,  "Rid": 1e13},
+}
+
+def feedback_factor(Rin, Rf):
+    """Fraction of the output fed back to the inverting input, β = Rin/(Rin+Rf)."""
+    return Rin / (Rin + Rf)
+
+def open_loop(f, A0, GBW):
+    """Single-pole open-loop gain A(jf) = A0 / (1 + j f/fp), with fp = GBW/A0."""
+    return A0 / (1 + 1j * f * A0 / GBW)
+
+def closed_loop(Rin, Rf, f, A0, GBW, inverting: bool = True):
+    """Complex closed-loop gain at frequency f (broadcasts over all arguments)."""
+    beta = feedback_factor(Rin, Rf)
+    loop = open_loop(f, A0, GBW) * beta
+    ideal = -Rf / Rin if inverting else 1 / beta
+    return ideal * loop / (1 + loop)
+
+def analyze(Rin, Rf, A0, GBW, SR, Vos, headroom, Zo, Rid, Vsupply,
+            Vin_peak=0.0, f_signal=1e3, inverting: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Small- and large-signal figures for a batch of designs.
+
+    Returns the DC gain and its error against the ideal gain, the -3 dB
+    bandwidth, closed-loop input/output impedance, output offset, output
+    swing, full-power bandwidth, and the output amplitude and limiting
+    mechanism ('linear', 'clipped' or 'slew') for a sine of Vin_peak at f_signal.
+    """
+    beta = feedback_factor(Rin, Rf)
+    ideal = -Rf / Rin if inverting else 1 / beta
+    Av_dc = ideal * (A0 * beta) / (1 + A0 * beta)
+    # Single pole: the closed-loop pole sits at fp*(1 + A0*β) = GBW*(1/A0 + β)
+    f3db = GBW * (1 / A0 + beta)
+    Zout = Zo / (1 + A0 * beta)
+    Zin = Rin + Rf / (1 + A0) if inverting else Rid * (1 + A0 * beta)
+    Vout_offset = Vos / beta
+    Vswing = np.maximum(Vsupply - headroom, 0.0)
+    FPBW = SR / (2 * np.pi * Vswing)
+
+    gain = np.abs(closed_loop(Rin, Rf, f_signal, A0, GBW, inverting))
+    wanted = gain * Vin_peak
+    clipped = wanted > Vswing
+    amplitude = np.minimum(wanted, Vswing)
+    # A slew-limited sine degenerates towards a triangle of amplitude SR/(4f)
+    slew = 2 * np.pi * f_signal * amplitude > SR
+    amplitude = np.where(slew, np.minimum(amplitude, SR / (4 * f_signal)), amplitude)
+    mode = np.where(slew, "slew", np.where(clipped, "clipped", "linear"))
+    return {"beta": beta, "Av_ideal": ideal, "Av_dc": Av_dc, "gain_error": Av_dc / ideal - 1,
+            "f3db": f3db, "Zin": Zin, "Zout": Zout, "Vout_offset": Vout_offset,
+            "Vswing": Vswing, "FPBW": FPBW, "Vout_peak": amplitude, "mode": mode}
+
+def design_batch(Rin, Rf, model: str, Vsupply, **kwargs) -> Dict[str, np.ndarray]:
+    """Runs analyze() for arrays of resistor values with one of the OPAMPS presets."""
+    return analyze(np.asarray(Rin, dtype=float), np.asarray(Rf, dtype=float),
+                   Vsupply=Vsupply, **OPAMPS[model], **kwargs)
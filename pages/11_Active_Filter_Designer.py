@@ -0,0 +1,110 @@
+import streamlit as st
+import numpy as np
+import matplotlib.pyplot as plt
+import helpers
+import filters
+import noise
+
+st.title("🎛️ Active Filter Designer")
+
+# --- Formulas Section ---
+with st.expander("Formulas & Concepts Used"):
+    st.markdown(
+        """
+        This tool designs higher-order low-pass, high-pass and band-pass filters from normalized low-pass prototypes and realizes them as a cascade of op-amp stages.
+
+        - **Butterworth:** Maximally flat passband.
+        - **Chebyshev:** Steeper roll-off in exchange for passband ripple.
+        - **Bessel:** Near-constant group delay (clean step response), gentle roll-off.
+        - **Elliptic:** Steepest roll-off, with ripple in both bands (response only; it needs notch stages to build).
+
+        A prototype of order $n$ is split into second-order sections, each with a natural frequency $\\omega_0$ and quality factor $Q$:
+        """
+    )
+    st.latex(r"H(s) = \prod_k \frac{\omega_{0k}^2}{s^2 + \frac{\omega_{0k}}{Q_k}s + \omega_{0k}^2}")
+    st.markdown("- **Frequency Transformations:** Low-pass $S = s/\\omega_c$, high-pass $S = \\omega_c/s$, band-pass $S = (s^2 + \\omega_0^2)/(B s)$.")
+    st.markdown("- **Unity-Gain Sallen-Key Low-Pass (equal R):**")
+    st.latex(r"\omega_0 = \frac{1}{R\sqrt{C_1 C_2}} \qquad Q = \frac{1}{2}\sqrt{\frac{C_1}{C_2}}")
+    st.markdown("- **Unity-Gain Sallen-Key High-Pass (equal C):**")
+    st.latex(r"\omega_0 = \frac{1}{C\sqrt{R_1 R_2}} \qquad Q = \frac{1}{2}\sqrt{\frac{R_2}{R_1}}")
+    st.markdown("- **MFB Band-Pass (equal C):**")
+    st.latex(r"\omega_0 = \frac{1}{C}\sqrt{\frac{R_1 + R_2}{R_1 R_2 R_3}} \qquad Q = \frac{1}{2}\sqrt{\frac{R_3 (R_1 + R_2)}{R_1 R_2}}")
+    st.markdown("- **Noise:** Every resistor's thermal noise $4kTR$ and every op-amp's $e_n$, $i_n$ are shaped by the stages after them and added in power at the output.")
+
+# --- UI and Calculation Logic ---
+def reset_form():
+    st.session_state.fc_afd = ""
+    st.session_state.bw_afd = ""
+    st.session_state.ripple_afd = ""
+    st.session_state.stop_afd = ""
+
+with st.form("afd_form"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        kind = st.selectbox("Filter Type", ["Butterworth", "Chebyshev", "Bessel", "Elliptic"], key="kind_afd")
+        order = st.number_input("Order", min_value=1, max_value=filters.MAX_ORDER, value=4, key="order_afd")
+    with col2:
+        resp = st.selectbox("Response", ["Low-Pass", "High-Pass", "Band-Pass"], key="resp_afd")
+        fc_str = st.text_input("Cutoff / Centre Frequency (Hz)", key="fc_afd")
+    with col3:
+        bw_str = st.text_input("Bandwidth (Hz, band-pass)", key="bw_afd")
+        ripple_str = st.text_input("Passband Ripple (dB)", key="ripple_afd", placeholder="1")
+    col1, col2 = st.columns(2)
+    stop_str = col1.text_input("Stopband Attenuation (dB, elliptic)", key="stop_afd", placeholder="40")
+    model = col2.selectbox("Op-Amp (noise)", list(noise.OPAMP_NOISE), index=2, key="opamp_afd")
+
+    b_col1, b_col2 = st.columns([1, 1])
+    submitted = b_col1.form_submit_button("Design Filter", use_container_width=True)
+    b_col2.form_submit_button("Reset", on_click=reset_form, use_container_width=True)
+
+if submitted:
+    try:
+        kind_key = kind.lower(); resp_key = resp.lower().replace("-", "")
+        fc = helpers.parse_engineering_notation(fc_str)
+        bw = helpers.parse_engineering_notation(bw_str) if resp_key == "bandpass" else None
+        ripple = helpers.parse_or_default(ripple_str, 1.0)
+        stop = helpers.parse_or_default(stop_str, 40.0)
+        if ripple is None or stop is None:
+            raise ValueError("Passband ripple and stopband attenuation must be numbers (blank = 1 dB and 40 dB).")
+
+        if resp_key == "bandpass":
+            freq = np.logspace(np.log10(fc) - 1.5, np.log10(fc) + 1.5, 1000)
+        else:
+            freq = np.logspace(np.log10(fc) - 2, np.log10(fc) + 2, 1000)
+        H = filters.response(kind_key, int(order), fc, freq, resp_key, bw, ripple, stop)
+
+        fig, ax = plt.subplots()
+        ax.semilogx(freq, 20 * np.log10(np.abs(H)), label="Ideal")
+        if kind_key != "elliptic":
+            stages = filters.realize(kind_key, int(order), fc, resp_key, bw, ripple)
+            ax.semilogx(freq, 20 * np.log10(np.abs(filters.realized_response(stages, freq))), linestyle='--', label="E-series components")
+        ax.set_title(f'{kind} {resp} (order {int(order)})'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('Magnitude (dB)')
+        ax.set_ylim(bottom=max(ax.get_ylim()[0], -120)); ax.grid(which='both', linestyle='--'); ax.axhline(-3, color='g', linestyle=':', label='-3 dB'); ax.legend()
+        st.pyplot(fig)
+
+        if kind_key == "elliptic":
+            st.info("Elliptic filters have finite transmission zeros, which Sallen-Key/MFB stages cannot realize. Only the ideal response is shown.")
+        else:
+            st.subheader("Stage Components")
+            rows = []
+            for i, s in enumerate(stages, 1):
+                parts = [f"{name}={s[name]:.3g}" for name in ("R1", "R1a", "R1b", "R2", "R3", "C1", "C1a", "C1b", "C2", "Rg", "Rf") if name in s]
+                rows.append({"Stage": i, "Topology": s["topology"], "f0 target (Hz)": f"{s['f0']:.2f}",
+                             "f0 actual (Hz)": f"{s['f0_actual']:.2f}",
+                             "Q target": f"{s['Q']:.3f}" if s["Q"] else "-", "Q actual": f"{s['Q_actual']:.3f}" if s["Q_actual"] else "-",
+                             "Components (Ω, F)": ", ".join(parts)})
+            st.table(rows)
+
+            st.subheader(f"Noise ({model} op-amps, 50 Ω source)")
+            nz = noise.filter_cascade(stages, model, freq)
+            worst = int(np.argmax(nz["source_rms"]))
+            col1, col2 = st.columns(2)
+            col1.metric("Output Noise (plotted band)", f"{nz['out_rms']*1e6:.2f} µV rms")
+            col2.metric("Largest Contributor", nz["names"][worst])
+            fig, ax = plt.subplots()
+            ax.loglog(freq, np.sqrt(nz["out_psd"]) * 1e9)
+            ax.set_title('Output Noise Density'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('nV/√Hz')
+            ax.grid(which='both', linestyle='--')
+            st.pyplot(fig)
+    except Exception as e:
+        st.error(f"Invalid input. Please check all values. Error: {e}")
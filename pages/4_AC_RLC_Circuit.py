@@ -2,6 +2,13 @@ import streamlit as st
 import numpy as np
 import matplotlib.pyplot as plt
 import helpers
+import analysis
+import decimate
+import depgraph
+import spectral
+import surfaces
+
+MAX_CYCLES = 50   # Plotted cycles are tiled in memory, so the input is clamped
 
 st.title("⚡ AC Series RLC Circuit Analyzer")
 
@@ -23,6 +30,8 @@ with st.expander("Formulas & Concepts Used"):
     st.latex(r"PF = \cos(\phi)")
     st.markdown("- **Resonant Frequency ($f_0$):** The frequency at which the circuit is purely resistive ($X_L = X_C$).")
     st.latex(r"f_0 = \frac{1}{2\pi\sqrt{LC}}")
+    st.markdown("- **Non-Sinusoidal Sources:** Square, triangle and PWM sources are split into harmonics $V_k$ by FFT; each harmonic drives the circuit as $I_k = V_k / Z(k f)$. Distortion is summarized by the THD.")
+    st.latex(r"THD = \frac{\sqrt{\sum_{k \geq 2} |I_k|^2}}{|I_1|} \qquad PF = \frac{P}{V_{rms} I_{rms}}")
 
 # --- UI and Calculation Logic (unchanged) ---
 def reset_form():
@@ -31,6 +40,9 @@ def reset_form():
     st.session_state.c_rlc = ""
     st.session_state.vp_rlc = ""
     st.session_state.f_rlc = ""
+    st.session_state.cyc_rlc = ""
+    st.session_state.src_rlc = "Sine"
+    st.session_state.duty_rlc = ""
 
 with st.form("rlc_form"):
     st.write("Enter the circuit parameters below.")
@@ -43,6 +55,10 @@ with st.form("rlc_form"):
         v_peak_str = st.text_input("Peak Voltage Vp (V)", key="vp_rlc")
     with col3:
         f_str = st.text_input("Frequency f (Hz)", key="f_rlc")
+        cycles_str = st.text_input("Cycles to Plot", key="cyc_rlc", placeholder="3")
+    s_col1, s_col2 = st.columns(2)
+    source = s_col1.selectbox("Source Waveform", ["Sine", "Square", "Triangle", "PWM"], key="src_rlc")
+    duty_str = s_col2.text_input("PWM Duty Cycle (%)", key="duty_rlc", placeholder="50")
     
     b_col1, b_col2 = st.columns([1, 1])
     submitted = b_col1.form_submit_button("Analyze Circuit", use_container_width=True)
@@ -50,12 +66,39 @@ with st.form("rlc_form"):
 
 if submitted:
     try:
-        R=helpers.parse_engineering_notation(r_str); L=helpers.parse_engineering_notation(l_str); C=helpers.parse_engineering_notation(c_str); V_peak=helpers.parse_engineering_notation(v_peak_str); f=helpers.parse_engineering_notation(f_str); omega=2*np.pi*f; Xl=omega*L; Xc=1/(omega*C); X_total=Xl-Xc; Z=np.sqrt(R**2 + X_total**2); I_peak=V_peak/Z; phase_angle_rad=np.arctan2(X_total,R); PF=np.cos(phase_angle_rad); f0=1/(2*np.pi*np.sqrt(L*C))
+        # The graph lives in the session, so a resubmit only recomputes quantities downstream of changed inputs.
+        if "rlc_graph" not in st.session_state: st.session_state.rlc_graph=depgraph.series_rlc_graph()
+        g=st.session_state.rlc_graph
+        g.set(R=helpers.parse_engineering_notation(r_str), L=helpers.parse_engineering_notation(l_str), C=helpers.parse_engineering_notation(c_str), V_peak=helpers.parse_engineering_notation(v_peak_str), f=helpers.parse_engineering_notation(f_str), cycles=int(np.clip(helpers.parse_or_default(cycles_str, 3), 1, MAX_CYCLES)))
+        Z, I_peak, phase_deg, PF, Xl, Xc, f, f0=g.get("Z", "I_peak", "phase_deg", "PF", "Xl", "Xc", "f", "f0")
         st.subheader("Analysis Results"); col1, col2=st.columns(2)
         with col1: st.metric("Total Impedance (Z)",f"{Z:.2f} Ω"); st.metric("Peak Current (Ip)",f"{I_peak*1000:.2f} mA")
-        with col2: st.metric("Phase Angle (φ)",f"{np.degrees(phase_angle_rad):.2f}°"); st.metric("Power Factor (PF)",f"{PF:.3f} {'lagging' if Xl > Xc else 'leading'}")
+        with col2: st.metric("Phase Angle (φ)",f"{phase_deg:.2f}°"); st.metric("Power Factor (PF)",f"{PF:.3f} {'lagging' if Xl > Xc else 'leading'}")
         st.metric("Resonant Frequency (f0)",f"{f0:.2f} Hz",delta=f"{f-f0:.2f} Hz from resonance")
-        st.subheader("Waveform Plot"); fig, ax=plt.subplots(); t=np.linspace(0,3/f,500); v=V_peak*np.sin(omega*t); i=I_peak*np.sin(omega*t - phase_angle_rad)
-        ax.plot(t,v,label="Voltage (V)"); ax.plot(t,i,label=f"Current (A)",linestyle='--'); ax.set_title("AC Voltage and Current"); ax.set_xlabel("Time (s)"); ax.grid(True); ax.legend()
+        if source == "Sine": t, v, i=g.get("t", "v_wave", "i_wave")
+        else:
+            # Non-sinusoidal source: harmonics through the circuit's admittance in one FFT pass
+            duty_pct=helpers.parse_or_default(duty_str, 50); R, L, C=g.get("R", "L", "C")
+            if source == "PWM" and (duty_pct is None or not 0 < duty_pct < 100): raise ValueError("PWM duty cycle must be between 0 and 100 %.")
+            duty=(duty_pct or 50)/100
+            ss=spectral.periodic_steady_state(spectral.source_waveform(source.lower(), g["V_peak"], duty=duty), f, lambda fk: analysis.rlc_series_admittance(R, L, C, fk))
+            st.subheader("Harmonic Analysis"); col1, col2=st.columns(2)
+            with col1: st.metric("True RMS Current",f"{ss['I_rms']*1000:.2f} mA"); st.metric("Real Power (P)",f"{ss['P']:.4f} W")
+            with col2: st.metric("Current THD",f"{ss['THD_i']*100:.1f} %"); st.metric("True Power Factor",f"{ss['PF']:.3f}")
+            st.caption(f"Source THD = {ss['THD_v']*100:.1f} %, power delivered at the fundamental = {ss['P_fundamental']:.4f} W. Impedance and phase above are for the fundamental.")
+            n_cyc=g["cycles"]; n=len(ss["v"]); t=np.arange(n*n_cyc)/(n*f); v=np.tile(ss["v"],n_cyc); i=np.tile(ss["i"],n_cyc)
+        st.subheader("Waveform Plot"); fig, ax=plt.subplots()
+        if helpers.parse_or_default(cycles_str, 3) > MAX_CYCLES: st.caption(f"Plotting the first {MAX_CYCLES} cycles.")
+        decimate.plot(ax,t,v,label="Voltage (V)"); decimate.plot(ax,t,i,label=f"Current (A)",linestyle='--'); ax.set_title("AC Voltage and Current"); ax.set_xlabel("Time (s)"); ax.grid(True); ax.legend()
         st.pyplot(fig)
-    except Exception: st.error(f"Invalid input. Please check all values.")
\ No newline at end of file
+    except Exception as e: st.error(f"Invalid input. Please check all values. Error: {e}")
+
+# --- Live Exploration ---
+st.write("---")
+if st.checkbox("Live exploration (frequency slider around the entered circuit)", key="live_rlc"):
+    surfaces.live_panel(st, analysis.rlc_series, {"R": "r_rlc", "L": "l_rlc", "C": "c_rlc", "V_peak": "vp_rlc", "f": "f_rlc"}, ["f"],
+                        [("Total Impedance (Z)", "Z", lambda v: f"{v:.2f} Ω"),
+                         ("Peak Current (Ip)", "I_peak", lambda v: f"{v*1000:.2f} mA"),
+                         ("Phase Angle (φ)", "phase", lambda v: f"{np.degrees(v):.2f}°")], "rlc",
+                        labels={"f": "Frequency f (Hz)"}, span=10.0, points=201,
+                        invalid="Enter a valid circuit above to explore around it.")
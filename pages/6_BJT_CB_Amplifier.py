@@ -1,6 +1,12 @@
 # pages/🔌 BJT CB Amplifier.py
 import streamlit as st
+import numpy as np
+import matplotlib.pyplot as plt
 import helpers
+import analysis
+import surfaces
+import bjtfreq
+import noise
 
 st.title("🔌 BJT Common-Base Amplifier")
 
@@ -20,6 +26,13 @@ with st.expander("Formulas & Concepts Used"):
     st.latex(r"Z_{in} = R_E \parallel r_e' \approx r_e'")
     st.markdown("- **Output Impedance ($Z_{out}$):** High, essentially just $R_C$.")
     st.latex(r"Z_{out} \approx R_C")
+    st.subheader("Frequency Response")
+    st.markdown("- **Hybrid-π Model:** $g_m = I_C/26\\text{mV}$, $r_\\pi = \\beta/g_m$, with $C_\\pi$ from the transition frequency $f_T$ and a collector-base capacitance $C_\\mu$.")
+    st.latex(r"C_\pi = \frac{g_m}{2\pi f_T} - C_\mu")
+    st.markdown("- **Corner Estimates:** Short-circuit time constants of the coupling/bypass capacitors (low corner) and open-circuit time constants of $C_\\pi$, $C_\\mu$ (high corner). The curve and the $-3$ dB corners themselves come from the full circuit.")
+    st.latex(r"f_L \approx \sum_k \frac{1}{2\pi R_{k}^{sc} C_k} \qquad f_H \approx \frac{1}{2\pi \sum_k R_{k}^{oc} C_k}")
+    st.markdown("- **No Miller Multiplication:** The grounded base separates input and output, so $C_\\mu$ loads the collector directly. This gives the CB stage its wide bandwidth.")
+    st.markdown("- **Noise Sources:** Resistor thermal noise, collector shot noise and base shot + flicker noise, all referred to the signal source through the hybrid-π model.")
 
 # --- UI and Calculation Logic ---
 def reset_form():
@@ -72,5 +85,48 @@ if submitted:
         col3.metric("Output Impedance (Zout)", f"{Zout/1000:.2f} kΩ")
 
         if Vce < 0.2: st.warning("Transistor may be in saturation.")
+
+        # Frequency Response
+        fr = bjtfreq.cb_response(Vcc, R1, R2, Rc, Re, beta)
+        if fr["cutoff"][0]: st.warning("Transistor is cut off (Ic ≤ 0), so there is no small-signal frequency response.")
+        else:
+            st.subheader("Frequency Response (Rsig = 50 Ω, RL = 10 kΩ, Cin = Cout = 10 µF, Cb = 100 µF)")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Low Corner (f_L)", f"{fr['f_low'][0]:.1f} Hz")
+            col2.metric("High Corner (f_H)", f"{fr['f_high'][0]/1e6:.2f} MHz")
+            col3.metric("Gain-Bandwidth (GBW)", f"{fr['GBW'][0]/1e6:.0f} MHz")
+            st.caption(f"Loaded midband gain {fr['Av_mid'][0]:.1f}; time-constant estimates f_L ≈ {fr['f_low_est'][0]:.1f} Hz, f_H ≈ {fr['f_high_est'][0]/1e6:.2f} MHz.")
+            fig, ax = plt.subplots()
+            ax.semilogx(fr['f'], fr['gain_db'][0])
+            ax.axhline(20 * np.log10(abs(fr['Av_mid'][0])) - 3, color='gray', linestyle=':')
+            ax.set_title('Gain vs Frequency'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('Gain (dB)')
+            ax.grid(which='both', linestyle='--')
+            st.pyplot(fig)
+
+        # --- Noise ---
+        f_noise = np.logspace(1, 5, 300)
+        nz = noise.cb_amplifier(Vcc, R1, R2, Rc, Re, beta, f_noise)
+        if nz["cutoff"]: st.warning("Transistor is cut off (Ic ≤ 0), so there is no small-signal noise.")
+        else:
+            i1k = np.searchsorted(f_noise, 1e3)
+            st.subheader("Noise Analysis (Rsig = 50 Ω, RL = 10 kΩ, base bypassed)")
+            col1, col2 = st.columns(2)
+            col1.metric("Input Noise @ 1 kHz", f"{np.sqrt(nz['in_psd'][i1k])*1e9:.2f} nV/√Hz")
+            col2.metric("Output Noise (10 Hz - 100 kHz)", f"{nz['out_rms']*1e6:.2f} µV rms")
+            fig, ax = plt.subplots()
+            ax.loglog(f_noise, np.sqrt(nz['in_psd']) * 1e9)
+            ax.set_title('Input-Referred Noise Density'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('nV/√Hz')
+            ax.grid(which='both', linestyle='--')
+            st.pyplot(fig)
     except Exception: 
-        st.error(f"Invalid input. Please check all values.")
\ No newline at end of file
+        st.error(f"Invalid input. Please check all values.")
+
+# --- Live Exploration ---
+st.write("---")
+if st.checkbox("Live exploration (sliders around the entered design)", key="live_cb"):
+    surfaces.live_panel(st, analysis.bjt_cb, {"Vcc": "vcc_cb", "R1": "r1_cb", "R2": "r2_cb", "Rc": "rc_cb", "Re": "re_cb", "beta": "beta_cb"},
+                        ["R1", "R2", "Re", "beta"],
+                        [("Collector Current (Icq)", "Ic", lambda v: f"{v*1000:.2f} mA"),
+                         ("Voltage Gain (Av)", "Av", lambda v: f"{v:.2f}"),
+                         ("Input Impedance (Zin)", "Zin", lambda v: f"{v:.2f} Ω")], "cb",
+                        warning=lambda res: "Transistor may be in saturation." if res["Vce"] < 0.2 else None)
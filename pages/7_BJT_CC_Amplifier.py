@@ -2,6 +2,11 @@
 import streamlit as st
 import helpers
 import numpy as np
+import matplotlib.pyplot as plt
+import analysis
+import surfaces
+import bjtfreq
+import noise
 
 st.title("🔌 BJT Common-Collector (Emitter-Follower)")
 
@@ -33,6 +38,13 @@ with st.expander("Formulas & Concepts Used"):
     st.latex(r"Z_{base} = \beta (r_e' + R_E) \quad | \quad Z_{in} = R_1 \parallel R_2 \parallel Z_{base}")
     st.markdown("- **Output Impedance ($Z_{out}$):** Low.")
     st.latex(r"Z_{out} = R_E \parallel r_e'")
+    st.subheader("Frequency Response")
+    st.markdown("- **Hybrid-π Model:** $g_m = I_C/26\\text{mV}$, $r_\\pi = \\beta/g_m$, with $C_\\pi$ from the transition frequency $f_T$ and a collector-base capacitance $C_\\mu$.")
+    st.latex(r"C_\pi = \frac{g_m}{2\pi f_T} - C_\mu")
+    st.markdown("- **Corner Estimates:** Short-circuit time constants of the coupling/bypass capacitors (low corner) and open-circuit time constants of $C_\\pi$, $C_\\mu$ (high corner). The curve and the $-3$ dB corners themselves come from the full circuit.")
+    st.latex(r"f_L \approx \sum_k \frac{1}{2\pi R_{k}^{sc} C_k} \qquad f_H \approx \frac{1}{2\pi \sum_k R_{k}^{oc} C_k}")
+    st.markdown("- **Bootstrapped $C_\\pi$:** The emitter follows the base, so only a fraction $(1 - A_v)$ of the signal appears across $C_\\pi$. $C_\\mu$ goes to AC ground, and the high corner sits close to $f_T$.")
+    st.markdown("- **Noise Sources:** Resistor thermal noise, collector shot noise and base shot + flicker noise, all referred to the signal source through the hybrid-π model.")
 
 # --- UI and Calculation Logic ---
 def reset_form():
@@ -98,6 +110,49 @@ if submitted:
 
         if Vce < 1.0: # Need more Vce for an emitter-follower
             st.warning("Transistor may be in saturation or close to it.")
-            
+
+        # --- Frequency Response ---
+        fr = bjtfreq.cc_response(Vcc, R1, R2, Re, beta)
+        if fr["cutoff"][0]: st.warning("Transistor is cut off (Ic ≤ 0), so there is no small-signal frequency response.")
+        else:
+            st.subheader("Frequency Response (Rsig = 50 Ω, RL = 10 kΩ, Cin = Cout = 10 µF)")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Low Corner (f_L)", f"{fr['f_low'][0]:.1f} Hz")
+            col2.metric("High Corner (f_H)", f"{fr['f_high'][0]/1e6:.1f} MHz")
+            col3.metric("Gain-Bandwidth (GBW)", f"{fr['GBW'][0]/1e6:.0f} MHz")
+            st.caption(f"Loaded midband gain {fr['Av_mid'][0]:.3f}; time-constant estimates f_L ≈ {fr['f_low_est'][0]:.1f} Hz, f_H ≈ {fr['f_high_est'][0]/1e6:.1f} MHz.")
+            fig, ax = plt.subplots()
+            ax.semilogx(fr['f'], fr['gain_db'][0])
+            ax.axhline(20 * np.log10(abs(fr['Av_mid'][0])) - 3, color='gray', linestyle=':')
+            ax.set_title('Gain vs Frequency'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('Gain (dB)')
+            ax.grid(which='both', linestyle='--')
+            st.pyplot(fig)
+
+        # --- Noise ---
+        f_noise = np.logspace(1, 5, 300)
+        nz = noise.cc_amplifier(Vcc, R1, R2, Re, beta, f_noise)
+        if nz["cutoff"]: st.warning("Transistor is cut off (Ic ≤ 0), so there is no small-signal noise.")
+        else:
+            i1k = np.searchsorted(f_noise, 1e3)
+            st.subheader("Noise Analysis (Rsig = 50 Ω, RL = 10 kΩ)")
+            col1, col2 = st.columns(2)
+            col1.metric("Input Noise @ 1 kHz", f"{np.sqrt(nz['in_psd'][i1k])*1e9:.2f} nV/√Hz")
+            col2.metric("Output Noise (10 Hz - 100 kHz)", f"{nz['out_rms']*1e6:.2f} µV rms")
+            fig, ax = plt.subplots()
+            ax.loglog(f_noise, np.sqrt(nz['in_psd']) * 1e9)
+            ax.set_title('Input-Referred Noise Density'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('nV/√Hz')
+            ax.grid(which='both', linestyle='--')
+            st.pyplot(fig)
+
     except Exception as e: 
-        st.error(f"Invalid input. Please check all values. Error: {e}")
\ No newline at end of file
+        st.error(f"Invalid input. Please check all values. Error: {e}")
+
+# --- Live Exploration ---
+st.write("---")
+if st.checkbox("Live exploration (sliders around the entered design)", key="live_cc"):
+    surfaces.live_panel(st, analysis.bjt_cc, {"Vcc": "vcc_cc", "R1": "r1_cc", "R2": "r2_cc", "Re": "re_cc", "beta": "beta_cc"},
+                        ["R1", "R2", "Re", "beta"],
+                        [("Collector Current (Icq)", "Ic", lambda v: f"{v*1000:.2f} mA"),
+                         ("Voltage Gain (Av)", "Av", lambda v: f"{v:.3f}"),
+                         ("Input Impedance (Zin)", "Zin", lambda v: f"{v/1000:.2f} kΩ")], "cc",
+                        warning=lambda res: "Transistor may be in saturation or close to it." if res["Vce"] < 1.0 else None)
@@ -2,6 +2,9 @@
 import streamlit as st
 import helpers
 import numpy as np
+import matplotlib.pyplot as plt
+import opamp
+import noise
 
 st.title("🔌 Inverting Op-Amp")
 # ✅ Added a valid image display using st.image
@@ -27,11 +30,19 @@ with st.expander("Formulas & Concepts Used"):
     st.markdown("- **Output Impedance ($Z_{out}$):**")
     st.markdown("Due to the ideal op-amp assumption, the output impedance is $0 \Omega$.")
     st.latex(r"Z_{out} \approx 0 \Omega")
+    st.subheader("Non-Ideal Op-Amp Model")
+    st.markdown("The non-ideal analysis uses a finite DC gain $A_0$ with a single pole set by the gain-bandwidth product (GBW), plus input offset, output swing and slew-rate limits. With the feedback factor $\\beta = R_{in}/(R_{in}+R_f)$:")
+    st.latex(r"A(f) = \frac{A_0}{1 + j f A_0 / GBW} \qquad A_{CL} = A_{ideal} \frac{A\beta}{1 + A\beta} \qquad f_{-3dB} \approx \beta \cdot GBW")
+    st.latex(r"V_{out,offset} = \frac{V_{os}}{\beta} \qquad FPBW = \frac{SR}{2\pi V_{swing}}")
+    st.markdown("- **Noise:** The op-amp's voltage noise $e_n$ is amplified by the noise gain $1/\\beta$; its current noise $i_n$ and the resistors' thermal noise $4kTR$ add in power.")
 
 # --- UI and Calculation Logic ---
 def reset_form():
     st.session_state.rin_opamp = ""
     st.session_state.rf_opamp = ""
+    st.session_state.vs_opamp = ""
+    st.session_state.vin_opamp = ""
+    st.session_state.fsig_opamp = ""
 
 with st.form("opamp_inv_form"):
     st.write("Enter the resistor values for the inverting amplifier.")
@@ -41,6 +52,15 @@ with st.form("opamp_inv_form"):
     with col2:
         rf_str = st.text_input("Feedback Resistor $R_f$ (Ω)", key="rf_opamp")
 
+    st.write("Non-ideal op-amp and signal (blank fields use the placeholders).")
+    n_col1, n_col2 = st.columns(2)
+    with n_col1:
+        model = st.selectbox("Op-Amp Model", list(opamp.OPAMPS), key="model_opamp")
+        vs_str = st.text_input("Supply ±Vs (V)", key="vs_opamp", placeholder="15")
+    with n_col2:
+        vin_str = st.text_input("Input Amplitude (V peak)", key="vin_opamp", placeholder="100m")
+        fsig_str = st.text_input("Signal Frequency (Hz)", key="fsig_opamp", placeholder="1k")
+
     b_col1, b_col2 = st.columns([1, 1])
     submitted = b_col1.form_submit_button("Analyze Amplifier", use_container_width=True)
     b_col2.form_submit_button("Reset", on_click=reset_form, use_container_width=True)
@@ -67,5 +87,45 @@ if submitted:
             if abs(Av) < 1:
                 st.info("Note: The magnitude of the gain is less than 1. This is an attenuator.")
 
+            # --- Non-Ideal Analysis ---
+            Vs = helpers.parse_or_default(vs_str, 15.0)
+            Vin_pk = helpers.parse_or_default(vin_str, 0.1)
+            f_sig = helpers.parse_or_default(fsig_str, 1e3)
+            params = opamp.OPAMPS[model]
+            res = opamp.design_batch(R_in, R_f, model, Vs, Vin_peak=Vin_pk, f_signal=f_sig, inverting=True)
+
+            st.subheader(f"Non-Ideal Analysis ({model})")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("DC Gain (Av)", f"{res['Av_dc']:.3f}", delta=f"{res['gain_error']*100:.3f} % vs ideal")
+            col2.metric("Bandwidth (-3dB)", f"{res['f3db']/1000:.2f} kHz")
+            col3.metric("Output Offset", f"{res['Vout_offset']*1000:.2f} mV")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Output Impedance (Zout)", f"{res['Zout']*1000:.2f} mΩ")
+            col2.metric("Full-Power Bandwidth", f"{res['FPBW']/1000:.2f} kHz")
+            col3.metric("Output Amplitude", f"{res['Vout_peak']:.2f} V")
+            if res["mode"] == "slew":
+                st.warning(f"The output is slew-rate limited at {f_sig:.0f} Hz (SR = {params['SR']/1e6:.2f} V/µs); it degrades towards a triangle wave.")
+            elif res["mode"] == "clipped":
+                st.warning(f"The output clips at ±{res['Vswing']:.2f} V.")
+
+            fig, ax = plt.subplots()
+            freq = np.logspace(1, np.log10(params["GBW"]) + 1, 500)
+            H_db = 20 * np.log10(np.abs(opamp.closed_loop(R_in, R_f, freq, params["A0"], params["GBW"], inverting=True)))
+            ax.semilogx(freq, H_db); ax.set_title('Closed-Loop Magnitude Response'); ax.set_xlabel('Frequency (Hz)'); ax.set_ylabel('Gain (dB)')
+            ax.grid(which='both', linestyle='--'); ax.axvline(res["f3db"], color='r', linestyle='--', label=f"-3 dB = {res['f3db']/1000:.2f} kHz"); ax.legend()
+            st.pyplot(fig)
+
+            # --- Noise Analysis (50 Ω source) ---
+            f_noise = np.logspace(1, np.log10(params["GBW"]), 300)
+            nz = noise.opamp_amplifier(R_in, R_f, model, f_noise, inverting=True)
+            i1k = np.searchsorted(f_noise, 1e3)
+            st.subheader("Noise Analysis (50 Ω source)")
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Input Noise @ 1 kHz", f"{np.sqrt(nz['in_psd'][i1k])*1e9:.2f} nV/√Hz")
+            col2.metric("Output Noise @ 1 kHz", f"{np.sqrt(nz['out_psd'][i1k])*1e9:.1f} nV/√Hz")
+            col3.metric("Integrated Output Noise", f"{nz['out_rms']*1e6:.2f} µV rms")
+            top_src = nz["names"][int(np.argmax(nz["contributions"][:, i1k]))]
+            st.caption(f"Integrated from 10 Hz to the GBW. Largest contributor at 1 kHz: {top_src}.")
+
     except Exception as e:
         st.error(f"Invalid input. Please check all values. Error: {e}")
\ No newline at end of file
@@ -0,0 +1,280 @@
+# records.py
+# Contains typed result records for the calculators.
+#
+# Every analysis has one Schema: its input and output fields with units and
+# dtypes. The schema gives two views of the same layout: a __slots__
+# dataclass for a single result (what a form submit produces) and a NumPy
+# structured dtype for batches (what sweeps and jobs produce). evaluate()
+# runs the vectorized analysis and fills whichever fits the inputs, so
+# results move between the analysis functions, the sweep engine and the UI
+# as one typed block instead of dicts of floats and formatted strings. A
+# Schema is callable like its analysis, so resultstore.sweep and jobs.Job
+# take one directly.
+#
+# Export works from the structured buffer directly. columns() returns
+# zero-copy field views (what resultstore and jobs consume), to_arrow()
+# hands one buffer per field to pyarrow, and write_ndjson() / write_csv()
+# render whole columns at once with no per-row dict building.
+
+import dataclasses
+import json
+import os
+import tempfile
+import time
+from typing import Callable, Dict, IO, Iterator, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+import analysis
+import opamp
+
+class Field(NamedTuple):
+    """One column of a schema."""
+    name: str
+    unit: str = ""
+    dtype: str = "f8"
+
+_PY_TYPES = {"f": float, "i": int, "b": bool, "U": str}
+
+# ==============================================================================
+# SECTION 1: SCHEMAS
+# ==============================================================================
+
+class Schema:
+    """Fields of one analysis plus its single-record class and batch dtype."""
+
+    def __init__(self, name: str, func: Callable[..., Dict[str, np.ndarray]],
+                 inputs: Sequence[Field], outputs: Sequence[Field]):
+        self.name, self.func = name, func
+        self.inputs, self.outputs = tuple(inputs), tuple(outputs)
+        self.fields = self.inputs + self.outputs
+        self.dtype = np.dtype([(f.name, f.dtype) for f in self.fields])
+        class_name = "".join(part.title() for part in name.split("_")) + "Result"
+        self.record = dataclasses.make_dataclass(
+            class_name, [(f.name, _PY_TYPES[np.dtype(f.dtype).kind]) for f in self.fields], slots=True)
+        self.record.schema = self
+
+    @property
+    def names(self) -> List[str]:
+        return [f.name for f in self.fields]
+
+    @property
+    def units(self) -> Dict[str, str]:
+        return {f.name: f.unit for f in self.fields}
+
+    def empty(self, n: int) -> np.ndarray:
+        """A zeroed batch of n rows."""
+        return np.zeros(n, dtype=self.dtype)
+
+    def from_columns(self, columns: Dict[str, object]) -> np.ndarray:
+        """Batch from a dict of columns (broadcast against each other; extra keys ignored)."""
+        values = [columns[n] for n in self.names]
+        arrays = np.broadcast_arrays(*[np.asarray(v) for v in values])
+        out = self.empty(int(np.prod(arrays[0].shape)))
+        for name, a in zip(self.names, arrays):
+            out[name] = a.ravel()
+        return out
+
+    def from_records(self, records: Sequence[object]) -> np.ndarray:
+        """Batch from a sequence of single records."""
+        return np.array([dataclasses.astuple(r) for r in records], dtype=self.dtype)
+
+    def to_record(self, row: np.void) -> object:
+        """Single record from one row of a batch."""
+        return self.record(*row.tolist())
+
+    def iter_records(self, batch: np.ndarray) -> Iterator[object]:
+        for row in batch.tolist():
+            yield self.record(*row)
+
+    def __call__(self, **inputs) -> Union[object, np.ndarray]:
+        """Same as evaluate(), so a schema can stand in for its analysis function."""
+        return self.evaluate(**inputs)
+
+    def evaluate(self, **inputs) -> Union[object, np.ndarray]:
+        """
+        Runs the analysis. Scalar inputs give one record; any array input
+        gives a structured batch with one row per broadcast element.
+        """
+        missing = [f.name for f in self.inputs if f.name not in inputs]
+        if missing:
+            raise ValueError(f"{self.name} needs inputs {missing}.")
+        result = dict(inputs)
+        result.update(self.func(**inputs))
+        batch = self.from_columns(result)
+        if all(np.ndim(v) == 0 for v in inputs.values()):
+            return self.to_record(batch[0])
+        return batch
+
+
+def _opamp(Rin, Rf, model, Vsupply, Vin_peak, f_signal, inverting):
+    """opamp.design_batch for a batch that may mix models (one call per model)."""
+    Rin, Rf, model, Vsupply, Vin_peak, f_signal, inverting = np.broadcast_arrays(
+        np.asarray(Rin, dtype=float), np.asarray(Rf, dtype=float), np.asarray(model), np.asarray(Vsupply, dtype=float),
+        np.asarray(Vin_peak, dtype=float), np.asarray(f_signal, dtype=float), np.asarray(inverting, dtype=bool))
+    out = {}
+    for m in np.unique(model):
+        for inv in np.unique(inverting):
+            sel = (model == m) & (inverting == inv)
+            part = opamp.design_batch(Rin[sel], Rf[sel], str(m), Vsupply[sel], Vin_peak=Vin_peak[sel],
+                                      f_signal=f_signal[sel], inverting=bool(inv))
+            for k, v in part.items():
+                if k not in out:
+                    out[k] = np.empty(Rin.shape, dtype=np.asarray(v).dtype)
+                out[k][sel] = v
+    return out
+
+_BIAS = [Field("Vb", "V"), Field("Ve", "V"), Field("Ie", "A"), Field("Ic", "A"), Field("Vce", "V"),
+         Field("re_prime", "Ω")]
+_AMP = [Field("Av"), Field("Zin", "Ω"), Field("Zout", "Ω")]
+_DIVIDER = [Field("Vcc", "V"), Field("R1", "Ω"), Field("R2", "Ω")]
+
+SCHEMAS: Dict[str, Schema] = {s.name: s for s in [
+    Schema("bjt_ce", analysis.bjt_ce, _DIVIDER + [Field("Rc", "Ω"), Field("Re", "Ω"), Field("beta")], _BIAS + _AMP),
+    Schema("bjt_cb", analysis.bjt_cb, _DIVIDER + [Field("Rc", "Ω"), Field("Re", "Ω"), Field("beta")], _BIAS + _AMP),
+    Schema("bjt_cc", analysis.bjt_cc, _DIVIDER + [Field("Re", "Ω"), Field("beta")], _BIAS + _AMP),
+    Schema("rlc_series", analysis.rlc_series,
+           [Field("R", "Ω"), Field("L", "H"), Field("C", "F"), Field("V_peak", "V"), Field("f", "Hz")],
+           [Field("omega", "rad/s"), Field("Xl", "Ω"), Field("Xc", "Ω"), Field("X_total", "Ω"), Field("Z", "Ω"),
+            Field("I_peak", "A"), Field("phase", "rad"), Field("PF"), Field("f0", "Hz")]),
+    Schema("rc_low_pass", analysis.rc_low_pass, [Field("R", "Ω"), Field("C", "F"), Field("f", "Hz")],
+           [Field("fc", "Hz"), Field("H_db", "dB")]),
+    Schema("rc_high_pass", analysis.rc_high_pass, [Field("R", "Ω"), Field("C", "F"), Field("f", "Hz")],
+           [Field("fc", "Hz"), Field("H_db", "dB")]),
+    Schema("opamp", _opamp,
+           [Field("Rin", "Ω"), Field("Rf", "Ω"), Field("model", dtype="U8"), Field("Vsupply", "V"),
+            Field("Vin_peak", "V"), Field("f_signal", "Hz"), Field("inverting", dtype="?")],
+           [Field("beta"), Field("Av_ideal"), Field("Av_dc"), Field("gain_error"), Field("f3db", "Hz"),
+            Field("Zin", "Ω"), Field("Zout", "Ω"), Field("Vout_offset", "V"), Field("Vswing", "V"),
+            Field("FPBW", "Hz"), Field("Vout_peak", "V"), Field("mode", dtype="U8")]),
+]}
+
+def schema(name: str) -> Schema:
+    if name not in SCHEMAS:
+        raise ValueError(f"No schema for '{name}'.")
+    return SCHEMAS[name]
+
+def evaluate(name: str, **inputs) -> Union[object, np.ndarray]:
+    """Shorthand for schema(name).evaluate(**inputs)."""
+    return schema(name).evaluate(**inputs)
+
+# ==============================================================================
+# SECTION 2: EXPORT
+# ==============================================================================
+
+def columns(batch: np.ndarray, names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """Field views into the batch buffer (no copy), e.g. for resultstore.ResultWriter.append."""
+    return {n: batch[n] for n in (names or batch.dtype.names)}
+
+def as_columns(result: Union[Dict[str, object], np.ndarray, object]) -> Dict[str, object]:
+    """
+    Column dict from whatever an analysis returned: a structured batch
+    (field views), a single record (its fields) or an existing dict.
+    """
+    if isinstance(result, np.ndarray) and result.dtype.names:
+        return columns(result)
+    if dataclasses.is_dataclass(result):
+        return {f.name: getattr(result, f.name) for f in dataclasses.fields(result)}
+    return result
+
+def to_arrow(batch: np.ndarray, schema_: Optional[Schema] = None):
+    """
+    The batch as a pyarrow Table. Arrow is columnar, so each field is
+    gathered into one contiguous buffer that Arrow then owns (no per-value
+    conversion); units from the schema go into the field metadata.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ImportError("to_arrow() needs the optional 'pyarrow' package.") from None
+    units = schema_.units if schema_ is not None else {}
+    arrays, fields = [], []
+    for name in batch.dtype.names:
+        arr = pa.array(np.ascontiguousarray(batch[name]))
+        arrays.append(arr)
+        fields.append(pa.field(name, arr.type, metadata={"unit": units[name]} if units.get(name) else None))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+def _column_text(col: np.ndarray, json_mode: bool) -> List[str]:
+    """Text of every value of one column (shortest round-trip repr for floats)."""
+    kind = col.dtype.kind
+    if kind == "f":
+        text = list(map(repr, col.tolist()))
+        if json_mode and not np.all(np.isfinite(col)):
+            bad = np.flatnonzero(~np.isfinite(col))
+            for i in bad.tolist():
+                text[i] = "null"
+        return text
+    if kind == "b":
+        return ["true" if v else "false" for v in col.tolist()] if json_mode else list(map(str, col.tolist()))
+    if kind in "iu":
+        return list(map(str, col.tolist()))
+    # Strings: quote each distinct value once
+    uniq, inverse = np.unique(col, return_inverse=True)
+    if json_mode:
+        quoted = [json.dumps(str(u)) for u in uniq]
+    else:
+        quoted = ['"' + str(u).replace('"', '""') + '"' if any(c in str(u) for c in ',"\n') else str(u)
+                  for u in uniq]
+    return [quoted[i] for i in inverse.tolist()]
+
+def _write_rows(batch: np.ndarray, dest: Union[str, IO[str]], template: str, json_mode: bool,
+                header: Optional[str], chunk_rows: int) -> int:
+    fh = open(dest, "w", encoding="utf-8", newline="") if isinstance(dest, str) else dest
+    try:
+        if header is not None:
+            fh.write(header + "\n")
+        for lo in range(0, len(batch), chunk_rows):
+            part = batch[lo:lo + chunk_rows]
+            text = [_column_text(part[n], json_mode) for n in part.dtype.names]
+            fh.write("\n".join(template % row for row in zip(*text)))
+            fh.write("\n")
+    finally:
+        if isinstance(dest, str):
+            fh.close()
+    return len(batch)
+
+def write_ndjson(batch: np.ndarray, dest: Union[str, IO[str]], chunk_rows: int = 100_000) -> int:
+    """One JSON object per row (non-finite floats as null); returns the row count."""
+    template = "{" + ", ".join(json.dumps(n).replace("%", "%%") + ": %s" for n in batch.dtype.names) + "}"
+    return _write_rows(batch, dest, template, True, None, chunk_rows)
+
+def write_csv(batch: np.ndarray, dest: Union[str, IO[str]], chunk_rows: int = 100_000) -> int:
+    """CSV with a header row of field names; returns the row count."""
+    template = ",".join(["%s"] * len(batch.dtype.names))
+    return _write_rows(batch, dest, template, False, ",".join(batch.dtype.names), chunk_rows)
+
+# ==============================================================================
+# SECTION 3: BENCHMARK
+# ==============================================================================
+
+def benchmark(n: int = 1_000_000, dict_rows: int = 20_000) -> Dict[str, float]:
+    """
+    Common-emitter batch of n designs: evaluate() into a structured batch
+    and write NDJSON, versus the per-row dict + json.dumps route (timed on
+    `dict_rows` rows and extrapolated). Also reports bytes per record.
+    Output goes to a temporary directory that is removed afterwards.
+    """
+    tmp = tempfile.TemporaryDirectory(prefix="records_bench_")
+    path = os.path.join(tmp.name, "bench")
+    rng = np.random.default_rng(0)
+    inputs = {"Vcc": 12.0, "R1": rng.uniform(20e3, 100e3, n), "R2": rng.uniform(5e3, 20e3, n),
+              "Rc": rng.uniform(1e3, 10e3, n), "Re": rng.uniform(500, 2e3, n), "beta": rng.uniform(80, 300, n)}
+    s = schema("bjt_ce")
+    t0 = time.perf_counter()
+    batch = s.evaluate(**inputs)
+    t_eval = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    write_ndjson(batch, path + ".ndjson")
+    t_write = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    with open(path + ".dicts.ndjson", "w") as fh:
+        for i in range(dict_rows):
+            row = {k: (float(v[i]) if np.ndim(v) else v) for k, v in inputs.items()}
+            row.update({k: float(v) for k, v in analysis.bjt_ce(**row).items()})
+            fh.write(json.dumps(row) + "\n")
+    t_dicts = (time.perf_counter() - t0) * n / dict_rows
+    tmp.cleanup()
+    return {"rows": n, "evaluate_s": t_eval, "ndjson_s": t_write, "dict_route_s": t_dicts,
+            "speedup": t_dicts / (t_eval + t_write), "bytes_per_record": s.dtype.itemsize}
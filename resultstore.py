@@ -0,0 +1,334 @@
+# resultstore.py
+# Contains a columnar, memory-mapped on-disk store for large sweep results.
+# Each column is one raw file (path.<column>.bin) that is opened as an
+# np.memmap, so reading a column is zero-copy and only the pages touched by
+# a query are loaded. Rows are grouped in fixed-size chunks, and path.json
+# keeps a min/max "zone map" per chunk and column: a range query first
+# discards every chunk whose [min, max] cannot match, then scans only the
+# rest. A column can also get a sorted index (path.<column>.idx with the row
+# permutation, path.<column>.sorted with the sorted values), which answers
+# a range on that column with two binary searches.
+# Zone maps only prune when rows are clustered by the queried column, so a
+# sweep can rewrite its rows sorted by one output (cluster_by).
+
+import json
+import os
+import tempfile
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+import analysis
+import records
+from helpers import standard_values
+
+CHUNK_ROWS = 1 << 20     # Rows per zone-map chunk
+
+# ==============================================================================
+# SECTION 1: WRITING
+# ==============================================================================
+
+class ResultWriter:
+    """
+    Appends column blocks to a store, keeping the zone maps up to date as it
+    goes; close() (or leaving the `with` block) writes the metadata.
+    """
+
+    def __init__(self, path: str, schema: Dict[str, str], chunk_rows: int = CHUNK_ROWS):
+        self.path, self.chunk_rows = path, int(chunk_rows)
+        self.schema = {name: np.dtype(dtype).str for name, dtype in schema.items()}
+        self.n_rows = 0
+        self._files = {name: open(f"{path}.{name}.bin", "wb") for name in self.schema}
+        self._zones: Dict[str, Tuple[List[float], List[float]]] = {name: ([], []) for name in self.schema}
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def append(self, columns: Dict[str, np.ndarray]) -> None:
+        """Appends one block of rows; every schema column must be present with the same length."""
+        missing = set(self.schema) - set(columns)
+        if missing:
+            raise KeyError(f"Missing columns: {', '.join(sorted(missing))}.")
+        lengths = {len(np.atleast_1d(columns[name])) for name in self.schema}
+        if len(lengths) != 1:
+            raise ValueError("All columns of a block must have the same length.")
+        m = lengths.pop()
+        if m == 0:
+            return
+        # Segments of this block that fall into separate chunks
+        first = -(-self.n_rows // self.chunk_rows) * self.chunk_rows - self.n_rows
+        starts = np.r_[0, np.arange(first if first > 0 else self.chunk_rows, m, self.chunk_rows)]
+        continues = self.n_rows % self.chunk_rows != 0
+        for name, dtype in self.schema.items():
+            data = np.ascontiguousarray(np.atleast_1d(columns[name]), dtype=dtype)
+            data.tofile(self._files[name])
+            lows, highs = self._zones[name]
+            if data.dtype.kind in "biuf":
+                seg_min = np.fmin.reduceat(data, starts).astype(float).tolist()
+                seg_max = np.fmax.reduceat(data, starts).astype(float).tolist()
+            else:
+                # Text columns (e.g. a records field like the op-amp model) are stored but not range-queried
+                seg_min = seg_max = [float("nan")] * len(starts)
+            if continues:
+                lows[-1], highs[-1] = _nan_min(lows[-1], seg_min.pop(0)), _nan_max(highs[-1], seg_max.pop(0))
+            lows += seg_min
+            highs += seg_max
+        self.n_rows += m
+
+    def close(self) -> None:
+        if self._files is None:
+            return
+        for fh in self._files.values():
+            fh.close()
+        self._files = None
+        meta = {"n_rows": self.n_rows, "chunk_rows": self.chunk_rows, "columns": self.schema,
+                "zones": {name: {"min": lo, "max": hi} for name, (lo, hi) in self._zones.items()},
+                "indexes": []}
+        _write_meta(self.path, meta)
+
+
+def _nan_min(a: float, b: float) -> float:
+    return b if a != a else a if b != b else min(a, b)
+
+def _nan_max(a: float, b: float) -> float:
+    return b if a != a else a if b != b else max(a, b)
+
+def _write_meta(path: str, meta: dict) -> None:
+    tmp = path + ".json.tmp"
+    with open(tmp, "w") as fh:
+        json.dump(meta, fh)
+    os.replace(tmp, path + ".json")
+
+# ==============================================================================
+# SECTION 2: READING AND QUERIES
+# ==============================================================================
+
+class ResultStore:
+    """Read side of a store: zero-copy columns, zone-map pruned range queries and sorted indexes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path + ".json") as fh:
+            self.meta = json.load(fh)
+        self.n_rows, self.chunk_rows = self.meta["n_rows"], self.meta["chunk_rows"]
+        self.n_chunks = -(-self.n_rows // self.chunk_rows)
+        self.zones = {name: (np.array(z["min"], dtype=float), np.array(z["max"], dtype=float))
+                      for name, z in self.meta["zones"].items()}
+        self._columns: Dict[str, np.ndarray] = {}
+        self.last_query: Dict[str, object] = {}
+
+    @classmethod
+    def open(cls, path: str) -> "ResultStore":
+        return cls(path)
+
+    @staticmethod
+    def temp_path() -> str:
+        """Returns a fresh base path in the temp directory for a new store."""
+        fd, path = tempfile.mkstemp(prefix="results_")
+        os.close(fd)
+        return path
+
+    def __len__(self) -> int:
+        return self.n_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.meta["columns"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        """The whole column as a read-only np.memmap (no data is read until it is used)."""
+        col = self._columns.get(name)
+        if col is None:
+            if name not in self.meta["columns"]:
+                raise KeyError(f"Unknown column '{name}'.")
+            dtype = np.dtype(self.meta["columns"][name])
+            col = np.memmap(f"{self.path}.{name}.bin", dtype=dtype, mode="r", shape=(self.n_rows,)) \
+                if self.n_rows else np.empty(0, dtype=dtype)
+            self._columns[name] = col
+        return col
+
+    # --- Indexes ---
+    def build_index(self, name: str) -> None:
+        """Writes a sorted index for `name` (the argsort needs the column to fit in memory once)."""
+        col = self[name]
+        order = np.argsort(col, kind="stable")
+        order.tofile(f"{self.path}.{name}.idx")
+        np.asarray(col[order]).tofile(f"{self.path}.{name}.sorted")
+        if name not in self.meta["indexes"]:
+            self.meta["indexes"].append(name)
+            _write_meta(self.path, self.meta)
+
+    def _index(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.memmap(f"{self.path}.{name}.idx", dtype=np.int64, mode="r", shape=(self.n_rows,))
+        values = np.memmap(f"{self.path}.{name}.sorted", dtype=self.meta["columns"][name], mode="r",
+                           shape=(self.n_rows,))
+        return order, values
+
+    # --- Queries ---
+    def candidate_chunks(self, ranges: Dict[str, Tuple[Optional[float], Optional[float]]]) -> np.ndarray:
+        """Chunks whose zone maps can satisfy every (lo, hi) range (None = unbounded)."""
+        keep = np.ones(self.n_chunks, dtype=bool)
+        for name, (lo, hi) in ranges.items():
+            zmin, zmax = self.zones[name]
+            if lo is not None:
+                keep &= zmax >= lo
+            if hi is not None:
+                keep &= zmin <= hi
+        return np.flatnonzero(keep)
+
+    def query(self, **ranges: Tuple[Optional[float], Optional[float]]) -> np.ndarray:
+        """
+        Row numbers (ascending) where every named column lies in its inclusive
+        (lo, hi) range, e.g. query(Ic=(1e-3, 2e-3), Av=(None, -50)).
+        Uses the most selective sorted index when it beats the zone-map scan;
+        self.last_query records how much was read.
+        """
+        for name in ranges:
+            if name not in self.meta["columns"]:
+                raise KeyError(f"Unknown column '{name}'.")
+            if np.dtype(self.meta["columns"][name]).kind not in "biuf":
+                raise ValueError(f"Column '{name}' is not numeric and cannot be range-queried.")
+        chunks = self.candidate_chunks(ranges)
+        scan_rows = sum(min(self.chunk_rows, self.n_rows - c * self.chunk_rows) for c in chunks.tolist())
+
+        best = None
+        for name in ranges:
+            if name in self.meta["indexes"]:
+                lo, hi = ranges[name]
+                order, values = self._index(name)
+                i0 = 0 if lo is None else int(np.searchsorted(values, lo, side="left"))
+                i1 = self.n_rows if hi is None else int(np.searchsorted(values, hi, side="right"))
+                if best is None or i1 - i0 < best[2] - best[1]:
+                    best = (name, i0, i1, order)
+
+        if best is not None and best[2] - best[1] < scan_rows:
+            name, i0, i1, order = best
+            rows = np.sort(np.asarray(order[i0:i1]))
+            mask = np.ones(len(rows), dtype=bool)
+            for other, (lo, hi) in ranges.items():
+                if other != name:
+                    mask &= _in_range(np.asarray(self[other][rows]), lo, hi)
+            self.last_query = {"method": f"index:{name}", "rows_read": i1 - i0,
+                               "chunks_scanned": 0, "chunks_total": self.n_chunks}
+            return rows[mask]
+
+        hits = []
+        for c in chunks.tolist():
+            a, b = c * self.chunk_rows, min((c + 1) * self.chunk_rows, self.n_rows)
+            mask = np.ones(b - a, dtype=bool)
+            for name, (lo, hi) in ranges.items():
+                mask &= _in_range(np.asarray(self[name][a:b]), lo, hi)
+            hits.append(a + np.flatnonzero(mask))
+        self.last_query = {"method": "zone-map scan", "rows_read": scan_rows,
+                           "chunks_scanned": len(chunks), "chunks_total": self.n_chunks}
+        return np.concatenate(hits) if hits else np.empty(0, dtype=np.int64)
+
+    def select(self, rows: np.ndarray, columns: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """Gathers the given rows of the chosen columns (all by default) into memory."""
+        return {name: np.asarray(self[name][rows]) for name in (columns or self.columns)}
+
+    # --- Export ---
+    def to_arrow(self, columns: Optional[Sequence[str]] = None):
+        """
+        The store as a pyarrow Table whose buffers point at the memory maps
+        (no copy for numeric columns), ready for pandas or polars.
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("to_arrow() needs the optional 'pyarrow' package.") from None
+        names = list(columns or self.columns)
+        return pa.table({name: pa.array(self[name]) for name in names})
+
+
+def _in_range(values: np.ndarray, lo: Optional[float], hi: Optional[float]) -> np.ndarray:
+    mask = np.ones(values.shape, dtype=bool)
+    if lo is not None:
+        mask &= values >= lo
+    if hi is not None:
+        mask &= values <= hi
+    return mask
+
+# ==============================================================================
+# SECTION 3: SWEEPS INTO A STORE
+# ==============================================================================
+
+def sweep(path: str, func: Union[Callable[..., Dict[str, np.ndarray]], records.Schema], grid: Dict[str, np.ndarray],
+          chunk_rows: int = CHUNK_ROWS, outputs: Optional[Iterable[str]] = None,
+          cluster_by: Optional[str] = None, fixed: Optional[Dict[str, object]] = None) -> ResultStore:
+    """
+    Evaluates a broadcasting analysis function (or a records.Schema, whose
+    structured batches are stored field by field with the schema's dtypes)
+    over the full Cartesian grid of `grid` plus the scalar `fixed` inputs,
+    one chunk of designs at a time, and stores the grid inputs and the
+    chosen outputs (all array outputs by default). Memory use is bounded by
+    chunk_rows, not by the size of the grid. In Cartesian order every chunk
+    spans nearly the whole range of an output, so its zone maps prune
+    nothing; `cluster_by` rewrites the rows sorted by that column (see
+    cluster()) so range queries on it skip chunks.
+    """
+    names = list(grid)
+    axes = [np.asarray(grid[n], dtype=float) for n in names]
+    shape = tuple(len(a) for a in axes)
+    total = int(np.prod(shape))
+    target = ResultStore.temp_path() if cluster_by is not None else path
+    writer = None
+    # An empty grid still makes one (empty) call, which fixes the output columns and dtypes
+    for start in range(0, max(total, 1), chunk_rows):
+        flat = np.arange(start, min(start + chunk_rows, total))
+        idx = np.unravel_index(flat, shape)
+        inputs = {n: a[i] for n, a, i in zip(names, axes, idx)}
+        result = records.as_columns(func(**(fixed or {}), **inputs))
+        keep = list(outputs) if outputs is not None else \
+            [k for k, v in result.items() if np.ndim(v) and k not in inputs and k not in (fixed or {})]
+        block = dict(inputs)
+        block.update({k: np.broadcast_to(result[k], flat.shape) for k in keep})
+        if writer is None:
+            writer = ResultWriter(target, {k: np.asarray(v).dtype for k, v in block.items()}, chunk_rows)
+        writer.append(block)
+    writer.close()
+    if cluster_by is None:
+        return ResultStore(path)
+    store = cluster(ResultStore(target), path, cluster_by)
+    remove(target)
+    return store
+
+def cluster(store: ResultStore, path: str, name: str) -> ResultStore:
+    """
+    Copies `store` to `path` with its rows sorted by column `name`, so each
+    chunk covers a narrow slice of that column and its zone map prunes.
+    Like build_index, the permutation has to fit in memory once; the rows
+    themselves are gathered one chunk at a time.
+    """
+    order = np.argsort(store[name], kind="stable")
+    with ResultWriter(path, store.meta["columns"], store.chunk_rows) as writer:
+        for start in range(0, store.n_rows, store.chunk_rows):
+            writer.append(store.select(order[start:start + store.chunk_rows]))
+    return ResultStore(path)
+
+def remove(path: str) -> None:
+    """Deletes every file of the store at `path` (columns, indexes and metadata)."""
+    base = os.path.basename(path)
+    folder = os.path.dirname(path) or "."
+    for entry in os.listdir(folder):
+        if entry == base or entry.startswith(base + "."):
+            os.remove(os.path.join(folder, entry))
+
+def ce_design_sweep(path: str, Vcc: float = 12.0, beta: float = 150.0, series: str = 'E24',
+                    chunk_rows: int = CHUNK_ROWS) -> ResultStore:
+    """
+    Every E-series combination of R1, R2 (1k-100k), Rc (1k-10k) and Re
+    (100-2.2k) for the common-emitter stage (~2 million designs with E24).
+    Rows are clustered by Ic, so Ic ranges are answered from a few chunks,
+    and Av gets a sorted index (it depends on Rc as much as on Ic, so no
+    single row order prunes both).
+    """
+    grid = {"R1": standard_values(1e3, 100e3, series), "R2": standard_values(1e3, 100e3, series),
+            "Rc": standard_values(1e3, 10e3, series), "Re": standard_values(100, 2.2e3, series)}
+    store = sweep(path, records.schema("bjt_ce"), grid, chunk_rows, cluster_by="Ic",
+                  fixed={"Vcc": Vcc, "beta": beta})
+    store.build_index("Av")
+    return store
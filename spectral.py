@@ -0,0 +1,99 @@
+# spectral.py
+# Contains FFT-based periodic steady-state analysis of linear circuits.
+# One period of any source waveform is split into harmonics with a real FFT,
+# every harmonic goes through the circuit's frequency response in a single
+# vectorized multiply, and the response is rebuilt with an inverse FFT. This
+# replaces time stepping through start-up transients for periodic sources.
+
+from typing import Callable, Dict
+
+import numpy as np
+
+SAMPLES_PER_PERIOD = 1024
+
+# ==============================================================================
+# SECTION 1: PERIODIC SOURCE WAVEFORMS (ONE PERIOD)
+# ==============================================================================
+
+def period_time(f: float, n: int = SAMPLES_PER_PERIOD) -> np.ndarray:
+    """Sample instants covering exactly one period (end point excluded)."""
+    return np.arange(n) / (n * f)
+
+def source_waveform(kind: str, V_peak: float, n: int = SAMPLES_PER_PERIOD, duty: float = 0.5) -> np.ndarray:
+    """
+    One period of a standard source: 'sine', 'square', 'triangle' or 'pwm'.
+    'pwm' is a unipolar 0..V_peak pulse train with the given duty cycle.
+    """
+    phase = np.arange(n) / n
+    if kind == "sine":
+        return V_peak * np.sin(2 * np.pi * phase)
+    if kind == "square":
+        return np.where(phase < 0.5, V_peak, -V_peak)
+    if kind == "triangle":
+        return V_peak * (1 - 4 * np.abs(((phase + 0.25) % 1) - 0.5))
+    if kind == "pwm":
+        return np.where(phase < duty, V_peak, 0.0)
+    raise ValueError(f"Unknown waveform '{kind}'.")
+
+# ==============================================================================
+# SECTION 2: HARMONIC ANALYSIS
+# ==============================================================================
+
+def harmonics(x: np.ndarray, axis: int = -1) -> np.ndarray:
+    """
+    Complex peak phasors of one period of samples: X[0] is the DC value,
+    X[k] the amplitude/phase of the k-th harmonic (cosine reference).
+    For arrays of waveforms, `axis` is the time axis.
+    """
+    n = x.shape[axis]
+    X = np.moveaxis(np.fft.rfft(x, axis=axis) / n, axis, 0)
+    X[1:] *= 2
+    if n % 2 == 0:
+        X[-1] /= 2  # Nyquist bin is not mirrored
+    return np.moveaxis(X, 0, axis)
+
+def from_harmonics(X: np.ndarray, n: int, axis: int = -1) -> np.ndarray:
+    """Inverse of harmonics(): rebuilds n samples of one period."""
+    X = np.moveaxis(X, axis, 0).copy()
+    X[1:] /= 2
+    if n % 2 == 0 and len(X) == n // 2 + 1:
+        X[-1] *= 2
+    return np.moveaxis(np.fft.irfft(X * n, n, axis=0), 0, axis)
+
+def thd(X: np.ndarray) -> float:
+    """
+    Total harmonic distortion relative to the fundamental (ratio, not %).
+    NaN when there is no fundamental to refer to (DC, or PWM at 0 % / 100 % duty).
+    """
+    fundamental = np.abs(X[1])
+    if not fundamental > 1e-12 * np.sqrt(np.sum(np.abs(X)**2)):
+        return float("nan")
+    return float(np.sqrt(np.sum(np.abs(X[2:])**2)) / fundamental)
+
+def rms(X: np.ndarray) -> float:
+    """True RMS from the harmonic phasors (Parseval)."""
+    return float(np.sqrt(np.abs(X[0])**2 + np.sum(np.abs(X[1:])**2) / 2))
+
+def periodic_steady_state(v: np.ndarray, f: float, admittance: Callable[[np.ndarray], np.ndarray]) -> Dict[str, object]:
+    """
+    Steady-state current drawn by a linear load from the periodic source `v`
+    (one period of samples at fundamental `f`). `admittance(freqs)` must
+    broadcast over an array of frequencies, e.g. analysis.rlc_series_admittance.
+    """
+    n = len(v)
+    V = harmonics(v)
+    freqs = np.arange(len(V)) * f
+    I = V * admittance(freqs)
+    i = from_harmonics(I, n)
+
+    P_harmonic = 0.5 * np.real(V * np.conj(I))
+    P_harmonic[0] = np.real(V[0] * np.conj(I[0]))
+    V_rms, I_rms = rms(V), rms(I)
+    P = float(np.sum(P_harmonic))
+    S = V_rms * I_rms
+    return {
+        "t": period_time(f, n), "v": v, "i": i, "freqs": freqs, "V": V, "I": I,
+        "P_harmonic": P_harmonic, "P": P, "P_fundamental": float(P_harmonic[1]),
+        "V_rms": V_rms, "I_rms": I_rms, "S": S, "PF": P / S if S else 0.0,
+        "THD_v": thd(V), "THD_i": thd(I),
+    }
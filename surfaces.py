@@ -0,0 +1,251 @@
+# surfaces.py
+# Contains precomputed response surfaces for slider-driven exploration.
+# A surface evaluates an analysis from analysis.py on a dense grid around an
+# operating point in one vectorized call, then answers slider moves by
+# interpolating that grid. A finer grid (twice the resolution of the first)
+# is built in the background and an exact evaluation runs once the sliders
+# have stopped moving; live_panel() runs as a polling fragment, so that
+# exact value replaces the interpolated one on its own.
+
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import helpers
+
+MAX_GRID_CELLS = 2_000_000   # Upper bound on a refined grid (all axes together)
+CACHE_SIZE = 16              # Surfaces kept by surface_for (least recently used dropped first)
+POLL_S = 0.5                 # How often live_panel's fragment checks for the exact result
+
+
+class Debouncer:
+    """
+    Runs `func(**params)` once a caller has sent no new params for `delay`
+    seconds. Callers are told apart by a session token, so two sessions on
+    the same surface only debounce their own slider moves; finished results
+    are kept per params (the most recent `keep` of them) for every caller.
+    """
+
+    def __init__(self, func: Callable, delay: float = 0.3, keep: int = 32):
+        self.func = func
+        self.delay = delay
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._timers: Dict[str, Tuple[tuple, threading.Timer]] = {}
+        self._results: "OrderedDict[tuple, dict]" = OrderedDict()
+
+    @staticmethod
+    def _key(params: dict) -> tuple:
+        return tuple(sorted(params.items()))
+
+    def submit(self, token: str, /, **params) -> None:
+        key = self._key(params)
+        with self._lock:
+            if key in self._results:
+                return
+            pending = self._timers.get(token)
+            if pending is not None:
+                if pending[0] == key:
+                    return
+                pending[1].cancel()
+            timer = threading.Timer(self.delay, self._run, args=(token, key), kwargs=params)
+            timer.daemon = True
+            self._timers[token] = (key, timer)
+            timer.start()
+
+    def _run(self, token: str, key: tuple, **params) -> None:
+        result = self.func(**params)
+        with self._lock:
+            self._results[key] = result
+            self._results.move_to_end(key)
+            while len(self._results) > self.keep:
+                self._results.popitem(last=False)
+            if self._timers.get(token, (None,))[0] == key:
+                del self._timers[token]
+
+    def result_for(self, **params) -> Optional[dict]:
+        """Returns the exact result if it has been computed for exactly these params."""
+        key = self._key(params)
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+            return result
+
+
+class ResponseSurface:
+    """
+    Gridded outputs of `func` over the slider axes, with the other inputs fixed.
+
+    `func` is one of the broadcasting analyses (e.g. analysis.bjt_ce).
+    `center` holds every input of `func`; `axes` names the inputs that get a
+    slider. Each axis spans center/span .. center*span on a log scale.
+    """
+
+    def __init__(self, func: Callable, center: Dict[str, float], axes: Sequence[str],
+                 span: float = 2.0, points: int = 9, debounce: float = 0.3):
+        self.func = func
+        self.center = dict(center)
+        self.axes = list(axes)
+        self.span = span
+        self._lock = threading.Lock()
+        self._refiner: Optional[threading.Thread] = None
+        self._grid = self._build(points)
+        self._exact = Debouncer(func, debounce)
+        # Background refinement target: double the initial resolution, within MAX_GRID_CELLS
+        cap = int(MAX_GRID_CELLS ** (1 / len(self.axes)))
+        self.refined_points = max(points, min(2 * (points - 1) + 1, cap))
+
+    # --- Grid construction ---
+    def bounds(self, name: str) -> Tuple[float, float]:
+        """Returns the (low, high) slider range of an axis."""
+        c = self.center[name]
+        return (c / self.span, c * self.span)
+
+    def _build(self, points: int):
+        log_axes = [np.linspace(*np.log(self.bounds(n)), points) for n in self.axes]
+        params = dict(self.center)
+        # Sparse open mesh: each axis keeps its own dimension and the analysis
+        # broadcasts them into the full grid in one call.
+        for name, grid in zip(self.axes, np.meshgrid(*np.exp(log_axes), indexing="ij", sparse=True)):
+            params[name] = grid
+        with np.errstate(divide="ignore", invalid="ignore"):
+            raw = self.func(**params)
+        shape = tuple(len(a) for a in log_axes)
+        values = {k: np.broadcast_to(np.asarray(v, dtype=float), shape) for k, v in raw.items()}
+        return log_axes, values
+
+    @property
+    def points(self) -> int:
+        return len(self._grid[0][0])
+
+    def refine(self, points: int) -> None:
+        """Rebuilds the grid at a higher resolution and swaps it in."""
+        grid = self._build(points)
+        with self._lock:
+            self._grid = grid
+
+    def refine_async(self, points: Optional[int] = None) -> None:
+        """
+        Starts a background refinement (default: refined_points, twice the
+        initial resolution) unless one is running or already done.
+        """
+        points = points or self.refined_points
+        if self.points >= points or (self._refiner is not None and self._refiner.is_alive()):
+            return
+        self._refiner = threading.Thread(target=self.refine, args=(points,), daemon=True)
+        self._refiner.start()
+
+    # --- Lookup ---
+    def interpolate(self, **params) -> Dict[str, float]:
+        """Multilinear interpolation of every output at the given slider values."""
+        with self._lock:
+            log_axes, values = self._grid
+        lo_idx, weights = [], []
+        for name, axis in zip(self.axes, log_axes):
+            x = np.clip(np.log(params.get(name, self.center[name])), axis[0], axis[-1])
+            i = int(np.clip(np.searchsorted(axis, x) - 1, 0, len(axis) - 2))
+            lo_idx.append(i)
+            weights.append((x - axis[i]) / (axis[i + 1] - axis[i]))
+        corners = np.array(np.meshgrid(*[[0, 1]] * len(self.axes), indexing="ij")).reshape(len(self.axes), -1).T
+        out = {}
+        for key, grid in values.items():
+            total = 0.0
+            for corner in corners:
+                w = np.prod([t if c else 1 - t for c, t in zip(corner, weights)])
+                total += w * grid[tuple(i + c for i, c in zip(lo_idx, corner))]
+            out[key] = float(total)
+        return out
+
+    def exact(self, **params) -> Dict[str, float]:
+        """Evaluates the analysis directly at the given slider values."""
+        full = {**self.center, **params}
+        return {k: float(v) for k, v in self.func(**full).items()}
+
+    def lookup(self, *, session: str = "", **params) -> Tuple[Dict[str, float], bool]:
+        """
+        Returns (values, is_exact). Serves the exact result once the debounced
+        evaluation for these params has finished, the interpolated one before
+        that. `session` keeps one caller's slider moves from cancelling another's.
+        """
+        self.refine_async()
+        exact = self._exact.result_for(**{**self.center, **params})
+        if exact is not None:
+            return {k: float(v) for k, v in exact.items()}, True
+        self._exact.submit(session, **{**self.center, **params})
+        return self.interpolate(**params), False
+
+
+_SURFACE_CACHE: "OrderedDict[tuple, ResponseSurface]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
+def surface_for(func: Callable, center: Dict[str, float], axes: Sequence[str],
+                span: float = 2.0, points: int = 9) -> ResponseSurface:
+    """
+    Returns the shared surface for this analysis and design, building it on
+    first use. Only the CACHE_SIZE most recently used surfaces are kept.
+    """
+    key = (func.__module__, func.__qualname__, tuple(sorted(center.items())), tuple(axes), span, points)
+    with _CACHE_LOCK:
+        surface = _SURFACE_CACHE.get(key)
+        if surface is not None:
+            _SURFACE_CACHE.move_to_end(key)
+            return surface
+    surface = ResponseSurface(func, center, axes, span, points)
+    with _CACHE_LOCK:
+        surface = _SURFACE_CACHE.setdefault(key, surface)
+        _SURFACE_CACHE.move_to_end(key)
+        while len(_SURFACE_CACHE) > CACHE_SIZE:
+            _SURFACE_CACHE.popitem(last=False)
+    return surface
+
+
+def clear_cache() -> None:
+    """Drops every cached surface (e.g. after analysis.py changes)."""
+    with _CACHE_LOCK:
+        _SURFACE_CACHE.clear()
+
+
+def live_panel(st, func: Callable, keys: Dict[str, str], axes: Sequence[str],
+               metrics: List[Tuple[str, str, Callable[[float], str]]], suffix: str,
+               warning: Optional[Callable[[Dict[str, float]], Optional[str]]] = None,
+               labels: Optional[Dict[str, str]] = None, span: float = 2.0, points: int = 9,
+               invalid: str = "Enter a valid design above to explore around it.") -> None:
+    """
+    Slider panel around the design entered in a page's form. `keys` maps
+    every input of `func` to its session_state key, `metrics` lists
+    (label, output, format) triples and `warning` maps a result to an
+    optional warning. Runs as a fragment where Streamlit supports it, which
+    reruns every POLL_S seconds and so picks up the exact evaluation once it
+    is in, without blocking the script while it is computed.
+    """
+    session = st.session_state.setdefault("live_session", uuid.uuid4().hex)
+
+    def body():
+        try:
+            center = {name: helpers.parse_engineering_notation(st.session_state.get(key, ""))
+                      for name, key in keys.items()}
+            surface = surface_for(func, center, axes, span, points)
+            sliders = {}
+            cols = st.columns(min(2, len(axes)))
+            for i, name in enumerate(axes):
+                lo, hi = surface.bounds(name)
+                sliders[name] = cols[i % len(cols)].slider((labels or {}).get(name, name), float(lo), float(hi),
+                                                          float(center[name]), key=f"live_{name}_{suffix}")
+            res, exact = surface.lookup(session=session, **sliders)
+        except Exception:
+            st.info(invalid)
+            return
+        for col, (label, output, fmt) in zip(st.columns(len(metrics)), metrics):
+            col.metric(label, fmt(res[output]))
+        st.caption("Exact result." if exact else "Interpolated from the precomputed grid; the exact value replaces it when the sliders settle.")
+        message = warning(res) if warning is not None else None
+        if message:
+            st.warning(message)
+
+    fragment = getattr(st, "fragment", None)
+    (fragment(body, run_every=POLL_S) if fragment is not None else body)()
@@ -0,0 +1,34 @@
+# tests/test_bjtfreq.py
+# Checks the midband gain and cut-off handling of the hybrid-pi stage responses.
+
+import numpy as np
+
+import analysis
+import bjtfreq
+
+
+def test_cc_midband_ignores_cpi_peaking():
+    # Low-impedance source and a heavy load: C_pi lifts |H| above the midband near f_T
+    r = bjtfreq.cc_response(12.0, 47e3, 47e3, 1e3, 150.0, Rsig=1.0, RL=100.0)
+    q = analysis.bjt_divider_bias(12.0, 47e3, 47e3, 0.0, 1e3)
+    R_load = analysis.parallel(1e3, 100.0)
+    expected = R_load / (q["re_prime"] + R_load)
+    assert np.abs(r["H"][0]).max() > 1.02 * expected
+    assert abs(r["Av_mid"][0] - expected) < 2e-3 * expected
+
+
+def test_ce_midband_matches_flat_region():
+    r = bjtfreq.ce_response(12.0, 47e3, 10e3, 3.3e3, 1e3, 150.0)
+    f, mag = r["f"], np.abs(r["H"][0])
+    flat = (f > 10 * r["f_low"][0]) & (f < r["f_high"][0] / 10)
+    assert r["Av_mid"][0] < 0
+    np.testing.assert_allclose(abs(r["Av_mid"][0]), np.median(mag[flat]), rtol=1e-3)
+
+
+def test_cutoff_designs_are_flagged():
+    # R2 = 1 kΩ puts the base below V_BE: Ic < 0
+    r = bjtfreq.ce_response(12.0, 47e3, np.array([10e3, 1e3]), 3.3e3, 1e3, 150.0)
+    np.testing.assert_array_equal(r["cutoff"], [False, True])
+    for key in ("Av_mid", "f_low", "f_high", "GBW", "f_low_est", "f_high_est"):
+        assert np.isfinite(r[key][0]) and np.isnan(r[key][1]), key
+    assert np.all(np.isnan(r["H"][1])) and np.all(np.isfinite(r["H"][0]))
@@ -0,0 +1,43 @@
+# tests/test_decimate.py
+# Checks chunked waveform stores against in-memory ones and that their temp files go away.
+
+import gc
+import os
+
+import numpy as np
+
+import decimate
+
+
+def _exp(t):
+    return 1 - np.exp(-t)
+
+
+def test_chunked_store_matches_in_memory(monkeypatch):
+    monkeypatch.setattr(decimate, "CHUNK", 1000)
+    store = decimate.SampleStore.from_function(_exp, 0.0, 1e-3, 5500)
+    ref = decimate.SampleStore.from_array(_exp(np.arange(5500) * 1e-3), 0.0, 1e-3)
+    assert isinstance(store.y, np.memmap)
+    np.testing.assert_allclose(store.y, ref.y)
+    for a, b in zip(store.levels, ref.levels):
+        np.testing.assert_allclose(a, b)
+    np.testing.assert_allclose(store.view(0, 5.5, 100)[1], ref.view(0, 5.5, 100)[1])
+    store.close()
+
+
+def test_temp_files_removed_on_close(monkeypatch):
+    monkeypatch.setattr(decimate, "CHUNK", 1000)
+    store = decimate.SampleStore.from_function(_exp, 0.0, 1e-3, 5500)
+    folder = os.path.dirname(store.y.filename)
+    assert os.listdir(folder)
+    store.close()
+    assert not os.path.exists(folder)
+
+
+def test_temp_files_removed_when_collected(monkeypatch):
+    monkeypatch.setattr(decimate, "CHUNK", 1000)
+    store = decimate.SampleStore.from_function(_exp, 0.0, 1e-3, 5500)
+    folder = os.path.dirname(store.y.filename)
+    del store
+    gc.collect()
+    assert not os.path.exists(folder)
@@ -0,0 +1,28 @@
+# tests/test_depgraph.py
+# Checks the prebuilt series RLC graph with scalar and array inputs.
+
+import numpy as np
+
+import depgraph
+
+
+def test_capacitive_reactance_scalar_and_array():
+    g = depgraph.series_rlc_graph()
+    g.set(R=10.0, L=1e-3, C=1e-6, V_peak=1.0, f=1e3)
+    assert np.isclose(g["Xc"], 1 / (2 * np.pi * 1e3 * 1e-6))
+    assert np.ndim(g["Xc"]) == 0
+    g.set(C=0.0)
+    assert g["Xc"] == np.inf
+    g.set(C=np.array([1e-6, 0.0, 2e-6]), f=np.array([1e3, 1e3, 0.0]))
+    Xc = g["Xc"]
+    assert np.isclose(Xc[0], 1 / (2 * np.pi * 1e3 * 1e-6))
+    assert np.all(np.isinf(Xc[1:]))
+
+
+def test_set_only_recomputes_downstream():
+    g = depgraph.series_rlc_graph()
+    g.set(R=10.0, L=1e-3, C=1e-6, V_peak=1.0, f=1e3)
+    g.get("Z", "f0", "I_rms")
+    g.set(V_peak=2.0)
+    g.get("Z", "f0", "I_rms")
+    assert g.evaluations["Z"] == 1 and g.evaluations["f0"] == 1 and g.evaluations["I_rms"] == 2
@@ -0,0 +1,66 @@
+# tests/test_filters.py
+# Checks that realized stages reproduce the synthesized cascade response.
+
+import numpy as np
+import pytest
+
+import filters
+import helpers
+
+CASES = [("lowpass", 1e3, None), ("highpass", 1e3, None), ("bandpass", 1e3, 100.0),
+         ("bandpass", 1e3, 1e3), ("bandpass", 1e3, 3e3), ("bandpass", 10e3, 30e3)]
+
+
+@pytest.mark.parametrize("kind", ["butterworth", "chebyshev", "bessel"])
+@pytest.mark.parametrize("order", [1, 2, 3, 4, 5, 6, 7, 8])
+@pytest.mark.parametrize("response,fc,bandwidth", CASES)
+def test_realized_matches_synthesized(kind, order, response, fc, bandwidth):
+    f = np.logspace(np.log10(fc) - 2, np.log10(fc) + 2, 801)
+    H = filters.response(kind, order, fc, f, response, bandwidth)
+    stages = filters.realize(kind, order, fc, response, bandwidth, series=None)
+    R = filters.realized_response(stages, f)
+    band = 20 * np.log10(np.abs(H)) > -80
+    err = 20 * np.log10(np.abs(R[band]) / np.abs(H[band]))
+    assert np.max(np.abs(err)) < 0.5
+
+
+def test_even_chebyshev_passband_gain_in_first_stage():
+    stages = filters.realize("chebyshev", 4, 1e3, series=None)
+    assert stages[0]["gain"] == pytest.approx(1 / np.sqrt(10 ** 0.1))
+    assert all(st["gain"] == 1.0 for st in stages[1:])
+
+
+def test_bandpass_stages_keep_positive_resistors():
+    for st in filters.realize("bessel", 7, 1e3, "bandpass", 3e3):
+        assert st["type"] == "bandpass"
+        assert min(st["R1"], st["R2"], st["R3"]) > 0
+
+
+def _is_standard(value, series):
+    return any(v == value for v in helpers.standard_values(value / 1.01, value * 1.01, series))
+
+
+@pytest.mark.parametrize("series", ["E12", "E24"])
+@pytest.mark.parametrize("response,bandwidth", [("lowpass", None), ("highpass", None), ("bandpass", 1e6)])
+def test_snapped_picofarad_stages(series, response, bandwidth):
+    # 2 MHz with 4.7 pF capacitors: every capacitor and resistor must be a real E-series value
+    fc = 2e6
+    stages = filters.realize("butterworth", 4, fc, response, bandwidth, C_base=4.7e-12, series=series)
+    for st in stages:
+        for name, value in st.items():
+            if name in ("C1", "C2", "C1a", "C1b"):
+                assert _is_standard(value, "E12"), (name, value)
+            elif name in ("R1", "R2", "R3", "R1a", "R1b", "Rg", "Rf"):
+                assert _is_standard(value, series), (name, value)
+        assert st["f0_actual"] == pytest.approx(st["f0"], rel=0.15)
+    f = np.logspace(np.log10(fc) - 2, np.log10(fc) + 2, 801)
+    H = filters.response("butterworth", 4, fc, f, response, bandwidth)
+    R = filters.realized_response(stages, f)
+    band = 20 * np.log10(np.abs(H)) > -20
+    assert np.max(np.abs(20 * np.log10(np.abs(R[band]) / np.abs(H[band])))) < 3.0
+
+
+@pytest.mark.parametrize("kind,ripple,stop", [("chebyshev", 0.0, 40.0), ("elliptic", -1.0, 40.0), ("elliptic", 1.0, 0.5)])
+def test_invalid_ripple_and_stopband_rejected(kind, ripple, stop):
+    with pytest.raises(ValueError):
+        filters.prototype(kind, 4, ripple, stop)
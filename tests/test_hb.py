@@ -0,0 +1,35 @@
+# tests/test_hb.py
+# Checks the harmonic-balance steady state against a long time-stepped run.
+
+import numpy as np
+import pytest
+
+import hb
+import mna
+import spectral
+
+F = 1e3
+STEPS = 200
+
+
+def rectifier():
+    """Half-wave rectifier: 5 V sine through 10 Ω and a diode into 10 kΩ || 470 nF (output node 3)."""
+    c = mna.Circuit()
+    c.add("V1", 1, 0, 0.0); c.add("R1", 1, 2, 10.0); c.add("RL", 3, 0, 10e3); c.add("CL", 3, 0, 0.47e-6)
+    return c, [hb.Diode(2, 3)]
+
+
+def test_rectifier_matches_time_stepping():
+    c, devs = rectifier()
+    wave = {"V1": spectral.source_waveform("sine", 5.0, 256)}
+    res = hb.solve(c, devs, F, wave, harmonics=20)
+    assert res["converged"]
+    # 40 periods is over 8 load time constants (RC = 4.7 ms): the last period is settled
+    tr = hb.transient(c, devs, F, wave, cycles=40, steps_per_cycle=STEPS, harmonics=20)
+    last, previous = tr["x"][-STEPS:, 2], tr["x"][-2 * STEPS:-STEPS, 2]
+    assert np.abs(last - previous).max() < 1e-6
+    V_tr, V_hb = spectral.harmonics(last), hb.node_harmonics(res, 3)
+    # Backward Euler at 200 steps per period is accurate to a few tenths of a percent
+    assert V_hb[0].real == pytest.approx(V_tr[0].real, rel=5e-3)
+    np.testing.assert_allclose(np.abs(V_hb[1:4]), np.abs(V_tr[1:4]), rtol=2e-2)
+    assert 3.5 < V_hb[0].real < 4.5                 # Peak minus a diode drop, less half the ripple
@@ -0,0 +1,24 @@
+# tests/test_helpers.py
+# Checks E-series lookups across the whole range of component values.
+
+import pytest
+
+import helpers
+
+
+def test_picofarad_values_keep_their_mantissas():
+    assert helpers.standard_values(1e-12, 1e-11, 'E12') == \
+        [1e-12, 1.2e-12, 1.5e-12, 1.8e-12, 2.2e-12, 2.7e-12, 3.3e-12, 3.9e-12, 4.7e-12, 5.6e-12, 6.8e-12, 8.2e-12, 1e-11]
+
+
+@pytest.mark.parametrize("value, series, expected", [
+    (4.7e-12, 'E12', 4.7e-12), (4.5e-12, 'E24', 4.7e-12), (4.4e-12, 'E24', 4.3e-12), (6.9e-13, 'E24', 6.8e-13),
+    (3.4e-10, 'E12', 3.3e-10), (5.2e-9, 'E24', 5.1e-9), (2.15e-10, 'E24', 2.2e-10),
+    (1.05e3, 'E24', 1.1e3), (47e3, 'E12', 47e3), (9.5e6, 'E24', 9.1e6),
+])
+def test_nearest_standard_value(value, series, expected):
+    assert helpers.nearest_standard_value(value, series) == pytest.approx(expected, rel=1e-12, abs=0)
+
+
+def test_resistor_range_unchanged():
+    assert helpers.standard_values(100, 200, 'E12') == [100.0, 120.0, 150.0, 180.0]
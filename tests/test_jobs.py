@@ -0,0 +1,66 @@
+# tests/test_jobs.py
+# Checks checkpointing, resume, determinism and cleanup of the chunked job runner.
+
+import os
+
+import numpy as np
+import pytest
+
+import jobs
+
+
+def _mc(path, **kwargs):
+    return jobs.ce_monte_carlo_job(str(path), n=1000, chunk_rows=150, seed=3, **kwargs)
+
+
+def test_resume_after_partial_run_matches_single_run(tmp_path):
+    partial = _mc(tmp_path / "a")
+    progress = partial.run(max_chunks=3)
+    assert progress["chunks_done"] == 3 and not partial.finished
+    resumed = _mc(tmp_path / "a")          # A new process picking the job up again
+    assert resumed.pending() == list(range(3, resumed.n_chunks))
+    resumed.run()
+    assert resumed.finished
+    store = resumed.merge()
+
+    whole = _mc(tmp_path / "b")
+    whole.run()
+    ref = whole.merge()
+    assert len(store) == len(ref) == 1000
+    for name in ref.columns:
+        np.testing.assert_array_equal(store[name], ref[name])
+    np.testing.assert_array_equal(store["row"], np.arange(1000))
+
+
+def test_chunks_are_deterministic(tmp_path):
+    job = _mc(tmp_path / "a")
+    first, again = job.run_chunk(4), job.run_chunk(4)
+    other = _mc(tmp_path / "b").run_chunk(4)
+    for name in first:
+        np.testing.assert_array_equal(first[name], again[name])
+        np.testing.assert_array_equal(first[name], other[name])
+    assert not np.array_equal(first["R1"], job.run_chunk(5)["R1"])
+
+
+def test_config_mismatch_is_refused(tmp_path):
+    _mc(tmp_path / "a").run(max_chunks=1)
+    with pytest.raises(ValueError):
+        _mc(tmp_path / "a", tolerance=0.1)
+
+
+def test_cleanup_removes_chunks_and_manifest(tmp_path):
+    job = _mc(tmp_path / "a")
+    job.run()
+    job.merge(str(tmp_path / "store"))
+    job.cleanup()
+    left = sorted(os.listdir(tmp_path))
+    assert left and all(name.startswith("store") for name in left)
+
+
+def test_empty_grid_merges_to_empty_store(tmp_path):
+    job = jobs.rlc_sweep_job(str(tmp_path / "rlc"), R=[], L=[1e-3], C=[1e-6], f=[1e3, 2e3])
+    assert job.n_rows == 0 and job.finished
+    job.run()
+    store = job.merge()
+    assert len(store) == 0
+    assert {"row", "R", "f", "Z"} <= set(store.columns)
@@ -0,0 +1,37 @@
+# tests/test_loadtest.py
+# Runs every load-test scenario once through the stand-in (and AppTest when Streamlit is installed).
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import loadtest
+
+
+@pytest.mark.parametrize("name", list(loadtest.SCENARIOS))
+def test_scenario_runs_on_standin(name):
+    scenario = loadtest.SCENARIOS[name]
+    session = loadtest.StandinSession()
+    assert session.run(scenario, None)
+    assert session.run(scenario, scenario.inputs(np.random.default_rng(0)))
+
+
+def test_every_page_has_a_scenario():
+    pages = {s.page for s in loadtest.SCENARIOS.values()}
+    assert "app.py" in pages
+    assert {p.name for p in (Path(loadtest.ROOT) / "pages").glob("*.py")} == \
+        {p.split("/", 1)[1] for p in pages if p.startswith("pages/")}
+
+
+def test_run_report_has_no_errors():
+    report = loadtest.run(concurrency=2, iterations=4, backend="standin", pages=["ohms_law", "bjt_cb"])
+    assert report["overall"]["errors"] == 0 and report["overall"]["runs"] == 8
+
+
+def test_scenario_runs_on_apptest():
+    pytest.importorskip("streamlit.testing.v1")
+    session = loadtest.AppTestSession()
+    scenario = loadtest.SCENARIOS["rc_low_pass"]
+    assert session.run(scenario, None)
+    assert session.run(scenario, scenario.inputs(np.random.default_rng(0)))
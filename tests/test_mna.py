@@ -0,0 +1,44 @@
+# tests/test_mna.py
+# Checks the cached sparse MNA path against a per-sample dense solve.
+
+import numpy as np
+
+import mna
+
+
+def test_rlc_ladder_dc_above_dense_limit():
+    # Inductors are 0 Ω branches at DC: the static pivot order meets zero pivots
+    c = mna.rlc_ladder_circuit(16)
+    top = c.topology()
+    assert top.size > mna.DENSE_LIMIT
+    values = mna.monte_carlo(c, 20)
+    x = mna.solve(top, values, 0.0)
+    assert np.all(np.isfinite(x))
+    np.testing.assert_allclose(x, mna.solve_from_scratch(top, values, 0.0), rtol=1e-10, atol=1e-12)
+    # Every node sits at the source voltage at DC
+    np.testing.assert_allclose(x[:, :top.n_nodes], 1.0, rtol=1e-10)
+
+
+def test_rlc_ladder_mixed_dc_and_ac_batch():
+    c = mna.rlc_ladder_circuit(16)
+    top = c.topology()
+    values = mna.monte_carlo(c, 10)
+    s = 2j * np.pi * np.r_[np.zeros(5), np.full(5, 1e9)]
+    x = mna.solve(top, values, s)
+    ref = mna.solve_from_scratch(top, values, s)
+    np.testing.assert_allclose(x, ref, rtol=1e-9, atol=1e-12)
+
+
+def test_transpose_solve_with_fallback():
+    c = mna.rlc_ladder_circuit(16)
+    top = c.topology()
+    values = mna.monte_carlo(c, 3)
+    fact = mna.factor(top, values, 0.0)
+    b = np.random.default_rng(0).normal(size=(3, top.size))
+    xt = fact.solve_transpose(b)
+    rows, cols, elems, signs, uses = top.stamps()
+    for k in range(3):
+        A = np.zeros((top.size, top.size))
+        terms = top.element_terms(values[k][None], 0.0)[0]
+        np.add.at(A, (rows, cols), signs * np.where(uses, terms[elems], 1.0))
+        np.testing.assert_allclose(xt[k], np.linalg.solve(A.T, b[k]), rtol=1e-9, atol=1e-12)
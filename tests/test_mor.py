@@ -0,0 +1,53 @@
+# tests/test_mor.py
+# Checks the PRIMA macromodel of an RC ladder against a dense nodal solve.
+
+import numpy as np
+import pytest
+
+import mna
+import mor
+
+SECTIONS = 300
+R, C = 1e3 / SECTIONS, 100e-12 / SECTIONS    # 1 kΩ / 100 pF in total, as in mor.benchmark
+
+
+def dense_ladder(f):
+    """V(end) / V1 from the nodal equations of the ladder, built and solved densely."""
+    n = SECTIONS                              # Unknowns: the nodes after each series R
+    Y = np.zeros((len(f), n, n), dtype=complex)
+    idx = np.arange(n)
+    Y[:, idx, idx] = 2 / R + 2j * np.pi * f[:, None] * C
+    Y[:, idx[:-1], idx[1:]] = Y[:, idx[1:], idx[:-1]] = -1 / R
+    Y[:, -1, -1] -= 1 / R                     # Last node has no series R after it
+    rhs = np.zeros((len(f), n), dtype=complex)
+    rhs[:, 0] = 1 / R                         # V1 = 1 through the first R
+    return np.linalg.solve(Y, rhs[..., None])[:, -1, 0]
+
+
+@pytest.fixture(scope="module")
+def ladder():
+    mor.clear_cache()
+    c = mna.rc_ladder_circuit(SECTIONS, R=R, C=C)
+    return c, mor.reduce(c, ["V1"], [SECTIONS + 1], order=12)
+
+
+def test_full_response_matches_dense(ladder):
+    c, _ = ladder
+    f = np.logspace(5, 9, 40)
+    np.testing.assert_allclose(mor.full_response(c, ["V1"], [SECTIONS + 1], f)[:, 0, 0], dense_ladder(f), rtol=1e-9, atol=1e-12)
+
+
+def test_prima_within_stated_tolerance(ladder):
+    # The module header quotes ~8e-5 of the peak response at order 12 over 100 kHz - 1 GHz
+    _, model = ladder
+    f = np.logspace(5, 9, 200)
+    H = dense_ladder(f)
+    err = np.abs(model.response(f)[:, 0, 0] - H) / np.abs(H).max()
+    assert err.max() < 1e-4
+    assert model.stable and model.size <= 12
+
+
+def test_prima_step_settles_to_dc_gain(ladder):
+    _, model = ladder
+    y = model.step_response([0.0, 1e-6])[:, 0, 0]
+    assert y[0] == pytest.approx(0.0, abs=1e-9) and y[1] == pytest.approx(1.0, rel=1e-6)
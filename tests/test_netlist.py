@@ -0,0 +1,57 @@
+# tests/test_netlist.py
+# Checks the netlist parser end to end: subcircuits, parameters and continuations into an mna solve.
+
+import numpy as np
+import pytest
+
+import mna
+import netlist
+
+DIVIDER = """Divider built from a parameterised subcircuit
+* Comment lines and trailing comments are dropped
+.param rtop=10k gain=2
+.subckt half a b params: r=1k
+R1 a mid {r}
+R2 mid b
++ {r*gain}
+.ends
+.subckt pair a b
+Xinner a b half r=2k
+.ends
+V1 in 0 dc 9 ac 1
+X1 in out half r={rtop}
+Rload out 0
++ 20k ; load
+C1 out 0 1n
+X2 in 0 pair $ second, nested branch
+.end
+"""
+
+
+@pytest.fixture(scope="module")
+def net():
+    return netlist.parse_string(DIVIDER)
+
+
+def test_flattened_elements(net):
+    assert net.names() == ["v1", "rload", "c1", "x1.r1", "x1.r2", "x2.xinner.r1", "x2.xinner.r2"]
+    values = dict(zip(net.names(), net.values))
+    assert values["x1.r1"] == 10e3 and values["x1.r2"] == 20e3      # {r} = rtop, {r*gain}
+    assert values["x2.xinner.r1"] == 2e3 and values["x2.xinner.r2"] == 4e3
+    assert values["rload"] == 20e3 and values["c1"] == pytest.approx(1e-9)
+    assert net.ac[net.index("V1")] == 1.0
+    assert "x1.mid" in net.node_ids and "x2.xinner.mid" in net.node_ids
+
+
+def test_to_mna_solves_the_divider(net):
+    top, values = net.to_mna()
+    out = net.node_ids["out"]
+    # DC: 9 V across 10k + 20k into a 20k load
+    x = mna.solve(top, values[None], 0.0)[0]
+    assert x[out - 1] == pytest.approx(9 * 20e3 / 50e3)
+    # AC: Thevenin 12k driving the 1 nF capacitor
+    top, values = net.to_mna(ac=True)
+    f = 10e3
+    x = mna.solve(top, values[None], 2j * np.pi * f)[0]
+    expected = 0.4 / (1 + 2j * np.pi * f * 12e3 * 1e-9)
+    assert x[out - 1] == pytest.approx(expected, rel=1e-12)
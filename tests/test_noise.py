@@ -0,0 +1,70 @@
+# tests/test_noise.py
+# Checks the adjoint noise analysis against hand-computed results and the ready-made benches.
+
+import numpy as np
+import pytest
+
+import analysis
+import filters
+import mna
+import noise
+import opamp
+
+KT = noise.K_BOLTZMANN * noise.T_ROOM
+
+
+def test_resistor_divider_output_psd():
+    # Output of a divider sees the thermal noise of R1 || R2
+    c = mna.Circuit()
+    c.add("V1", 1, 0, 1.0); c.add("R1", 1, 2, 10e3); c.add("R2", 2, 0, 4.7e3)
+    f = np.logspace(1, 5, 50)
+    r = noise.analyze(c, noise.resistor_sources(c), out_node=2, f=f, input_source="V1")
+    np.testing.assert_allclose(r["out_psd"], 4 * KT * analysis.parallel(10e3, 4.7e3), rtol=1e-9)
+    np.testing.assert_allclose(r["gain"], 4.7e3 / 14.7e3, rtol=1e-9)
+    np.testing.assert_allclose(r["source_rms"]**2 / (f[-1] - f[0]), r["contributions"][:, 0], rtol=1e-9)
+
+
+def test_rc_integrates_to_kt_over_c():
+    c = mna.Circuit()
+    c.add("V1", 1, 0, 0.0); c.add("R1", 1, 2, 1e3); c.add("C1", 2, 0, 1e-9)
+    f = np.logspace(0, 11, 4000)      # Corner at 159 kHz
+    r = noise.analyze(c, noise.resistor_sources(c), out_node=2, f=f)
+    assert r["out_rms"] == pytest.approx(np.sqrt(KT / 1e-9), rel=1e-3)
+
+
+@pytest.mark.parametrize("bench, args", [
+    (noise.ce_amplifier, (12.0, 47e3, 1e3, 3.3e3, 1e3, 150.0)),
+    (noise.cb_amplifier, (12.0, 47e3, 1e3, 3.3e3, 1e3, 150.0)),
+    (noise.cc_amplifier, (12.0, 47e3, 1e3, 1e3, 150.0)),
+])
+def test_cut_off_stage_is_flagged(bench, args):
+    # R2 = 1 kΩ puts the base below V_BE: Ic < 0 and no shot noise to speak of
+    r = bench(*args, np.logspace(1, 5, 20))
+    assert r["cutoff"] and np.isnan(r["out_rms"]) and np.isnan(r["in_psd"]).all()
+    with pytest.raises(ValueError):
+        noise.bjt_sources(-1e-3, 150.0, base=1, emitter=2, collector=3)
+
+
+def test_stage_benches_are_positive():
+    f = np.logspace(1, 5, 50)
+    for r in (noise.ce_amplifier(12.0, 47e3, 10e3, 3.3e3, 1e3, 150.0, f),
+              noise.cb_amplifier(12.0, 47e3, 10e3, 3.3e3, 1e3, 150.0, f),
+              noise.cc_amplifier(12.0, 47e3, 10e3, 1e3, 150.0, f)):
+        assert not r["cutoff"] and (r["out_psd"] > 0).all() and r["out_rms"] > 0
+
+
+@pytest.mark.parametrize("design", [
+    ("butterworth", 4, 1e3, "lowpass", None),
+    ("chebyshev", 5, 1e3, "highpass", None),      # Input divider and an RC + buffer stage
+    ("chebyshev", 3, 1e3, "bandpass", 100.0),
+    ("butterworth", 2, 1e3, "bandpass", 2000.0),  # MFB + gain stages
+])
+def test_filter_cascade_matches_realized_response(monkeypatch, design):
+    # With a near-ideal op-amp and no source resistance the netlist is exactly the realized cascade
+    monkeypatch.setitem(opamp.OPAMPS, "ideal", {"A0": 1e9, "GBW": 1e15})
+    monkeypatch.setitem(noise.OPAMP_NOISE, "ideal", noise.OPAMP_NOISE["TL081"])
+    stages = filters.realize(*design)
+    f = np.logspace(1, 5, 200)
+    r = noise.filter_cascade(stages, "ideal", f, Rs=1e-6)
+    np.testing.assert_allclose(r["gain"], np.abs(filters.realized_response(stages, f)), rtol=1e-4)
+    assert len(r["names"]) == len(r["source_rms"]) and (r["out_psd"] > 0).all()
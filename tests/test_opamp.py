@@ -0,0 +1,31 @@
+# tests/test_opamp.py
+# Checks the single-pole op-amp model against the textbook closed-loop formulas.
+
+import numpy as np
+import pytest
+
+import opamp
+
+
+@pytest.mark.parametrize("inverting", [True, False])
+def test_closed_loop_gain_and_bandwidth(inverting):
+    # TL081 (A0 = 2e5, GBW = 3 MHz) with Rin = 1 kΩ, Rf = 99 kΩ: β = 0.01
+    r = opamp.design_batch(1e3, 99e3, "TL081", 15.0, inverting=inverting)
+    A0, GBW, beta = 2e5, 3e6, 0.01
+    ideal = -99.0 if inverting else 100.0
+    assert r["Av_ideal"] == pytest.approx(ideal)
+    assert r["Av_dc"] == pytest.approx(ideal / (1 + 1 / (A0 * beta)), rel=1e-12)
+    assert r["gain_error"] == pytest.approx(-1 / (1 + A0 * beta), rel=1e-12)
+    # f3dB = β·GBW to within 1/(A0β), and the gain there is 3 dB down
+    assert r["f3db"] == pytest.approx(beta * GBW, rel=1e-3)
+    H = opamp.closed_loop(1e3, 99e3, np.array([1.0, r["f3db"]]), A0, GBW, inverting)
+    assert abs(H[0]) == pytest.approx(abs(r["Av_dc"]), rel=1e-6)
+    assert abs(H[1]) == pytest.approx(abs(r["Av_dc"]) / np.sqrt(2), rel=1e-9)
+
+
+def test_large_signal_limits():
+    # Full-power bandwidth SR / (2π Vswing); a sine above it turns slew-limited
+    r = opamp.design_batch(1e3, 9e3, "LM741", 15.0, Vin_peak=1.0, f_signal=20e3)
+    assert r["Vswing"] == pytest.approx(13.0)
+    assert r["FPBW"] == pytest.approx(0.5e6 / (2 * np.pi * 13.0))
+    assert r["mode"] == "slew" and r["Vout_peak"] == pytest.approx(0.5e6 / (4 * 20e3))
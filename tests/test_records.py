@@ -0,0 +1,47 @@
+# tests/test_records.py
+# Checks that schemas plug into sweeps and jobs like their analysis functions.
+
+import os
+
+import numpy as np
+
+import analysis
+import jobs
+import records
+import resultstore
+
+GRID = {"R1": np.geomspace(20e3, 100e3, 7), "R2": np.geomspace(5e3, 20e3, 5), "Re": [470.0, 1e3]}
+FIXED = {"Vcc": 12.0, "Rc": 3.3e3, "beta": 150.0}
+
+
+def test_sweep_accepts_schema(tmp_path):
+    by_schema = resultstore.sweep(str(tmp_path / "schema"), records.schema("bjt_ce"), GRID, fixed=FIXED)
+    by_func = resultstore.sweep(str(tmp_path / "func"), lambda **kw: analysis.bjt_ce(**FIXED, **kw), GRID)
+    assert by_schema.columns == by_func.columns
+    for name in by_func.columns:
+        np.testing.assert_array_equal(by_schema[name], by_func[name])
+
+
+def test_sweep_stores_text_fields(tmp_path):
+    model = next(iter(records.opamp.OPAMPS))
+    store = resultstore.sweep(str(tmp_path / "opamp"), records.schema("opamp"), {"Rf": [1e3, 1e4, 1e5]},
+                              fixed={"Rin": 1e3, "model": model, "Vsupply": 15.0, "Vin_peak": 0.1,
+                                     "f_signal": 1e3, "inverting": True})
+    assert store["mode"].dtype.kind == "U"
+    np.testing.assert_allclose(store["Av_ideal"], [-1.0, -10.0, -100.0])
+
+
+def test_job_accepts_schema(tmp_path):
+    make = jobs.tolerance_inputs({"R1": 47e3, "R2": 10e3, "Rc": 3.3e3, "Re": 1e3}, fixed={"Vcc": 12.0, "beta": 150.0})
+    job = jobs.Job(str(tmp_path / "job"), records.schema("bjt_ce"), 500, make, chunk_rows=200)
+    job.run()
+    store = job.merge()
+    ref = analysis.bjt_ce(12.0, store["R1"], store["R2"], store["Rc"], store["Re"], 150.0)
+    np.testing.assert_allclose(store["Ic"], ref["Ic"])
+
+
+def test_benchmark_leaves_no_files(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    out = records.benchmark(n=2000, dict_rows=200)
+    assert out["rows"] == 2000
+    assert os.listdir(tmp_path) == []
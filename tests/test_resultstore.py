@@ -0,0 +1,35 @@
+# tests/test_resultstore.py
+# Checks sweeps into a ResultStore: empty grids and zone-map pruning after clustering.
+
+import numpy as np
+
+import analysis
+import resultstore
+
+
+def ce(R1, R2, Re):
+    return analysis.bjt_ce(12.0, R1, R2, 3.3e3, Re, 150.0)
+
+
+def test_empty_grid_gives_empty_store(tmp_path):
+    store = resultstore.sweep(str(tmp_path / "empty"), ce, {"R1": [], "R2": [10e3], "Re": [1e3]})
+    assert len(store) == 0
+    assert {"R1", "Ic", "Av"} <= set(store.columns)
+    assert len(store.query(Ic=(1e-3, 2e-3))) == 0
+
+
+def test_clustered_sweep_prunes_chunks(tmp_path):
+    grid = {"R1": np.geomspace(10e3, 100e3, 40), "R2": np.geomspace(1e3, 20e3, 40), "Re": np.geomspace(100, 2.2e3, 20)}
+    plain = resultstore.sweep(str(tmp_path / "plain"), ce, grid, chunk_rows=1000)
+    store = resultstore.sweep(str(tmp_path / "clustered"), ce, grid, chunk_rows=1000, cluster_by="Ic")
+    assert len(store) == len(plain) == 32000
+    assert np.all(np.diff(store["Ic"]) >= 0)
+
+    rows = store.query(Ic=(1e-3, 2e-3))
+    assert store.last_query["chunks_scanned"] < store.last_query["chunks_total"] // 4
+    plain_rows = plain.query(Ic=(1e-3, 2e-3))
+    assert plain.last_query["chunks_scanned"] == plain.last_query["chunks_total"]
+    # Same designs, only reordered
+    got = store.select(rows, ["R1", "R2", "Re"])
+    want = plain.select(plain_rows, ["R1", "R2", "Re"])
+    assert sorted(zip(*got.values())) == sorted(zip(*want.values()))
@@ -0,0 +1,32 @@
+# tests/test_spectral.py
+# Checks harmonic analysis, THD and RMS of the standard source waveforms.
+
+import numpy as np
+import pytest
+
+import spectral
+
+
+def test_square_wave_thd():
+    # Odd harmonics at 1/k of the fundamental: THD = sqrt(π²/8 - 1) ≈ 48.3 %
+    X = spectral.harmonics(spectral.source_waveform("square", 1.0, n=1 << 16))
+    assert spectral.thd(X) == pytest.approx(np.sqrt(np.pi**2 / 8 - 1), rel=1e-3)
+
+
+def test_sine_rms_and_thd():
+    X = spectral.harmonics(spectral.source_waveform("sine", 5.0))
+    assert spectral.rms(X) == pytest.approx(5.0 / np.sqrt(2), rel=1e-12)
+    assert spectral.thd(X) == pytest.approx(0.0, abs=1e-12)
+
+
+def test_round_trip():
+    x = spectral.source_waveform("triangle", 2.0, n=256)
+    np.testing.assert_allclose(spectral.from_harmonics(spectral.harmonics(x), 256), x, atol=1e-12)
+
+
+@pytest.mark.parametrize("duty", [0.0, 1.0])
+def test_thd_without_fundamental_is_nan(duty):
+    # 0 % and 100 % duty PWM are DC: no fundamental to refer the harmonics to
+    X = spectral.harmonics(spectral.source_waveform("pwm", 3.0, duty=duty))
+    assert np.isnan(spectral.thd(X))
+    assert spectral.rms(X) == pytest.approx(3.0 * duty)
@@ -0,0 +1,51 @@
+# tests/test_surfaces.py
+# Checks the shared surface cache and per-session debouncing of exact evaluations.
+
+import time
+
+import analysis
+import surfaces
+
+CENTER = {"Vcc": 12.0, "R1": 47e3, "R2": 10e3, "Rc": 3.3e3, "Re": 1e3, "beta": 150.0}
+
+
+def _wait(surface, session, **params):
+    deadline = time.time() + 5.0
+    while time.time() < deadline:
+        res, exact = surface.lookup(session=session, **params)
+        if exact:
+            return res
+        time.sleep(0.02)
+    raise AssertionError("exact result never arrived")
+
+
+def test_surface_cache_is_bounded():
+    surfaces.clear_cache()
+    first = surfaces.surface_for(analysis.bjt_ce, CENTER, ["R1"], points=5)
+    for k in range(surfaces.CACHE_SIZE + 3):
+        surfaces.surface_for(analysis.bjt_ce, {**CENTER, "Rc": 1e3 + k}, ["R1"], points=5)
+    assert len(surfaces._SURFACE_CACHE) == surfaces.CACHE_SIZE
+    assert surfaces.surface_for(analysis.bjt_ce, CENTER, ["R1"], points=5) is not first
+    surfaces.clear_cache()
+
+
+def test_two_sessions_on_one_surface_both_get_exact_results():
+    surface = surfaces.ResponseSurface(analysis.bjt_ce, CENTER, ["R1", "R2"], points=5, debounce=0.05)
+    a, b = {"R1": 40e3, "R2": 11e3}, {"R1": 50e3, "R2": 9e3}
+    surface.lookup(session="a", **a)
+    surface.lookup(session="b", **b)   # Must not cancel session a's pending evaluation
+    res_a, res_b = _wait(surface, "a", **a), _wait(surface, "b", **b)
+    assert res_a["Ic"] == surface.exact(**a)["Ic"]
+    assert res_b["Ic"] == surface.exact(**b)["Ic"]
+
+
+def test_one_session_debounces_its_own_moves():
+    calls = []
+    surface = surfaces.ResponseSurface(lambda **kw: calls.append(kw) or analysis.bjt_ce(**kw),
+                                       CENTER, ["R1"], points=5, debounce=0.1)
+    calls.clear()
+    for r1 in (30e3, 35e3, 40e3):
+        surface.lookup(session="a", R1=r1)
+    _wait(surface, "a", R1=40e3)
+    # Grid builds pass arrays; the exact evaluations are the scalar calls
+    assert [c["R1"] for c in calls if isinstance(c["R1"], float)] == [40e3]
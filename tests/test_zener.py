@@ -0,0 +1,52 @@
+# tests/test_zener.py
+# Checks the Zener regulator engine against hand-solved operating points and designs.
+
+import builtins
+
+import numpy as np
+import pytest
+
+import modules
+import zener
+
+
+def test_operating_point_by_hand():
+    # Iz = (Vin - Vz - IL*Rs) / (Rs + rz) = (12 - 5.1 - 4.4) / 225 = 11.11 mA
+    r = zener.evaluate(12.0, 20e-3, 220.0, 5.1, rz=5.0)
+    assert r["Iz"] == pytest.approx(2.5 / 225)
+    assert r["Vout"] == pytest.approx(5.1 + 2.5 / 225 * 5.0)
+    assert r["P_Rs"] == pytest.approx((12.0 - r["Vout"])**2 / 220.0)
+    assert r["regulated"]
+
+
+def test_dropout_below_breakdown():
+    # Heavy load pulls the Zener out of conduction: Vout = Vin - IL*Rs
+    r = zener.evaluate(9.0, 30e-3, 220.0, 5.1)
+    assert r["Iz"] == 0.0 and r["dropout"]
+    assert r["Vout"] == pytest.approx(9.0 - 30e-3 * 220.0)
+
+
+def test_design_by_hand():
+    # Rs_limit = (Vin_min - Vz - Izk*rz) / (IL_max + Izk) = 3.895 / 21 mA = 185.5 Ω -> E24 180 Ω
+    r = zener.design(9.0, 15.0, 0.0, 20e-3, 5.1)
+    assert r["Rs_limit"] == pytest.approx(3.895 / 0.021)
+    assert r["Rs"] == 180.0
+    # Worst Zener power at Vin_max, no load: Iz = 9.9 / 185 A
+    Iz = 9.9 / 185.0
+    assert r["Pz_worst"] == pytest.approx((5.1 + 5.0 * Iz) * Iz)
+    assert (r["Pz_rating"], r["P_Rs_rating"]) == (0.5, 1.0)
+    assert zener.surface(9.0, 15.0, 0.0, 20e-3, r["Rs"], 5.1, n_vin=50, n_load=50)["regulated"].all()
+
+
+def test_design_rejects_inverted_ranges():
+    with pytest.raises(ValueError):
+        zener.design(15.0, 9.0, 0.0, 20e-3, 5.1)
+    with pytest.raises(ValueError):
+        zener.design(9.0, 15.0, 20e-3, 0.0, 5.1)
+
+
+def test_cli_rejects_vin_max_below_vin(monkeypatch, capsys):
+    answers = iter(["15", "9", "5.1", "500", "", ""])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(answers))
+    modules.zener_regulator()
+    assert "cannot be below the minimum" in capsys.readouterr().out
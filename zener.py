@@ -0,0 +1,82 @@
+# zener.py
+# Contains a load/line regulation engine for shunt Zener regulators.
+# The Zener is modeled piecewise: off below its breakdown voltage Vz, and
+# Vz + Iz*rz once conducting. Regulation requires Iz >= Izk (knee current)
+# and Vout*Iz <= the power rating. The whole Vin x load-current grid is
+# evaluated with broadcasting, so a 1000 x 1000 surface is a single pass.
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from helpers import standard_values
+
+ZENER_RATINGS = [0.25, 0.5, 1.0, 1.3, 3.0, 5.0]         # W, cheapest first
+RESISTOR_RATINGS = [0.125, 0.25, 0.5, 1.0, 2.0, 5.0]    # W, cheapest first
+
+def evaluate(Vin, IL, Rs, Vz, rz=5.0, Izk=1e-3, Pz_max=np.inf) -> Dict[str, np.ndarray]:
+    """
+    Operating point of the regulator for every (Vin, IL) combination.
+    Pass Vin as a column and IL as a row (e.g. Vin[:, None], IL[None, :])
+    to get the full regulation surface.
+    """
+    Vin, IL = np.asarray(Vin, dtype=float), np.asarray(IL, dtype=float)
+    Iz = np.maximum((Vin - Vz - IL * Rs) / (Rs + rz), 0.0)
+    Vout = np.where(Iz > 0, Vz + Iz * rz, np.maximum(Vin - IL * Rs, 0.0))
+    Pz = Vout * Iz
+    P_Rs = (Vin - Vout)**2 / Rs
+    dropout = Iz < Izk
+    overpower = Pz > Pz_max
+    return {"Vout": Vout, "Iz": Iz, "Pz": Pz, "P_Rs": P_Rs, "dropout": dropout,
+            "overpower": overpower, "regulated": ~dropout & ~overpower}
+
+def regulation(Vin_min, Vin_max, IL_min, IL_max, Rs, Vz, rz=5.0, Izk=1e-3) -> Dict[str, float]:
+    """Line regulation (%/V at IL_max) and load regulation (% from IL_min to IL_max at Vin_min)."""
+    corners = evaluate(np.array([[Vin_min], [Vin_max]]), np.array([IL_min, IL_max]), Rs, Vz, rz, Izk)
+    Vout = corners["Vout"]
+    line = (Vout[1, 1] - Vout[0, 1]) / (Vin_max - Vin_min) / Vout[0, 1] * 100 if Vin_max > Vin_min else 0.0
+    load = (Vout[0, 0] - Vout[0, 1]) / Vout[0, 1] * 100
+    return {"line_reg": float(line), "load_reg": float(load)}
+
+def surface(Vin_min, Vin_max, IL_min, IL_max, Rs, Vz, rz=5.0, Izk=1e-3, Pz_max=np.inf,
+            n_vin: int = 1000, n_load: int = 1000) -> Dict[str, np.ndarray]:
+    """Regulation surface on an n_vin x n_load grid, plus the grid axes."""
+    Vin = np.linspace(Vin_min, Vin_max, n_vin)
+    IL = np.linspace(IL_min, IL_max, n_load)
+    out = evaluate(Vin[:, None], IL[None, :], Rs, Vz, rz, Izk, Pz_max)
+    out["Vin"], out["IL"] = Vin, IL
+    return out
+
+def design(Vin_min, Vin_max, IL_min, IL_max, Vz, rz=5.0, Izk=1e-3,
+           series: str = 'E24', margin: float = 1.5) -> Optional[Dict[str, float]]:
+    """
+    Picks the cheapest standard Rs / Zener / resistor ratings that regulate
+    over the whole Vin x IL range, or None if no standard Rs can.
+
+    The Zener current is lowest at (Vin_min, IL_max), which bounds Rs from
+    above; Zener power peaks at (Vin_max, IL_min) and Rs power at
+    (Vin_max, IL_max). Ratings need `margin` times the worst-case power.
+    """
+    if Vin_max < Vin_min or IL_max < IL_min:
+        raise ValueError("Maximum input voltage and load current cannot be below their minimums.")
+    Rs_limit = (Vin_min - Vz - Izk * rz) / (IL_max + Izk)
+    if Rs_limit <= 0:
+        return None
+    Rs = np.array(standard_values(Rs_limit / 1000, Rs_limit, series))
+    if Rs.size == 0:
+        return None
+    Pz = evaluate(Vin_max, IL_min, Rs, Vz, rz, Izk)["Pz"]
+    P_Rs = evaluate(Vin_max, IL_max, Rs, Vz, rz, Izk)["P_Rs"]
+    z_idx = np.searchsorted(ZENER_RATINGS, Pz * margin)
+    r_idx = np.searchsorted(RESISTOR_RATINGS, P_Rs * margin)
+    ok = (z_idx < len(ZENER_RATINGS)) & (r_idx < len(RESISTOR_RATINGS))
+    if not ok.any():
+        return None
+    # Cheapest Zener first, then cheapest resistor, then the largest Rs (least wasted current)
+    order = np.lexsort((-Rs, r_idx, z_idx))
+    best = order[ok[order]][0]
+    result = {"Rs": float(Rs[best]), "Pz_rating": ZENER_RATINGS[z_idx[best]],
+              "P_Rs_rating": RESISTOR_RATINGS[r_idx[best]], "Pz_worst": float(Pz[best]),
+              "P_Rs_worst": float(P_Rs[best]), "Rs_limit": float(Rs_limit)}
+    result.update(regulation(Vin_min, Vin_max, IL_min, IL_max, result["Rs"], Vz, rz, Izk))
+    return result